@@ -0,0 +1,96 @@
+"""
+Benchmark of the CLI startup cost.
+
+Runs 'python -X importtime' in fresh interpreters and reports the
+cumulative import time of ncpeek modules, the heaviest modules they
+pull in, and the wall time of 'ncpeek --help'.
+Heavy dependencies such as ncclient, paramiko, xmltodict and lxml
+should not show up, they are only loaded once a session or parse is needed.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_import_time.py --repeat 5 --max-ms 150
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+MODULES = ("ncpeek.client", "ncpeek.poller", "ncpeek.async_client")
+HEAVY_MODULES = ("ncclient", "paramiko", "cryptography", "xmltodict", "lxml")
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Cumulative import time in microseconds of each module loaded by 'module'."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=os.environ,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # import time: self [us] | cumulative | imported package
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def help_wall_time() -> float:
+    """Seconds taken by 'python -m ncpeek --help'."""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "ncpeek", "--help"],
+        capture_output=True,
+        check=True,
+        env=os.environ,
+    )
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=None,
+        help="Exit with an error if a module median import time is above it.",
+    )
+    args = parser.parse_args()
+
+    failed = False
+    print(f"median of {args.repeat} runs")
+    for module in MODULES:
+        runs = [import_times(module) for _ in range(args.repeat)]
+        median_ms = statistics.median(run[module] for run in runs) / 1000
+        heavy = sorted(
+            name for name in runs[0] if name.split(".")[0] in HEAVY_MODULES
+        )
+        print(f"\n{module:<28}{median_ms:>10.1f} ms")
+        heaviest = sorted(
+            (name for name in runs[0] if name != module),
+            key=lambda name: runs[0][name],
+            reverse=True,
+        )[: args.top]
+        for name in heaviest:
+            print(f"  {name:<26}{runs[0][name] / 1000:>10.1f} ms")
+        if heavy:
+            print(f"  heavy modules loaded: {', '.join(heavy[:5])}")
+        if args.max_ms is not None and median_ms > args.max_ms:
+            print(f"  above {args.max_ms} ms")
+            failed = True
+
+    help_ms = statistics.median(help_wall_time() for _ in range(args.repeat)) * 1000
+    print(f"\n{'ncpeek --help wall time':<28}{help_ms:>10.1f} ms")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark of the JSON backends and the line protocol used to write ncpeek output.
+
+Serializes records shaped like the output of InterfaceStatsIOSXEParser
+with every installed backend, and as InfluxDB line protocol, and reports
+the time to write them to a binary stream, as the CLI does with stdout.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_json.py --interfaces 100000 --repeat 5
+"""
+
+import io
+import time
+import argparse
+from ncpeek.utils.text_utils import JSON_BACKENDS, get_json_serializer
+from ncpeek.utils.line_protocol import records_to_line_protocol
+
+COUNTERS = (
+    "in_octets",
+    "in_errors",
+    "out_octets",
+    "out_errors",
+    "in-broadcast-pkts",
+    "in-crc-errors",
+    "in-discards",
+    "in-discards-64",
+    "in-errors-64",
+    "in-multicast-pkts",
+    "in-unicast-pkts",
+    "in-unknown-protos",
+    "in-unknown-protos-64",
+    "num-flaps",
+    "out-broadcast-pkts",
+    "out-discards",
+    "out-multicast-pkts",
+    "out-octets-64",
+    "out-unicast-pkts",
+    "rx-kbps",
+    "rx-pps",
+    "tx-kbps",
+    "tx-pps",
+)
+
+
+def interface_records(count: int) -> list[dict]:
+    """Records with the same keys as InterfaceStatsIOSXEParser output."""
+    records = []
+    for index in range(count):
+        record = {counter: index * 1000 + n for n, counter in enumerate(COUNTERS)}
+        record.update(
+            {
+                "operational_status": 1,
+                "name": f"GigabitEthernet1/0/{index}",
+                "field": "Cisco-IOS-XE-interfaces-oper.xml",
+                "device": f"router-{index // 1000}",
+                "ip": f"10.0.{index // 1000 % 256}.1",
+            }
+        )
+        records.append(record)
+    return records
+
+
+def bench_backend(name: str, records: list, repeat: int) -> tuple[float, int]:
+    """Best time to serialize and write the records, and output size."""
+    serializer = get_json_serializer(name)
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        output = io.BytesIO()
+        start = time.perf_counter()
+        output.write(serializer.dumps(records))
+        best = min(best, time.perf_counter() - start)
+        size = output.tell()
+    return best, size
+
+
+def bench_line_protocol(records: list, repeat: int) -> tuple[float, int]:
+    """Best time to convert and write the records as line protocol, and output size."""
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        output = io.BytesIO()
+        start = time.perf_counter()
+        output.write(records_to_line_protocol(records).encode("utf-8"))
+        best = min(best, time.perf_counter() - start)
+        size = output.tell()
+    return best, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--interfaces", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    records = interface_records(args.interfaces)
+    baseline = None
+    print(f"{args.interfaces} interface records, best of {args.repeat}")
+    print(f"{'backend':<10}{'seconds':>10}{'MB':>10}{'speedup':>10}")
+    for name in reversed(JSON_BACKENDS):
+        try:
+            seconds, size = bench_backend(name, records, args.repeat)
+        except ImportError:
+            print(f"{name:<10}{'not installed':>30}")
+            continue
+        baseline = baseline or seconds
+        print(
+            f"{name:<10}{seconds:>10.3f}{size / 1e6:>10.1f}{baseline / seconds:>9.1f}x"
+        )
+
+    seconds, size = bench_line_protocol(records, args.repeat)
+    print(f"{'influx':<10}{seconds:>10.3f}{size / 1e6:>10.1f}{baseline / seconds:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
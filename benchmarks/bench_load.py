@@ -0,0 +1,133 @@
+"""
+Load test of NetconfClient against simulated netconf devices.
+
+Starts the simulated devices in a separate process, then fetches from
+all of them through NetconfClient for several rounds and reports the
+end to end devices per second, from ssh connection to parsed records.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_load.py --devices 50 --workers 25 --rounds 3
+    PYTHONPATH=. python benchmarks/bench_load.py --devices 50 --workers 25 --latency 0.05 --pool
+    PYTHONPATH=. python benchmarks/bench_load.py --settings sim.json --workers 25
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+import subprocess
+from typing import Optional
+from ncpeek.client import NetconfClient
+from ncpeek.session_pool import SessionPool
+
+DEFAULT_FILTERS = ("Cisco-IOS-XE-interfaces-oper.xml",)
+
+
+def start_simulator(args: argparse.Namespace, settings_file: str) -> subprocess.Popen:
+    """Starts 'python -m ncpeek.simulator' and waits for its device settings."""
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "ncpeek.simulator",
+            f"--devices={args.devices}",
+            f"--size={args.size}",
+            f"--latency={args.latency}",
+            f"--jitter={args.jitter}",
+            f"--failure-rate={args.failure_rate}",
+            f"--settings-file={settings_file}",
+        ],
+        env=os.environ,
+    )
+    deadline = time.monotonic() + 60
+    while not os.path.getsize(settings_file):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError("The simulator did not start")
+        time.sleep(0.1)
+    return process
+
+
+def run_rounds(
+    settings: list, filters: list, workers: int, rounds: int, pool: bool
+) -> tuple[float, int, int]:
+    """Returns the seconds taken, the rounds completed and the records fetched."""
+    client = NetconfClient(
+        max_workers=workers, session_pool=SessionPool() if pool else None
+    )
+    client.set_devices_settings(settings)
+    client.set_xml_filter(filters)
+
+    completed = records = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        try:
+            records += len(json.loads(client.fetch()))
+            completed += 1
+        except Exception as err:
+            print(f"round failed: {err!r}", file=sys.stderr)
+    seconds = time.perf_counter() - start
+    client.close()
+    return seconds, completed, records
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--size", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--pool", action="store_true", help="Reuse sessions between rounds."
+    )
+    parser.add_argument(
+        "--filter", action="append", dest="filters", help="Can be repeated."
+    )
+    parser.add_argument(
+        "--settings",
+        help="Device settings of a simulator already running. "
+        "Default: start one with --devices.",
+    )
+    args = parser.parse_args()
+
+    process: Optional[subprocess.Popen] = None
+    if args.settings:
+        with open(args.settings, "r", encoding="utf-8") as file:
+            settings = json.load(file)
+    else:
+        settings_file = tempfile.NamedTemporaryFile(suffix=".json", delete=False).name
+        process = start_simulator(args, settings_file)
+        with open(settings_file, "r", encoding="utf-8") as file:
+            settings = json.load(file)
+        os.remove(settings_file)
+
+    try:
+        seconds, completed, records = run_rounds(
+            settings=settings,
+            filters=args.filters or list(DEFAULT_FILTERS),
+            workers=args.workers,
+            rounds=args.rounds,
+            pool=args.pool,
+        )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    devices = len(settings) * completed
+    print(
+        f"{len(settings)} devices, {args.workers} workers, "
+        f"{completed}/{args.rounds} rounds, pool={'on' if args.pool else 'off'}"
+    )
+    print(f"{'seconds':<16}{seconds:>10.2f}")
+    print(f"{'devices/s':<16}{devices / seconds:>10.1f}")
+    print(f"{'records/s':<16}{records / seconds:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark of namespace removal on a deep rpc-reply.
+
+Builds a reply of nested containers and lists where every element
+declares a namespace, and compares removing the namespaces from the
+converted dictionary with dropping them while the xml is converted.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_namespaces.py --nodes 50000 --depth 25 --repeat 3
+"""
+
+import time
+import argparse
+from ncpeek.utils.text_utils import convert_xml_to_dict
+from ncpeek.parsers.remove_namespaces import remove_namespaces_from_dict
+from ncpeek.simulator.replies import deep_generic_reply
+
+
+def convert_then_remove(reply: str) -> dict:
+    return remove_namespaces_from_dict(convert_xml_to_dict(reply))
+
+
+def strip_while_converting(reply: str) -> dict:
+    return convert_xml_to_dict(reply, strip_namespaces=True)
+
+
+def best_time(function, reply: str, repeat: int) -> tuple[float, dict]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(reply)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodes", type=int, default=50_000)
+    parser.add_argument("--depth", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    reply = deep_generic_reply(args.nodes, args.depth)
+    print(
+        f"{reply.count('</')} elements, {args.depth} levels deep, best of {args.repeat}"
+    )
+    print(f"{'path':<24}{'seconds':>10}")
+    for name, function in (
+        ("convert, then remove", convert_then_remove),
+        ("strip while converting", strip_while_converting),
+    ):
+        seconds, result = best_time(function, reply, args.repeat)
+        assert "@xmlns" not in repr(result), f"{name} left namespaces"
+        print(f"{name:<24}{seconds:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+Benchmark suite of the conversion and parsing stages on large rpc-replies.
+
+Every case runs a single stage on a synthetic reply and reports its
+throughput, in items and MB of the xml reply per second, and its peak memory
+measured with tracemalloc. Runs offline, no device is needed.
+
+Save the results of a known good run with --save, then compare later
+runs with --baseline. The run fails if a case is slower or uses more
+memory than the baseline beyond --threshold.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_parsers.py --save baseline.json
+    PYTHONPATH=. python benchmarks/bench_parsers.py --baseline baseline.json --threshold 0.25
+    PYTHONPATH=. python benchmarks/bench_parsers.py --sizes 1000,10000 --cases interfaces
+"""
+
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+from ncpeek.netconf_devices import NetconfDevice
+from ncpeek.parsers.default_parser import DefaultParser
+from ncpeek.parsers.cisco_ios_xe_isis_oper import ISISStatsIOSXEParser
+from ncpeek.parsers.cisco_ios_xe_interfaces_oper import InterfaceStatsIOSXEParser
+from ncpeek.parsers.remove_namespaces import remove_namespaces_from_dict
+from ncpeek.utils.text_utils import (
+    convert_xml_to_dict,
+    iterparse_xml_records,
+    iterparse_xml_elements,
+)
+from ncpeek.simulator.replies import (
+    deep_generic_reply,
+    iosxe_interfaces_reply,
+    isis_neighbors_reply,
+)
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_THRESHOLD = 0.2
+DEVICE = NetconfDevice(host="10.0.0.1", username="user", password="pass")
+
+
+@dataclass
+class Stage:
+    """
+    A step of the pipeline to measure.
+
+    prepare builds the input of run from the xml reply, out of the measure.
+    """
+
+    name: str
+    run: Callable[[Any], Any]
+    prepare: Callable[[str], Any] = lambda reply: reply
+
+
+@dataclass
+class Case:
+    """A reply generator and the stages measured with it."""
+
+    name: str
+    unit: str
+    generate: Callable[[int], str]
+    stages: tuple
+
+
+@dataclass
+class Result:
+    """Measure of a stage, saved to and compared with the baseline."""
+
+    case: str
+    stage: str
+    size: int
+    unit: str
+    seconds: float
+    items_per_second: float
+    mb_per_second: float
+    peak_mb: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.case}/{self.stage}/{self.size}"
+
+
+def _interfaces_dict(data: dict) -> list:
+    return InterfaceStatsIOSXEParser().parse(data, DEVICE, "interfaces")
+
+
+def _interfaces_elements(reply: str) -> list:
+    parser = InterfaceStatsIOSXEParser()
+    elements = iterparse_xml_elements(reply, parser.record_path)
+    return parser.parse_elements(elements, DEVICE, "interfaces")
+
+
+def _isis_dict(data: dict) -> list:
+    return ISISStatsIOSXEParser().parse(data, DEVICE, "isis")
+
+
+def _isis_records(reply: str) -> list:
+    parser = ISISStatsIOSXEParser()
+    records = iterparse_xml_records(reply, parser.record_path)
+    return parser.parse_records(records, DEVICE, "isis")
+
+
+def _convert_and_default_parser(reply: str) -> list:
+    """The steps of the client for filters without a dedicated parser."""
+    parser = DefaultParser()
+    data = convert_xml_to_dict(reply, strip_namespaces=parser.strip_namespaces)
+    parser.namespaces_stripped = parser.strip_namespaces
+    return parser.parse(data, DEVICE, "generic")
+
+
+CASES = (
+    Case(
+        name="interfaces",
+        unit="interfaces",
+        generate=iosxe_interfaces_reply,
+        stages=(
+            Stage("convert_xml_to_dict", convert_xml_to_dict),
+            Stage("parse", _interfaces_dict, prepare=convert_xml_to_dict),
+            Stage("parse_elements", _interfaces_elements),
+        ),
+    ),
+    Case(
+        name="isis",
+        unit="neighbors",
+        generate=isis_neighbors_reply,
+        stages=(
+            Stage("convert_xml_to_dict", convert_xml_to_dict),
+            Stage("parse", _isis_dict, prepare=convert_xml_to_dict),
+            Stage("parse_records", _isis_records),
+        ),
+    ),
+    Case(
+        name="deep",
+        unit="nodes",
+        generate=deep_generic_reply,
+        stages=(
+            Stage("convert_xml_to_dict", convert_xml_to_dict),
+            Stage(
+                "convert_strip_namespaces",
+                lambda reply: convert_xml_to_dict(reply, strip_namespaces=True),
+            ),
+            Stage(
+                "remove_namespaces_from_dict",
+                remove_namespaces_from_dict,
+                prepare=convert_xml_to_dict,
+            ),
+            Stage("convert_and_default_parser", _convert_and_default_parser),
+        ),
+    ),
+)
+
+
+def measure(stage: Stage, stage_input: Any, repeat: int) -> tuple[float, float]:
+    """
+    Returns the best time in seconds of the stage, and its peak memory in MB.
+    Memory is measured on a separate run, tracemalloc slows the code down.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stage.run(stage_input)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        stage.run(stage_input)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak / 1e6
+
+
+def run_suite(cases: tuple, sizes: tuple, repeat: int) -> list[Result]:
+    """Runs every stage of the cases with each size and prints the results."""
+    results = []
+    for case in cases:
+        for size in sizes:
+            reply = case.generate(size)
+            reply_mb = len(reply.encode("utf-8")) / 1e6
+            for stage in case.stages:
+                stage_input = stage.prepare(reply)
+                seconds, peak_mb = measure(stage, stage_input, repeat)
+                result = Result(
+                    case=case.name,
+                    stage=stage.name,
+                    size=size,
+                    unit=case.unit,
+                    seconds=seconds,
+                    items_per_second=size / seconds,
+                    mb_per_second=reply_mb / seconds,
+                    peak_mb=peak_mb,
+                )
+                print_result(result)
+                results.append(result)
+                del stage_input
+    return results
+
+
+def print_result(result: Result) -> None:
+    print(
+        f"{result.case:<12}{result.stage:<30}{result.size:>9}"
+        f"{result.seconds:>10.3f}{result.items_per_second:>14,.0f}"
+        f"{result.mb_per_second:>9.1f}{result.peak_mb:>11.1f}"
+    )
+
+
+def find_regressions(
+    results: list[Result], baseline: dict, threshold: float
+) -> list[str]:
+    """Returns a message for each case slower or larger than the baseline."""
+    regressions = []
+    for result in results:
+        previous: Optional[dict] = baseline.get(result.key)
+        if previous is None:
+            continue
+        if result.items_per_second < previous["items_per_second"] * (1 - threshold):
+            regressions.append(
+                f"{result.key}: {result.items_per_second:,.0f} {result.unit}/s, "
+                f"baseline {previous['items_per_second']:,.0f}"
+            )
+        if result.peak_mb > previous["peak_mb"] * (1 + threshold):
+            regressions.append(
+                f"{result.key}: {result.peak_mb:.1f} MB peak, "
+                f"baseline {previous['peak_mb']:.1f}"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="Comma separated number of items of each reply.",
+    )
+    parser.add_argument(
+        "--cases",
+        default=",".join(case.name for case in CASES),
+        help="Comma separated cases to run.",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="Write the results to this json file.")
+    parser.add_argument("--baseline", help="Compare with the results of this json file.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed slowdown or memory growth, 0.2 is 20%%.",
+    )
+    args = parser.parse_args()
+
+    sizes = tuple(int(size) for size in args.sizes.split(","))
+    selected = args.cases.split(",")
+    cases = tuple(case for case in CASES if case.name in selected)
+
+    print(f"best of {args.repeat}")
+    print(
+        f"{'case':<12}{'stage':<30}{'size':>9}{'seconds':>10}"
+        f"{'items/s':>14}{'MB/s':>9}{'peak MB':>11}"
+    )
+    results = run_suite(cases, sizes, args.repeat)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump({result.key: vars(result) for result in results}, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = find_regressions(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"regression {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regression beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark of the parsing paths of InterfaceStatsIOSXEParser.
+
+Builds a namespaced rpc-reply with many interfaces and reports the time
+to parse it converting the whole reply to a dictionary, and reading
+lxml elements with the compiled XPath of its parser spec.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_parsers_xpath.py --interfaces 20000 --repeat 3
+"""
+
+import time
+import argparse
+from ncpeek.netconf_devices import NetconfDevice
+from ncpeek.parsers.cisco_ios_xe_interfaces_oper import InterfaceStatsIOSXEParser
+from ncpeek.utils.text_utils import (
+    convert_xml_to_dict,
+    iterparse_xml_elements,
+)
+from ncpeek.simulator.replies import iosxe_interfaces_reply
+
+FILTER_ID = "Cisco-IOS-XE-interfaces-oper.xml"
+DEVICE = NetconfDevice(host="10.0.0.1", username="user", password="pass")
+
+
+def parse_dict(reply: str) -> list:
+    return InterfaceStatsIOSXEParser().parse(
+        convert_xml_to_dict(reply), DEVICE, FILTER_ID
+    )
+
+
+def parse_elements(reply: str) -> list:
+    parser = InterfaceStatsIOSXEParser()
+    elements = iterparse_xml_elements(reply, parser.record_path)
+    return parser.parse_elements(elements, DEVICE, FILTER_ID)
+
+
+def best_time(function, reply: str, repeat: int) -> tuple[float, list]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(reply)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--interfaces", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    reply = iosxe_interfaces_reply(args.interfaces)
+    print(
+        f"{args.interfaces} interfaces, {len(reply) / 1e6:.1f} MB, best of {args.repeat}"
+    )
+    print(f"{'path':<10}{'seconds':>10}{'speedup':>10}")
+    baseline, expected = None, None
+    for name, function in (
+        ("dict", parse_dict),
+        ("xpath", parse_elements),
+    ):
+        seconds, result = best_time(function, reply, args.repeat)
+        expected = expected or result
+        assert result == expected, f"{name} output differs from dict output"
+        baseline = baseline or seconds
+        print(f"{name:<10}{seconds:>10.3f}{baseline / seconds:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark of the memory held by the records of the parsers.
+
+Parses a synthetic reply of --count interfaces and memory pools and
+reports the bytes retained per record, measured with tracemalloc, by the
+records of the parsers and by the same records held as dictionaries.
+Runs offline, no device is needed.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_records.py
+    PYTHONPATH=. python benchmarks/bench_records.py --count 10000
+"""
+
+import gc
+import argparse
+import tracemalloc
+from typing import Callable
+from ncpeek.netconf_devices import NetconfDevice
+from ncpeek.utils.record_utils import record_to_dict
+from ncpeek.parsers.cisco_ios_xe_interfaces_oper import InterfaceStatsIOSXEParser
+from ncpeek.parsers.cisco_ios_xe_memory_oper import CiscoIOSXEMemoryParser
+from ncpeek.utils.text_utils import iterparse_xml_elements
+from ncpeek.simulator.replies import iosxe_interfaces_reply, iosxe_memory_reply
+
+DEFAULT_COUNT = 100_000
+DEVICE = NetconfDevice(
+    host="10.0.0.1", hostname="router1", username="user", password="pass"
+)
+
+
+def retained(build: Callable[[], list]) -> tuple[list, int]:
+    """Returns the result of build and the bytes it still holds."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT)
+    args = parser.parse_args()
+
+    cases = (
+        (
+            "interfaces",
+            InterfaceStatsIOSXEParser(),
+            iosxe_interfaces_reply,
+            "Cisco-IOS-XE-interfaces-oper.xml",
+        ),
+        (
+            "memory",
+            CiscoIOSXEMemoryParser(),
+            iosxe_memory_reply,
+            "Cisco-IOS-XE-memory-oper.xml",
+        ),
+    )
+    print(f"{'case':<12}{'records':>10}{'record B':>12}{'dict B':>12}")
+    for name, record_parser, make_reply, filter_id in cases:
+        reply = make_reply(args.count)
+
+        def parse() -> list:
+            return record_parser.parse_elements(
+                elements=iterparse_xml_elements(reply, record_parser.record_path),
+                device=DEVICE,
+                netconf_filter_id=filter_id,
+            )
+
+        records, records_size = retained(parse)
+        count = len(records)
+        del records
+        _, dicts_size = retained(lambda: [record_to_dict(r) for r in parse()])
+        print(
+            f"{name:<12}{count:>10}"
+            f"{records_size / count:>12.0f}{dicts_size / count:>12.0f}"
+        )
+
+if __name__ == "__main__":
+    main()
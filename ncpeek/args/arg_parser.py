@@ -1,26 +1,124 @@
 import sys
 import argparse
 from argparse import RawTextHelpFormatter
+from ncpeek.args.inventory import parse_shard
 
 NCPEEK_DESCRIPTION = """'ncpeek' is a netconf client designed to fetch data from various devices.
 The client can be utilized in two distinct ways, 
 either via Command Line Interface (CLI) or Application Programming Interface (API).
-The data retrieval can be filtered through either XML or XPath, 
-however, only one filter type can be applied at a given time.
+The data retrieval can be filtered through XML and/or XPath.
+Repeat -x/-p to fetch several filters over the same session.
 Note that in CLI mode, only filenames can be treated as arguments.
 Source code: https://github.com/jillesca/ncpeek"""
 
+POLL_COMMAND = "poll"
+SERVE_COMMAND = "serve"
+
+DEFAULT_SERVE_ADDRESS = "0.0.0.0"
+DEFAULT_SERVE_PORT = 9700
+MAX_PORT = 65535
+DEFAULT_CACHE_TTL = 5.0
+DEFAULT_PARSE_THRESHOLD = 1_048_576
+
+JSON_FORMAT = "json"
+NDJSON_FORMAT = "ndjson"
+INFLUX_FORMAT = "influx"
+OUTPUT_FORMATS = (JSON_FORMAT, NDJSON_FORMAT, INFLUX_FORMAT)
+
+XML_FILTER_DEST = "xml_filter"
+XPATH_FILTER_DEST = "xpath_filter"
+# -x and -p together, as (dest, filter) in the order given.
+FILTERS_DEST = "filters"
+
+POLL_DESCRIPTION = """'ncpeek poll' keeps running and fetches data on every cycle.
+Sessions, parsers and settings stay loaded between cycles.
+Designed for Telegraf's execd input plugin:
+a cycle runs for each new line received on stdin (signal = "STDIN"),
+or every --interval seconds (signal = "none").
+Each cycle prints a single line of JSON."""
+
+SERVE_DESCRIPTION = """'ncpeek serve' is a Prometheus exporter.
+Scrape /metrics?target=<device>&filter=<filter> to fetch the filter from
+the device and get the numeric fields of the records as OpenMetrics.
+target is the hostname or host of a device of the device settings,
+filter is the filename or xpath of a filter. Repeat filter to fetch
+several filters over the same session, omit it to fetch all the filters."""
+
+CACHE_TTL_DESCRIPTION = """Seconds a scrape result is reused. Default: 5.
+Scrapes of the same target and filters within this time share one fetch."""
+
+CHANGES_ONLY_DESCRIPTION = """Only print records whose values changed since they were last printed.
+Records are identified by their device, field and name."""
+
+HEARTBEAT_DESCRIPTION = """With --changes-only, print unchanged records again
+every HEARTBEAT cycles. Default: never."""
+
+FORMAT_DESCRIPTION = """Output format. Default: json.
+json: a single JSON array, printed once all devices finish.
+ndjson: one JSON object per line, printed as soon as each device finishes.
+influx: InfluxDB line protocol, printed as soon as each device finishes.
+  device, field, ip and name are tags, numeric values are fields."""
+
+INTERVAL_DESCRIPTION = """Seconds between cycles.
+If not provided, a cycle runs for each new line received on stdin."""
+
 DEVICE_SETTINGS_DESCRIPTION = """Specify JSON filename containing device settings.
-Visit https://github.com/jillesca/ncpeek/tree/main/ncpeek/devices for more information."""
+Visit https://github.com/jillesca/ncpeek/tree/main/ncpeek/devices for more information.
+Files ending in .ndjson or .jsonl hold one device per line, read line by line."""
+
+SHARD_DESCRIPTION = """Only use the devices of shard k of n, i.e. 2/4, chosen by a stable hash
+of their host. Run n processes with 1/n to n/n to split the devices between them."""
 
-XML_FILTER_DESCRIPTION = """Specify XML filename containing XML filter.
+XML_FILTER_DESCRIPTION = """Specify XML filename containing XML filter. Can be repeated.
 Visit https://github.com/jillesca/ncpeek/tree/main/ncpeek/filters for more details."""
 
-XPATH_FILTER_DESCRIPTION = """Formats: <xpath> OR <namespace>:<xpath>
+WORKERS_DESCRIPTION = """Number of devices to query concurrently. Default: 1 (sequential).
+json output follows the order of the device settings,
+ndjson and influx print each device as soon as it finishes."""
+
+TIMINGS_DESCRIPTION = """Add a record with the timings of each device after its records.
+Seconds spent on connect, rpc, convert, parse and serialize,
+plus the reply size in bytes and the number of records."""
+
+DEADLINE_DESCRIPTION = """Seconds the whole run has to finish. Default: none, wait for every device.
+Devices that fail or miss the deadline print an error record per filter,
+with their device, ip, field and error class, and the records of the
+other devices are still printed."""
+
+BREAKER_FAILURES_DESCRIPTION = """Skip a device after this many consecutive connect or rpc failures.
+It gets a CircuitOpen error record instead, without waiting for its timeout.
+It is probed again after 30 seconds, doubled on every failed probe up to
+30 minutes. Failures are counted per host, devices on other ports of
+the same host are skipped together. Default: none, devices are never skipped."""
+
+BREAKER_STATE_DESCRIPTION = """With --breaker-failures, JSON file keeping the failures of the devices,
+so they are skipped across separate runs of ncpeek."""
+
+PARSE_WORKERS_DESCRIPTION = """Number of processes parsing the large replies. Default: none,
+replies are parsed by the process fetching them. Use it when parsing
+keeps a core busy, with many devices or replies of several megabytes."""
+
+PARSE_THRESHOLD_DESCRIPTION = f"""With --parse-workers, size in bytes from which a reply is parsed
+in a worker process. Smaller replies are parsed in-process.
+Default: {DEFAULT_PARSE_THRESHOLD} (1 MiB)."""
+
+XPATH_FILTER_DESCRIPTION = """Formats: <xpath> OR <namespace>:<xpath>. Can be repeated.
 Example: 'interfaces/interface' OR 
 'http://cisco.com/ns/yang/Cisco-IOS-XE-interfaces-oper:interfaces/interface'"""
 
 
+class AppendFilterAction(argparse.Action):
+    """
+    Appends a filter to the list of its option, like action='append',
+    and to FILTERS_DEST as (dest, filter), keeping the order of -x and -p.
+    """
+
+    def __call__(self, parser, namespace, values, option_string=None) -> None:
+        setattr(namespace, self.dest, [*(getattr(namespace, self.dest) or []), values])
+        filters = getattr(namespace, FILTERS_DEST, None) or []
+        setattr(namespace, FILTERS_DEST, [*filters, (self.dest, values)])
+
+
 class CustomArgumentParser(argparse.ArgumentParser):
     """
     Custom ArgumentParser class to display help message on error.
@@ -34,30 +132,246 @@ class CustomArgumentParser(argparse.ArgumentParser):
 
 def create_argument_parser():
     """
-    Create and return an argument parser with mutually exclusive arguments.
+    Create and return an argument parser.
     For device settings and filter options.
     """
     parser = CustomArgumentParser(
         description=NCPEEK_DESCRIPTION, formatter_class=RawTextHelpFormatter
     )
-    group = parser.add_mutually_exclusive_group(required=True)
+    return add_common_arguments(parser)
+
+
+def create_poll_argument_parser():
+    """
+    Create and return the argument parser of the poll command.
+    Same options as the main parser, plus the interval between cycles.
+    """
+    parser = CustomArgumentParser(
+        prog=f"ncpeek {POLL_COMMAND}",
+        description=POLL_DESCRIPTION,
+        formatter_class=RawTextHelpFormatter,
+    )
+    add_common_arguments(parser)
+
+    parser.add_argument(
+        "-i",
+        "--interval",
+        type=_positive_float,
+        help=INTERVAL_DESCRIPTION,
+    )
+
+    parser.add_argument(
+        "--changes-only",
+        action="store_true",
+        help=CHANGES_ONLY_DESCRIPTION,
+    )
+
+    parser.add_argument(
+        "--heartbeat",
+        type=_non_negative_int,
+        help=HEARTBEAT_DESCRIPTION,
+    )
+
+    return parser
+
+
+def create_serve_argument_parser():
+    """
+    Create and return the argument parser of the serve command.
+    Device settings, filters, circuit breaker and parse pool,
+    plus the listen address and cache ttl.
+    """
+    parser = CustomArgumentParser(
+        prog=f"ncpeek {SERVE_COMMAND}",
+        description=SERVE_DESCRIPTION,
+        formatter_class=RawTextHelpFormatter,
+    )
+    add_settings_arguments(parser)
+    add_breaker_arguments(parser)
+    add_parse_arguments(parser)
+
+    parser.add_argument(
+        "--address",
+        default=DEFAULT_SERVE_ADDRESS,
+        help=f"Address to listen on. Default: {DEFAULT_SERVE_ADDRESS}",
+    )
 
+    parser.add_argument(
+        "--port",
+        type=_port,
+        default=DEFAULT_SERVE_PORT,
+        help=f"Port to listen on. Default: {DEFAULT_SERVE_PORT}",
+    )
+
+    parser.add_argument(
+        "--cache-ttl",
+        type=_non_negative_float,
+        default=DEFAULT_CACHE_TTL,
+        help=CACHE_TTL_DESCRIPTION,
+    )
+
+    return parser
+
+
+def add_common_arguments(parser: argparse.ArgumentParser):
+    """
+    Add device settings, filter and execution options to a parser.
+    Filters can be repeated, at least one must be provided.
+    """
+    add_settings_arguments(parser)
+
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=_positive_int,
+        help=WORKERS_DESCRIPTION,
+    )
+
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=OUTPUT_FORMATS,
+        help=FORMAT_DESCRIPTION,
+    )
+
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help=TIMINGS_DESCRIPTION,
+    )
+
+    parser.add_argument(
+        "--deadline",
+        type=_positive_float,
+        help=DEADLINE_DESCRIPTION,
+    )
+
+    add_breaker_arguments(parser)
+    return add_parse_arguments(parser)
+
+
+def add_breaker_arguments(parser: argparse.ArgumentParser):
+    """Add the options of the circuit breaker to a parser."""
+    parser.add_argument(
+        "--breaker-failures",
+        type=_positive_int,
+        help=BREAKER_FAILURES_DESCRIPTION,
+    )
+
+    parser.add_argument(
+        "--breaker-state",
+        help=BREAKER_STATE_DESCRIPTION,
+    )
+
+    return parser
+
+
+def add_parse_arguments(parser: argparse.ArgumentParser):
+    """Add the options of the parse pool to a parser."""
+    parser.add_argument(
+        "--parse-workers",
+        type=_positive_int,
+        help=PARSE_WORKERS_DESCRIPTION,
+    )
+
+    parser.add_argument(
+        "--parse-threshold",
+        type=_non_negative_int,
+        default=DEFAULT_PARSE_THRESHOLD,
+        help=PARSE_THRESHOLD_DESCRIPTION,
+    )
+
+    return parser
+
+
+def add_settings_arguments(parser: argparse.ArgumentParser):
+    """Add the device settings and filter options to a parser."""
     parser.add_argument(
         "-d",
         "--device-settings",
         help=DEVICE_SETTINGS_DESCRIPTION,
     )
 
-    group.add_argument(
+    parser.add_argument(
         "-x",
         "--xml-filter",
+        dest=XML_FILTER_DEST,
+        action=AppendFilterAction,
         help=XML_FILTER_DESCRIPTION,
     )
 
-    group.add_argument(
+    parser.add_argument(
         "-p",
         "--xpath-filter",
+        dest=XPATH_FILTER_DEST,
+        action=AppendFilterAction,
         help=XPATH_FILTER_DESCRIPTION,
     )
+    parser.set_defaults(**{FILTERS_DEST: None})
+
+    parser.add_argument(
+        "--shard",
+        type=_shard_argument,
+        help=SHARD_DESCRIPTION,
+    )
 
     return parser
+
+
+def _shard_argument(value: str) -> tuple[int, int]:
+    """Parses --shard, reporting an invalid shard like other invalid arguments."""
+    try:
+        return parse_shard(value)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(str(err)) from err
+
+
+def _positive_int(value: str) -> int:
+    """Parses an option counting something, 1 or greater."""
+    number = _parse_number(int, value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be 1 or greater, got {value}")
+    return number
+
+
+def _non_negative_int(value: str) -> int:
+    """Parses an option where 0 is allowed, 0 or greater."""
+    number = _parse_number(int, value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or greater, got {value}")
+    return number
+
+
+def _positive_float(value: str) -> float:
+    """Parses an option in seconds, above 0."""
+    number = _parse_number(float, value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"must be above 0, got {value}")
+    return number
+
+
+def _non_negative_float(value: str) -> float:
+    """Parses an option in seconds where 0 is allowed, 0 or greater."""
+    number = _parse_number(float, value)
+    if not number >= 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or greater, got {value}")
+    return number
+
+
+def _port(value: str) -> int:
+    """Parses a TCP port, 0 lets the system pick a free one."""
+    number = _parse_number(int, value)
+    if not 0 <= number <= MAX_PORT:
+        raise argparse.ArgumentTypeError(
+            f"must be between 0 and {MAX_PORT}, got {value}"
+        )
+    return number
+
+
+def _parse_number(number_type: type, value: str):
+    try:
+        return number_type(value)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(
+            f"invalid {number_type.__name__} value: {value!r}"
+        ) from err
@@ -0,0 +1,162 @@
+"""
+Module for caching parsed netconf filters.
+Filters are validated and read once, then reused by the CLI,
+the API and the poll mode until their file changes.
+"""
+
+import os
+import threading
+from typing import Optional
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from ncpeek.netconf_filters import NetconfFilter
+from ncpeek.utils.file_utils import (
+    read_file,
+    resolve_path,
+    remove_path_from_filename,
+)
+from ncpeek.utils.text_utils import is_string_valid_xml
+from ncpeek.args.xpath_parse import extract_xpath
+
+DEFAULT_MAX_FILTERS = 256
+INLINE_FILTER_ID = "generic"
+
+
+@dataclass
+class FilterCache:
+    """
+    Keeps parsed filters, so each filter is validated and read only once.
+
+    Inline xml filters and xpath filters are keyed by their content.
+    Xml filter files are keyed by their resolved path and reloaded
+    when their modification time or size changes.
+    Up to max_filters are kept, the least recently used are dropped first.
+    """
+
+    max_filters: int = DEFAULT_MAX_FILTERS
+    _filters: OrderedDict = field(default_factory=OrderedDict, repr=False)
+    _paths: dict = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def xml_filter(self, xml_filter: str) -> NetconfFilter:
+        """
+        Returns the filter of an xml string or xml filename.
+
+        Args: xml_filter (str): The xml string or the filename holding it.
+        Returns: NetconfFilter: The validated filter.
+        """
+        inline_key = ("xml", xml_filter)
+        cached = self._get(inline_key)
+        if cached is not None:
+            return cached[1]
+
+        with self._lock:
+            known_file = xml_filter in self._paths
+        if not known_file and is_string_valid_xml(xml_string=xml_filter):
+            netconf_filter = NetconfFilter(
+                filter_id=INLINE_FILTER_ID, netconf_filter=xml_filter
+            )
+            self._put(inline_key, (None, netconf_filter))
+            return netconf_filter
+
+        return self._xml_file_filter(filename=xml_filter)
+
+    def xpath_filter(self, xpath_filter: str) -> NetconfFilter:
+        """
+        Returns the filter of an xpath expression.
+
+        Args: xpath_filter (str): Formats: <xpath> OR <namespace>:<xpath>
+        Returns: NetconfFilter: The filter.
+        """
+        key = ("xpath", xpath_filter)
+        cached = self._get(key)
+        if cached is not None:
+            return cached[1]
+
+        netconf_filter = NetconfFilter(
+            filter_id=remove_path_from_filename(filename=xpath_filter),
+            netconf_filter=extract_xpath(netconf_filter=xpath_filter),
+        )
+        self._put(key, (None, netconf_filter))
+        return netconf_filter
+
+    def clear(self) -> None:
+        """Forgets all the filters."""
+        with self._lock:
+            self._filters.clear()
+            self._paths.clear()
+
+    def size(self) -> int:
+        """Returns the number of filters kept."""
+        with self._lock:
+            return len(self._filters)
+
+    def _xml_file_filter(self, filename: str) -> NetconfFilter:
+        """Returns the filter of a file, reading it again only if it changed."""
+        path, version = self._stat_filter_file(filename=filename)
+        key = ("file", path)
+        cached = self._get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        try:
+            network_filter = read_file(filename=path)
+        except Exception as err:
+            raise ValueError(
+                f"Error opening file {err=}. Make sure a valid filename is provided for a xml filter."
+            ) from err
+        if not is_string_valid_xml(xml_string=network_filter):
+            raise ValueError("No valid XML found in file/string")
+
+        netconf_filter = NetconfFilter(
+            filter_id=remove_path_from_filename(filename=filename),
+            netconf_filter=network_filter,
+        )
+        self._put(key, (version, netconf_filter))
+        return netconf_filter
+
+    def _stat_filter_file(self, filename: str) -> tuple[str, Optional[tuple]]:
+        """
+        Returns the resolved path of the filter file and its version,
+        the modification time and size, or None if it can't be read.
+        The path is resolved once, and again only if the file disappears.
+        """
+        with self._lock:
+            path = self._paths.get(filename)
+        if path is not None:
+            version = _file_version(path)
+            if version is not None:
+                return path, version
+
+        path = resolve_path(filename=filename, kind="filter")
+        version = _file_version(path)
+        if version is not None:
+            with self._lock:
+                self._paths[filename] = path
+        return path, version
+
+    def _get(self, key: tuple) -> Optional[tuple]:
+        with self._lock:
+            cached = self._filters.get(key)
+            if cached is not None:
+                self._filters.move_to_end(key)
+            return cached
+
+    def _put(self, key: tuple, value: tuple) -> None:
+        with self._lock:
+            self._filters[key] = value
+            self._filters.move_to_end(key)
+            while len(self._filters) > self.max_filters:
+                self._filters.popitem(last=False)
+
+
+def _file_version(path: str) -> Optional[tuple]:
+    """Returns the modification time and size of a file, None if missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+FILTER_CACHE = FilterCache()
@@ -0,0 +1,132 @@
+"""
+Module for device inventories in NDJSON, one device settings per line.
+The file is read line by line and only the devices of the selected shard
+are kept, so very large inventories are never held whole in memory.
+A shard is selected by a stable hash of the host of each device, so
+separate processes given the same inventory poll disjoint slices of it.
+"""
+
+import os
+import zlib
+import threading
+from typing import Iterable, Iterator, Optional
+from dataclasses import dataclass, field
+from ncpeek.utils.file_utils import resolve_path
+from ncpeek.utils.text_utils import convert_json_to_dict
+
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+
+def parse_shard(shard: str) -> tuple[int, int]:
+    """
+    Parses a shard given as k/n, the k-th of n shards, counted from 1.
+
+    Args: shard (str): The shard, i.e. '2/4'.
+    Returns: tuple[int, int]: k and n.
+    Raises: ValueError: If the shard is not k/n with 1 <= k <= n.
+    """
+    try:
+        index, count = (int(part) for part in shard.split("/"))
+    except ValueError as err:
+        raise ValueError(f"Shard must be k/n, i.e. 1/4, got {shard!r}") from err
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard k/n must have 1 <= k <= n, got {shard!r}")
+    return index, count
+
+
+def shard_of(host: str, count: int) -> int:
+    """
+    Returns the shard of a host, from 1 to count.
+    crc32 is used rather than hash(), which changes between processes.
+    """
+    return zlib.crc32(host.encode("utf-8")) % count + 1
+
+
+def select_shard(
+    devices: Iterable[dict], shard: Optional[tuple[int, int]]
+) -> Iterator[dict]:
+    """
+    Yields the devices of a shard, all the devices without shard.
+
+    Args:
+        devices (Iterable[dict]): The device settings.
+        shard (tuple[int, int]): k and n of the shard to keep, see parse_shard.
+    """
+    if shard is None:
+        yield from devices
+        return
+    index, count = shard
+    for device in devices:
+        if shard_of(str(device.get("host") or ""), count) == index:
+            yield device
+
+
+def is_ndjson_inventory(filename: str) -> bool:
+    """Checks whether a device settings filename is an NDJSON inventory."""
+    return filename.lower().endswith(NDJSON_SUFFIXES)
+
+
+def iter_ndjson_devices(filename: str) -> Iterator[dict]:
+    """
+    Yields the device settings of an NDJSON file, parsing one line at a time.
+    Blank lines are skipped.
+
+    Raises: ValueError: If the file can't be read or a line is not an object.
+    """
+    try:
+        file = open(filename, "r", encoding="utf-8")
+    except OSError as err:
+        raise ValueError(f"Unable to open file. Error: {err=}") from err
+    with file:
+        for number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                device = convert_json_to_dict(json_string=line)
+            except Exception as err:
+                raise ValueError(f"{filename}:{number}: invalid JSON") from err
+            if not isinstance(device, dict):
+                raise ValueError(f"{filename}:{number}: expected a JSON object")
+            yield device
+
+
+@dataclass
+class DeviceInventory:
+    """
+    The devices of a shard of an NDJSON inventory.
+
+    filename: the inventory, resolved like the json device settings.
+    shard: k and n of the shard to keep, None keeps every device.
+
+    The devices are read on first use and read again
+    when the modification time or size of the file changes.
+    """
+
+    filename: str
+    shard: Optional[tuple[int, int]] = None
+    _path: str = field(init=False, repr=False)
+    _devices: Optional[list] = field(default=None, init=False, repr=False)
+    _stat: Optional[tuple] = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def __post_init__(self) -> None:
+        self._path = resolve_path(filename=self.filename, kind="settings")
+
+    def devices(self) -> list[dict]:
+        """Returns the devices of the shard, reading the file if it changed."""
+        stat = _file_stat(self._path)
+        with self._lock:
+            if self._devices is None or stat != self._stat:
+                self._devices = list(
+                    select_shard(iter_ndjson_devices(self._path), self.shard)
+                )
+                self._stat = stat
+            return self._devices
+
+
+def _file_stat(path: str) -> Optional[tuple]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
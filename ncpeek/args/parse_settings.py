@@ -1,92 +1,236 @@
-from typing import Optional
-from dataclasses import dataclass
-from ncpeek.utils.file_utils import (
-    read_filter,
-    read_settings,
-    remove_path_from_filename,
+from typing import Optional, Union
+from argparse import Namespace
+from dataclasses import dataclass, field
+from ncpeek.netconf_filters import NetconfFilter
+from ncpeek.utils.file_utils import read_settings
+from ncpeek.utils.text_utils import convert_json_to_dict
+from ncpeek.args.filter_cache import FILTER_CACHE
+from ncpeek.args.inventory import (
+    DeviceInventory,
+    is_ndjson_inventory,
+    select_shard,
 )
-from ncpeek.utils.text_utils import (
-    is_string_valid_xml,
-    convert_json_to_dict,
+from ncpeek.args.arg_parser import (
+    XML_FILTER_DEST,
+    create_argument_parser,
+    create_poll_argument_parser,
+    create_serve_argument_parser,
 )
-from ncpeek.args.xpath_parse import extract_xpath
-from ncpeek.args.arg_parser import create_argument_parser
 
 
 @dataclass
 class SettingsParser:
     """
     A class to parse and handle settings for netconf client.
+    Several filters can be set, they are kept in the order provided.
     """
 
-    _filter_id: Optional[str] = None
-    _network_filter: Optional[str] = None
-    _device_settings: Optional[str] = None
-
-    def parse_arguments(self) -> None:
+    _filters: list[NetconfFilter] = field(default_factory=list)
+    _device_settings: Optional[Union[list, DeviceInventory]] = None
+    _shard: Optional[tuple[int, int]] = None
+    _workers: Optional[int] = None
+    _interval: Optional[float] = None
+    _output_format: Optional[str] = None
+    _timings: bool = False
+    _changes_only: bool = False
+    _heartbeat: Optional[int] = None
+    _deadline: Optional[float] = None
+    _breaker_failures: Optional[int] = None
+    _breaker_state: Optional[str] = None
+    _parse_workers: Optional[int] = None
+    _parse_threshold: Optional[int] = None
+
+    def parse_arguments(self, argv: Optional[list] = None) -> None:
         """Parse command-line arguments and set device settings and filters."""
-        args = create_argument_parser().parse_args()
+        parser = create_argument_parser()
+        args = parser.parse_args(argv)
+        self._check_filter_arguments(parser=parser, args=args)
+        self._apply_arguments(args)
+
+    def parse_poll_arguments(self, argv: Optional[list] = None) -> None:
+        """Parse the arguments of the poll command."""
+        parser = create_poll_argument_parser()
+        args = parser.parse_args(argv)
+        self._check_filter_arguments(parser=parser, args=args)
+        self._apply_arguments(args)
+        self._interval = args.interval
+
+    def parse_serve_arguments(self, argv: Optional[list] = None) -> Namespace:
+        """
+        Parse the arguments of the serve command.
+        Sets device settings and filters, and returns the parsed arguments
+        for the options of the exporter.
+        """
+        parser = create_serve_argument_parser()
+        args = parser.parse_args(argv)
+        self._check_filter_arguments(parser=parser, args=args)
+        self._shard = args.shard
         self._device_settings = self._load_settings(args.device_settings)
-
-        if args.xml_filter:
-            self._parse_xml_filter(args.xml_filter)
-        elif args.xpath_filter:
-            self._parse_xpath_filter(args.xpath_filter)
+        self._set_argument_filters(args)
+        return args
 
     def set_device_settings(self, device_settings: str) -> None:
         """Set device settings from a json file."""
         self._device_settings = self._load_settings(device_settings)
 
-    def set_xml_filter(self, xml_filter: str) -> None:
-        """Set XML filter from a provided string."""
-        self._parse_xml_filter(xml_filter)
-
-    def set_xpath_filter(self, xpath_filter: str) -> None:
-        """Set XPath filter from a provided string."""
-        self._parse_xpath_filter(xpath_filter)
-
-    def get_device_settings(self) -> str:
-        """Get the device settings."""
+    def set_shard(self, shard: Optional[tuple[int, int]]) -> None:
+        """
+        Set the shard of the devices to use, k and n from parse_shard.
+        Applies to the device settings set afterwards.
+        """
+        self._shard = shard
+
+    def set_xml_filter(self, xml_filter: Union[list, str]) -> None:
+        """Set XML filter(s) from provided string(s), replacing previous filters."""
+        self._filters = []
+        self.add_xml_filter(xml_filter)
+
+    def set_xpath_filter(self, xpath_filter: Union[list, str]) -> None:
+        """Set XPath filter(s) from provided string(s), replacing previous filters."""
+        self._filters = []
+        self.add_xpath_filter(xpath_filter)
+
+    def add_xml_filter(self, xml_filter: Union[list, str]) -> None:
+        """Add XML filter(s) from provided string(s)."""
+        for filter_id in _as_list(xml_filter):
+            self._filters.append(self._parse_xml_filter(filter_id))
+
+    def add_xpath_filter(self, xpath_filter: Union[list, str]) -> None:
+        """Add XPath filter(s) from provided string(s)."""
+        for filter_id in _as_list(xpath_filter):
+            self._filters.append(self._parse_xpath_filter(filter_id))
+
+    def get_device_settings(self) -> list[dict]:
+        """
+        Get the device settings, of the selected shard only.
+        NDJSON inventories are read again if their file changed.
+        """
+        if isinstance(self._device_settings, DeviceInventory):
+            return self._device_settings.devices()
         if not self._device_settings:
             raise ValueError("Device Settings not provided")
         return self._device_settings
 
-    def get_filter_id(self) -> str:
-        """Get the filter id."""
-        if not self._filter_id:
+    def get_filters(self) -> list[NetconfFilter]:
+        """Get all filters."""
+        if not self._filters:
             raise ValueError("filter not provided")
-        return self._filter_id
-
-    def get_netconf_filter(self) -> str:
-        """Get the network filter."""
-        return self._network_filter
-
-    def _parse_xml_filter(self, filter_id: str) -> None:
-        """Parse XML filter from a provided string."""
-        if is_string_valid_xml(xml_string=filter_id):
-            self._filter_id = "generic"
-            self._network_filter = filter_id
-            return
-
-        try:
-            self._set_filter_id(filter_id=filter_id)
-            network_filter = read_filter(filename=filter_id)
-        except Exception as err:
-            raise ValueError(
-                f"Error opening file {err=}. Make sure a valid filename is provided for a xml filter."
-            ) from err
-        if is_string_valid_xml(xml_string=network_filter):
-            self._network_filter = network_filter
-        else:
-            raise ValueError("No valid XML found in file/string")
-
-    def _parse_xpath_filter(self, filter_id: str) -> None:
-        """Parse XPath filter from a provided string."""
-        self._set_filter_id(filter_id=filter_id)
-        self._network_filter = extract_xpath(netconf_filter=filter_id)
-
-    def _load_settings(self, device_settings: str) -> dict:
-        """Load settings from a provided string."""
+        return self._filters
+
+    def get_filter_id(self) -> str:
+        """Get the filter id of the first filter."""
+        return self.get_filters()[0].filter_id
+
+    def get_workers(self) -> Optional[int]:
+        """Get the number of concurrent workers, if provided."""
+        return self._workers
+
+    def get_output_format(self) -> Optional[str]:
+        """Get the output format, if provided."""
+        return self._output_format
+
+    def get_timings(self) -> bool:
+        """Get whether the timings of each device were requested."""
+        return self._timings
+
+    def get_interval(self) -> Optional[float]:
+        """Get the seconds between poll cycles, if provided."""
+        return self._interval
+
+    def get_changes_only(self) -> bool:
+        """Get whether only changed records are emitted, poll command only."""
+        return self._changes_only
+
+    def get_heartbeat(self) -> Optional[int]:
+        """Get the cycles between emissions of unchanged records, if provided."""
+        return self._heartbeat
+
+    def get_deadline(self) -> Optional[float]:
+        """Get the seconds each run has to finish, if provided."""
+        return self._deadline
+
+    def get_breaker_failures(self) -> Optional[int]:
+        """Get the consecutive failures after which a device is skipped."""
+        return self._breaker_failures
+
+    def get_breaker_state(self) -> Optional[str]:
+        """Get the file keeping the state of the circuit breaker, if provided."""
+        return self._breaker_state
+
+    def get_parse_workers(self) -> Optional[int]:
+        """Get the number of processes parsing large replies, if provided."""
+        return self._parse_workers
+
+    def get_parse_threshold(self) -> Optional[int]:
+        """Get the reply size from which replies go to the parse pool."""
+        return self._parse_threshold
+
+    def get_netconf_filter(self) -> Optional[Union[str, tuple]]:
+        """Get the network filter of the first filter."""
+        if not self._filters:
+            return None
+        return self._filters[0].netconf_filter
+
+    @staticmethod
+    def _check_filter_arguments(parser, args: Namespace) -> None:
+        """Exit with the help message if no filter was provided."""
+        if not args.xml_filter and not args.xpath_filter:
+            parser.error(
+                "one of the arguments -x/--xml-filter -p/--xpath-filter is required"
+            )
+
+    def _apply_arguments(self, args: Namespace) -> None:
+        """Set device settings, filters and options from parsed arguments."""
+        self._shard = args.shard
+        self._device_settings = self._load_settings(args.device_settings)
+        self._workers = args.workers
+        self._output_format = args.format
+        self._timings = args.timings
+        self._deadline = args.deadline
+        self._breaker_failures = args.breaker_failures
+        self._breaker_state = args.breaker_state
+        self._parse_workers = args.parse_workers
+        self._parse_threshold = args.parse_threshold
+        # Only the poll command has these options
+        self._changes_only = getattr(args, "changes_only", False)
+        self._heartbeat = getattr(args, "heartbeat", None)
+        self._set_argument_filters(args)
+
+    def _set_argument_filters(self, args: Namespace) -> None:
+        """Set the filters of -x and -p, in the order they were given."""
+        self._filters = []
+        for dest, filter_id in args.filters or []:
+            if dest == XML_FILTER_DEST:
+                self.add_xml_filter(filter_id)
+            else:
+                self.add_xpath_filter(filter_id)
+
+    def _parse_xml_filter(self, filter_id: str) -> NetconfFilter:
+        """Parse XML filter from a provided string, reusing cached filters."""
+        return FILTER_CACHE.xml_filter(xml_filter=filter_id)
+
+    def _parse_xpath_filter(self, filter_id: str) -> NetconfFilter:
+        """Parse XPath filter from a provided string, reusing cached filters."""
+        return FILTER_CACHE.xpath_filter(xpath_filter=filter_id)
+
+    def _load_settings(
+        self, device_settings: Union[list, str]
+    ) -> Optional[Union[list, DeviceInventory]]:
+        """
+        Load settings from a provided string, keeping the selected shard.
+        NDJSON inventories are read when the devices are first needed.
+        """
+        if isinstance(device_settings, str) and is_ndjson_inventory(
+            device_settings
+        ):
+            return DeviceInventory(filename=device_settings, shard=self._shard)
+        devices = self._parse_settings(device_settings)
+        if self._shard is None or not isinstance(devices, list):
+            return devices
+        return list(select_shard(devices, self._shard))
+
+    @staticmethod
+    def _parse_settings(device_settings: Union[list, str]):
         if isinstance(device_settings, list):
             return device_settings
         if isinstance(device_settings, str):
@@ -98,5 +242,9 @@ class SettingsParser:
                     read_settings(filename=device_settings)
                 )
 
-    def _set_filter_id(self, filter_id: str) -> str:
-        self._filter_id = remove_path_from_filename(filename=filter_id)
+
+def _as_list(value: Union[list, str]) -> list:
+    """Wraps a single filter in a list."""
+    if isinstance(value, str):
+        return [value]
+    return list(value)
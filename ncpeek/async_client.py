@@ -0,0 +1,118 @@
+import asyncio
+from typing import Optional
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from ncpeek.client import NetconfClient, _remaining
+from ncpeek.device_errors import error_records
+from ncpeek.utils.text_utils import convert_dict_to_json
+
+DEFAULT_MAX_CONCURRENCY = 100
+
+
+@dataclass
+class AsyncNetconfClient(NetconfClient):
+    """
+    Asyncio flavour of NetconfClient.
+
+    Settings and filters are set with the same methods as NetconfClient,
+    only fetch is a coroutine.
+
+    ncclient sessions are blocking, so each device operation runs on a
+    thread pool owned by the client and sized by max_concurrency.
+    An asyncio.Semaphore with the same size bounds the in-flight devices,
+    held until their thread finishes, so the event loop never holds more
+    threads than max_concurrency, no matter how many devices are polled.
+
+    device_timeout is the number of seconds a single device has to
+    finish, None waits for the timeout of the device settings.
+    deadline, as for NetconfClient, is the number of seconds each fetch
+    has, and caps device_timeout of the devices still running.
+    Like NetconfClient, a device that fails or exceeds device_timeout
+    or the deadline gives error records, see ncpeek.device_errors.
+    """
+
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    device_timeout: Optional[float] = None
+
+    async def fetch(self) -> str:
+        """Fetchs data from network devices without blocking the event loop.
+
+        Returns:
+            str: rpc reply from network devices
+        """
+        self._operation = "fetch"
+        return await self._run_async()
+
+    async def _run_async(self) -> str:
+        """Runs the operations concurrently and returns results in JSON format."""
+        if self.max_concurrency < 1:
+            raise ValueError(
+                f"max_concurrency must be 1 or greater, got {self.max_concurrency}"
+            )
+        devices = self._load_settings()
+        deadline = self._run_deadline()
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_concurrency, max(len(devices), 1))
+        )
+        tasks = [
+            asyncio.ensure_future(
+                self._process_device_async(device, semaphore, executor, deadline)
+            )
+            for device in devices
+        ]
+        try:
+            parsed_devices = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        results = []
+        for parsed_data in parsed_devices:
+            results += parsed_data
+        return convert_dict_to_json(results)
+
+    async def _process_device_async(
+        self,
+        device: dict,
+        semaphore: asyncio.Semaphore,
+        executor: ThreadPoolExecutor,
+        deadline: Optional[float] = None,
+    ) -> list:
+        """
+        Processes a single device once a concurrency slot is free,
+        returning error records if it fails or exceeds device_timeout
+        or the deadline, whichever comes first.
+
+        A thread can't be stopped, so a timed out device keeps its slot
+        until its thread finishes, bounded by the timeout of its session.
+        The executor never has more devices than threads.
+        """
+        await semaphore.acquire()
+        loop = asyncio.get_running_loop()
+        operation = loop.run_in_executor(
+            executor, self._process_device_isolated, device, deadline
+        )
+        operation.add_done_callback(lambda _: semaphore.release())
+        timeout = self.device_timeout
+        remaining = _remaining(deadline)
+        deadline_first = remaining is not None and (
+            timeout is None or remaining < timeout
+        )
+        if deadline_first:
+            timeout = remaining
+        try:
+            return await asyncio.wait_for(asyncio.shield(operation), timeout=timeout)
+        except asyncio.TimeoutError:
+            if deadline_first:
+                return error_records(
+                    device, self._filters, self._deadline_error(device)
+                )
+            error = TimeoutError(
+                f"Device {device.get('host')} did not finish within {self.device_timeout} seconds"
+            )
+            return error_records(device, self._filters, error)
@@ -0,0 +1,117 @@
+"""
+Module for emitting only the records that changed between cycles.
+Each record is identified by its device, field and name, and remembered
+by a fingerprint of its values. Unchanged records are dropped until
+their values change or their heartbeat is due.
+"""
+
+import hashlib
+import threading
+from typing import Any, Hashable, Iterable
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from ncpeek.utils.text_utils import convert_dict_to_json_bytes
+
+DEFAULT_MAX_RECORDS = 50_000
+KEY_FIELDS = ("device", "field", "name")
+
+
+@dataclass
+class ChangeFilter:
+    """
+    Drops records equal to the last emitted record with the same key.
+
+    heartbeat: cycles after which an unchanged record is emitted again,
+        0 emits unchanged records never again.
+    max_records: records remembered, the least recently seen are
+        forgotten first and emitted again when they come back.
+
+    Call next_cycle() before the records of each cycle, then select()
+    the records to emit. Safe to use from several threads.
+    """
+
+    heartbeat: int = 0
+    max_records: int = DEFAULT_MAX_RECORDS
+    _cycle: int = field(default=0, repr=False)
+    _state: OrderedDict = field(default_factory=OrderedDict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.heartbeat < 0:
+            raise ValueError(f"heartbeat must be 0 or greater, got {self.heartbeat}")
+        if self.max_records < 1:
+            raise ValueError(
+                f"max_records must be 1 or greater, got {self.max_records}"
+            )
+
+    def next_cycle(self) -> None:
+        """Starts a new cycle, counting towards the heartbeat."""
+        with self._lock:
+            self._cycle += 1
+
+    def select(self, records: Iterable[dict]) -> list[dict]:
+        """
+        Returns the records to emit, new, changed or due to their heartbeat.
+
+        Args: records (Iterable[dict]): The records of a device.
+        Returns: list[dict]: The records to emit, in the same order.
+        """
+        return [record for record in records if self.changed(record)]
+
+    def changed(self, record: dict) -> bool:
+        """
+        Checks whether a record has to be emitted, and remembers it if so.
+
+        Args: record (dict): A record of a parser.
+        Returns: bool: True if the record is new, changed or due.
+        """
+        key = record_key(record)
+        fingerprint = record_fingerprint(record)
+        with self._lock:
+            previous = self._state.get(key)
+            if previous is not None:
+                self._state.move_to_end(key)
+                last_fingerprint, emitted_cycle = previous
+                if last_fingerprint == fingerprint and not self._heartbeat_due(
+                    emitted_cycle
+                ):
+                    return False
+            self._state[key] = (fingerprint, self._cycle)
+            if len(self._state) > self.max_records:
+                self._state.popitem(last=False)
+            return True
+
+    def clear(self) -> None:
+        """Forgets all the records, so all are emitted on the next cycle."""
+        with self._lock:
+            self._state.clear()
+
+    def size(self) -> int:
+        """Returns the number of records remembered."""
+        with self._lock:
+            return len(self._state)
+
+    def _heartbeat_due(self, emitted_cycle: int) -> bool:
+        return bool(self.heartbeat) and self._cycle - emitted_cycle >= self.heartbeat
+
+
+def record_key(record: Any) -> tuple:
+    """Returns the identity of a record, its device, field and name."""
+    if isinstance(record, dict):
+        return tuple(record.get(key_field) for key_field in KEY_FIELDS)
+    return tuple(getattr(record, key_field, None) for key_field in KEY_FIELDS)
+
+
+def record_fingerprint(record: Any) -> Hashable:
+    """
+    Returns a fingerprint of the values of a record.
+    Flat and frozen records are kept as their values, compared by equality
+    since different values can share the same hash(). Records with nested
+    dictionaries or lists are fingerprinted by a digest of their JSON encoding.
+    """
+    fingerprint = tuple(record.items()) if isinstance(record, dict) else record
+    try:
+        hash(fingerprint)
+    except TypeError:
+        return hashlib.blake2b(convert_dict_to_json_bytes(record)).digest()
+    return fingerprint
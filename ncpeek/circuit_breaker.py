@@ -0,0 +1,212 @@
+"""
+Module for skipping the devices that keep failing.
+After failure_threshold consecutive connect or rpc failures, the circuit
+of a host opens and the device is skipped, without waiting for its
+timeout, until a probe is due. Each failed probe doubles the delay until
+the next one, up to max_delay, with some jitter so the devices that
+failed together are not probed together.
+The state can be kept in a file, to survive separate CLI invocations,
+and shared by the processes polling separate shards of the devices.
+"""
+
+import os
+import json
+import time
+import random
+import threading
+from typing import Iterator, Optional
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+try:
+    import fcntl
+except ImportError:  # Windows, the state file is written without lock.
+    fcntl = None
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_BASE_DELAY = 30.0
+DEFAULT_MAX_DELAY = 1800.0
+DEFAULT_JITTER = 0.2
+
+
+class CircuitOpen(ConnectionError):
+    """A device is skipped, its circuit is open until its next probe."""
+
+
+@dataclass
+class CircuitBreaker:
+    """
+    Tracks the consecutive failures of each host. Devices sharing a host,
+    on other ports, share its failures and are skipped together.
+
+    failure_threshold: consecutive failures that open the circuit.
+    base_delay: seconds until the first probe once the circuit opens.
+    max_delay: seconds between probes are doubled up to max_delay.
+    jitter: fraction of the delay added or removed at random.
+    state_file: JSON file the state is loaded from and saved to on every
+        change, None keeps it in memory only. Processes can share it,
+        each change only updates its host in the file.
+
+    Call check() before connecting to a host, then record_success() or
+    record_failure() with the outcome. Safe to use from several threads.
+    """
+
+    failure_threshold: int = DEFAULT_FAILURE_THRESHOLD
+    base_delay: float = DEFAULT_BASE_DELAY
+    max_delay: float = DEFAULT_MAX_DELAY
+    jitter: float = DEFAULT_JITTER
+    state_file: Optional[str] = None
+    # host -> [consecutive failures, time.time() of the next probe]
+    _hosts: dict = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.failure_threshold < 1:
+            raise ValueError(
+                "failure_threshold must be 1 or greater, "
+                f"got {self.failure_threshold}"
+            )
+        if not 0 < self.base_delay <= self.max_delay:
+            raise ValueError(
+                "base_delay must be above 0 and at most max_delay, "
+                f"got {self.base_delay} and {self.max_delay}"
+            )
+        if not 0 <= self.jitter < 1:
+            raise ValueError(f"jitter must be in [0, 1), got {self.jitter}")
+        if self.state_file:
+            self._hosts.update(_read_state(self.state_file))
+
+    def check(self, host: str) -> None:
+        """
+        Lets a host through if its circuit is closed or a probe is due.
+        A single probe goes through, the next one is reserved until
+        the probe is recorded. With a state file, the reservation is
+        saved, so processes sharing the file don't probe together.
+
+        Args: host (str): The host of the device.
+        Raises: CircuitOpen: If the host has to be skipped.
+        """
+        now = time.time()
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None or state[0] < self.failure_threshold:
+                return
+            if now >= state[1] and self._reserve_probe(host, now):
+                return
+            failures, retry_at = self._hosts[host]
+            raise CircuitOpen(
+                f"Device {host} skipped after {failures} consecutive "
+                f"failures, next probe in {retry_at - now:.0f} seconds"
+            )
+
+    def record_success(self, host: str) -> None:
+        """Closes the circuit of a host, forgetting its failures."""
+        with self._lock:
+            if self._hosts.pop(host, None) is not None:
+                self._save(host)
+
+    def record_failure(self, host: str) -> None:
+        """Counts a failure of a host, opening its circuit at the threshold."""
+        with self._lock:
+            failures = self._hosts.get(host, (0,))[0] + 1
+            retry_at = 0.0
+            if failures >= self.failure_threshold:
+                retry_at = time.time() + self._delay(failures)
+            self._hosts[host] = [failures, retry_at]
+            self._save(host)
+
+    def is_open(self, host: str) -> bool:
+        """Checks whether a host is skipped, at least until its next probe."""
+        with self._lock:
+            state = self._hosts.get(host)
+            return state is not None and state[0] >= self.failure_threshold
+
+    def _delay(self, failures: int) -> float:
+        """Seconds until the next probe, doubled on every failed probe."""
+        exponent = min(failures - self.failure_threshold, 32)
+        delay = min(self.base_delay * 2**exponent, self.max_delay)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _reserve_probe(self, host: str, now: float) -> bool:
+        """
+        Reserves the probe of a host due at now, returning whether it
+        goes through. Must be called holding the lock. With a state file,
+        the state of the host is read again under the file lock, and the
+        probe is skipped if another process reserved it first.
+        """
+        if not self.state_file:
+            state = self._hosts[host]
+            state[1] = now + self._delay(state[0])
+            return True
+        with _file_lock(f"{self.state_file}.lock"):
+            hosts = _read_state(self.state_file)
+            state = hosts.get(host)
+            if state is None or state[0] < self.failure_threshold:
+                # Closed by another process.
+                self._hosts.pop(host, None)
+                return True
+            self._hosts[host] = state
+            if now < state[1]:
+                return False
+            state[1] = now + self._delay(state[0])
+            self._write_state(hosts)
+            return True
+
+    def _save(self, host: str) -> None:
+        """
+        Writes the state of a host to the state file, replacing it at once.
+        The file is read again under a lock and only the host is updated,
+        so the hosts of other processes sharing the file are kept.
+        """
+        if not self.state_file:
+            return
+        with _file_lock(f"{self.state_file}.lock"):
+            hosts = _read_state(self.state_file)
+            if host in self._hosts:
+                hosts[host] = self._hosts[host]
+            else:
+                hosts.pop(host, None)
+            self._write_state(hosts)
+
+    def _write_state(self, hosts: dict) -> None:
+        """Must be called holding the file lock."""
+        temp_file = f"{self.state_file}.{os.getpid()}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as file:
+            json.dump(hosts, file)
+        os.replace(temp_file, self.state_file)
+
+
+@contextmanager
+def _file_lock(lock_file: str) -> Iterator[None]:
+    """Holds an exclusive lock on lock_file, shared between processes."""
+    if fcntl is None:
+        yield
+        return
+    with open(lock_file, "a", encoding="utf-8") as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def _read_state(state_file: str) -> dict:
+    """
+    Reads the state saved by a breaker. A missing or damaged state file
+    starts with every circuit closed, like a new breaker.
+    """
+    try:
+        with open(state_file, encoding="utf-8") as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(state, dict):
+        return {}
+    hosts = {}
+    for host, value in state.items():
+        try:
+            failures, retry_at = value
+            hosts[host] = [int(failures), float(retry_at)]
+        except (TypeError, ValueError):
+            continue
+    return hosts
@@ -1,55 +1,171 @@
 import sys
-from typing import Optional, Union
+import math
+import time
+from typing import Callable, Iterator, Optional, TextIO, Union
 from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from ncpeek.utils.line_protocol import write_line_protocol
 from ncpeek.utils.text_utils import (
-    convert_xml_to_dict,
     convert_dict_to_json,
+    convert_dict_to_json_bytes,
+    write_json_line,
+    write_bytes_line,
 )
 from ncpeek.netconf_devices import NetconfDevice
+from ncpeek.netconf_filters import NetconfFilter
 from ncpeek.args.parse_settings import SettingsParser
-from ncpeek.factory.factory_parsers import get_parser
+from ncpeek.args.arg_parser import (
+    POLL_COMMAND,
+    SERVE_COMMAND,
+    JSON_FORMAT,
+    INFLUX_FORMAT,
+    OUTPUT_FORMATS,
+)
 from ncpeek.netconf_session import NetconfSession
+from ncpeek.session_pool import SessionPool
+from ncpeek.parse_pool import ParsePool, parse_reply
+from ncpeek.timings import DeviceTimings, is_timings_record
+from ncpeek.utils.record_utils import record_to_dict
+from ncpeek.change_filter import ChangeFilter
+from ncpeek.device_errors import DeadlineExceeded, error_records
+from ncpeek.circuit_breaker import CircuitBreaker
 
 DEFAULT_NETCONF_OPERATION = "fetch"
+DEFAULT_MAX_WORKERS = 1
+DEFAULT_OUTPUT_FORMAT = JSON_FORMAT
 
 
 @dataclass
 class NetconfClient:
     """
     Main class for handling NetconfClient operations.
+
+    max_workers sets how many devices are processed concurrently.
+    The default of 1 keeps the sequential behaviour.
+
+    session_pool keeps netconf sessions open between fetch() calls.
+    Call close() to close its sessions once the client is not needed.
+
+    parse_pool parses the large replies in worker processes, see
+    ncpeek.parse_pool.ParsePool. close() also stops its processes.
+
+    output_format selects how write_results() writes records,
+    a single JSON array (json), one JSON object per line (ndjson)
+    or InfluxDB line protocol (influx).
+
+    collect_timings adds a record with the timings of each device
+    after its records, see ncpeek.timings.DeviceTimings.
+    timings_callback receives the DeviceTimings of each device once
+    its replies are parsed. Timings are only measured when one is set.
+
+    change_filter drops the records unchanged since the previous
+    fetch, for clients kept running. See ncpeek.change_filter.
+
+    deadline is the number of seconds each fetch has, None waits for
+    every device. A device that fails or misses the deadline gives error
+    records instead of its records, see ncpeek.device_errors, and the
+    records of the other devices are kept.
+
+    circuit_breaker skips the devices whose connection or operations
+    keep failing, see ncpeek.circuit_breaker.CircuitBreaker.
     """
 
     _settings = SettingsParser()
     _operation: Optional[str] = DEFAULT_NETCONF_OPERATION
-    _filter_id: Optional[str] = None
-    _netconf_filter: Optional[str] = None
+    _filters: Optional[list] = None
+    max_workers: int = DEFAULT_MAX_WORKERS
+    session_pool: Optional[SessionPool] = None
+    parse_pool: Optional[ParsePool] = None
+    output_format: str = DEFAULT_OUTPUT_FORMAT
+    collect_timings: bool = False
+    timings_callback: Optional[Callable[[DeviceTimings], None]] = None
+    change_filter: Optional[ChangeFilter] = None
+    deadline: Optional[float] = None
+    circuit_breaker: Optional[CircuitBreaker] = None
 
-    def execute_cli(self) -> str:
+    def execute_cli(self, argv: Optional[list] = None) -> str:
         """Executes command-line interface."""
-        self._settings.parse_arguments()
+        self.setup_cli(argv=argv)
         return self._run()
 
-    def set_devices_settings(self, device_settings: Union[list, str]) -> None:
+    def setup_cli(self, argv: Optional[list] = None, poll: bool = False) -> None:
+        """Loads settings, filters and options from command-line arguments."""
+        if poll:
+            self._settings.parse_poll_arguments(argv)
+        else:
+            self._settings.parse_arguments(argv)
+        if self._settings.get_workers() is not None:
+            self.max_workers = self._settings.get_workers()
+        self.output_format = (
+            self._settings.get_output_format() or self.output_format
+        )
+        self.collect_timings = (
+            self._settings.get_timings() or self.collect_timings
+        )
+        if self._settings.get_deadline() is not None:
+            self.deadline = self._settings.get_deadline()
+        if self._settings.get_parse_workers() is not None:
+            self.parse_pool = ParsePool(
+                workers=self._settings.get_parse_workers(),
+                threshold=self._settings.get_parse_threshold(),
+            )
+        if self._settings.get_breaker_failures() is not None:
+            self.circuit_breaker = CircuitBreaker(
+                failure_threshold=self._settings.get_breaker_failures(),
+                state_file=self._settings.get_breaker_state(),
+            )
+        if self._settings.get_changes_only():
+            self.change_filter = ChangeFilter(
+                heartbeat=self._settings.get_heartbeat() or 0
+            )
+
+    def get_poll_interval(self) -> Optional[float]:
+        """Returns the --interval given to setup_cli(poll=True), if any."""
+        return self._settings.get_interval()
+
+    def set_devices_settings(
+        self,
+        device_settings: Union[list, str],
+        shard: Optional[tuple[int, int]] = None,
+    ) -> None:
         """
         API: sets devices settings directly.
         Can be a python list, a json string or a string
         with the name of the json file.
+        Files ending in .ndjson or .jsonl hold one device per line,
+        see ncpeek.args.inventory.
+        shard keeps only the devices of shard k of n, given as (k, n).
         See examples under ncpeek/devices
         """
+        self._settings.set_shard(shard)
         self._settings.set_device_settings(device_settings)
 
-    def set_xml_filter(self, xml_filter: str) -> None:
+    def set_xml_filter(self, xml_filter: Union[list, str]) -> None:
         """
         API: sets XML filter directly.
         Can be the filename of a xml file (relative and absolute paths accepted)
         or can be a python string with valid xml.
+        A list of them sets several filters, fetched over the same session.
+        Replaces any filter previously set.
         """
         self._settings.set_xml_filter(xml_filter)
 
-    def set_xpath_filter(self, xpath_filter: str) -> None:
-        """API: sets XPath filter directly."""
+    def set_xpath_filter(self, xpath_filter: Union[list, str]) -> None:
+        """
+        API: sets XPath filter directly.
+        A list of them sets several filters, fetched over the same session.
+        Replaces any filter previously set.
+        """
         self._settings.set_xpath_filter(xpath_filter)
 
+    def add_xml_filter(self, xml_filter: Union[list, str]) -> None:
+        """API: adds XML filter(s) to the filters already set."""
+        self._settings.add_xml_filter(xml_filter)
+
+    def add_xpath_filter(self, xpath_filter: Union[list, str]) -> None:
+        """API: adds XPath filter(s) to the filters already set."""
+        self._settings.add_xpath_filter(xpath_filter)
+
     def fetch(self) -> str:
         """Fetchs data from network device
 
@@ -59,42 +175,354 @@ class NetconfClient:
         self._operation = "fetch"
         return self._run()
 
+    def fetch_iter(self) -> Iterator[dict]:
+        """Fetchs data from network devices, one record at a time.
+
+        Records of a device are yielded as soon as its reply is parsed.
+        When max_workers is above 1, devices come in the order they finish.
+
+        Returns:
+            Iterator[dict]: parsed records from network devices
+        """
+        self._operation = "fetch"
+        devices = self._load_settings()
+        for parsed_data in self._iter_devices(devices):
+            yield from map(record_to_dict, parsed_data)
+
+    def fetch_device(
+        self, device: dict, netconf_filters: list[NetconfFilter]
+    ) -> list:
+        """Fetchs data from a single device with the filters given.
+
+        Device settings and filters of the client are left untouched,
+        so several threads can fetch different devices and filters.
+
+        Args:
+            device (dict): The settings of the device.
+            netconf_filters (list[NetconfFilter]): The filters to fetch.
+
+        Returns:
+            list: parsed records of the device, dictionaries or
+                the record types of ncpeek.records
+        """
+        return self._process_device(device, netconf_filters=netconf_filters)
+
+    def write_results(self, output: TextIO) -> None:
+        """
+        Fetchs data from network devices and writes it to output
+        using output_format. With ndjson and influx, the records of
+        each device are written and flushed as soon as it is parsed.
+        JSON is encoded by the fastest JSON backend installed.
+        With collect_timings, the encoding time of each device
+        is added to its timings record.
+        """
+        if self.output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format: {self.output_format}")
+        if self.collect_timings:
+            self._write_results_with_timings(output=output)
+            return
+
+        match self.output_format:
+            case "json":
+                self._operation = "fetch"
+                write_json_line(output=output, data=self._collect_results())
+            case _:
+                self._operation = "fetch"
+                devices = self._load_settings()
+                for parsed_data in self._iter_devices(devices):
+                    self._write_records(output=output, records=parsed_data)
+
+    def _write_records(self, output: TextIO, records: list) -> None:
+        """Writes the records of a device, with ndjson or influx."""
+        if self.output_format == INFLUX_FORMAT:
+            write_line_protocol(output=output, records=records)
+            return
+        for record in records:
+            write_json_line(output=output, data=record)
+
+    def _write_results_with_timings(self, output: TextIO) -> None:
+        """
+        Writes the results, timing the encoding of the records of each device.
+        With json, the records of each device are encoded on their own
+        and joined into the same single JSON array.
+        """
+        self._operation = "fetch"
+        devices = self._load_settings()
+        if self.output_format == JSON_FORMAT:
+            processed = self._process_devices(devices)
+        else:
+            processed = self._iter_devices(devices)
+
+        chunks = []
+        for parsed_data in processed:
+            records, timings_record = _split_timings_record(parsed_data)
+            start = time.perf_counter()
+            if self.output_format != JSON_FORMAT:
+                self._write_records(output=output, records=records)
+            elif records:
+                chunks.append(convert_dict_to_json_bytes(records)[1:-1])
+            if timings_record is None:
+                continue
+            timings_record["data"]["serialize"] = time.perf_counter() - start
+            if self.output_format != JSON_FORMAT:
+                self._write_records(output=output, records=[timings_record])
+            else:
+                chunks.append(
+                    convert_dict_to_json_bytes([timings_record])[1:-1]
+                )
+
+        if self.output_format == JSON_FORMAT:
+            payload = b"[" + b",".join(chunks) + b"]"
+            write_bytes_line(output=output, payload=payload)
+
+    def close(self) -> None:
+        """
+        Closes the sessions kept open by the session pool
+        and stops the processes of the parse pool, if any.
+        """
+        if self.session_pool:
+            self.session_pool.close()
+        if self.parse_pool:
+            self.parse_pool.close()
+
     def _run(self) -> str:
         """Runs the main operations and returns results in JSON format."""
+        return convert_dict_to_json(self._collect_results())
 
-        devices = self._settings.get_device_settings()
-        self._filter_id = self._settings.get_filter_id()
-        self._netconf_filter = self._settings.get_netconf_filter()
+    def _collect_results(self) -> list:
+        """Runs the main operations and returns the records of all devices."""
+        devices = self._load_settings()
 
         results = []
-        for device in devices:
-            results += self._process_device(device)
+        for parsed_data in self._process_devices(devices):
+            results += parsed_data
+        return results
+
+    def _load_settings(self) -> list:
+        """
+        Loads the filters to use and returns the device settings.
+        Called once per fetch, so it also starts a cycle of the change filter.
+        """
+        devices = self._settings.get_device_settings()
+        self._filters = self._settings.get_filters()
+        if self.change_filter:
+            self.change_filter.next_cycle()
+        return devices
 
-        return convert_dict_to_json(results)
+    def _process_devices(self, devices: list) -> list:
+        """
+        Processes all devices, concurrently when max_workers is above 1.
 
-    def _process_device(self, device: dict) -> dict:
-        """Processes a single device operation and parsing its reply."""
-        device = NetconfDevice(**device)
-        rpc = NetconfSession(
-            device=device,
-            netconf_filter=self._netconf_filter,
-            operation=self._operation,
+        Results keep the same order as the devices,
+        regardless of which device replies first.
+        Devices still running at the deadline give error records.
+        """
+        self._check_max_workers()
+        deadline = self._run_deadline()
+        if deadline is None and (self.max_workers == 1 or len(devices) <= 1):
+            return [self._process_device_isolated(device) for device in devices]
+
+        executor = self._devices_executor(devices)
+        try:
+            futures = [
+                executor.submit(self._process_device_isolated, device, deadline)
+                for device in devices
+            ]
+            wait(futures, timeout=_remaining(deadline))
+            return [
+                self._result_or_deadline(future, device)
+                for future, device in zip(futures, devices)
+            ]
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _iter_devices(self, devices: list) -> Iterator[list]:
+        """
+        Processes all devices, yielding the parsed data of each device
+        as soon as it is ready, in the order they finish.
+        Devices still running at the deadline come last, as error records.
+        """
+        self._check_max_workers()
+        deadline = self._run_deadline()
+        if deadline is None and (self.max_workers == 1 or len(devices) <= 1):
+            for device in devices:
+                yield self._process_device_isolated(device)
+            return
+
+        executor = self._devices_executor(devices)
+        try:
+            pending = {
+                executor.submit(
+                    self._process_device_isolated, device, deadline
+                ): device
+                for device in devices
+            }
+            while pending:
+                done, _ = wait(
+                    pending,
+                    timeout=_remaining(deadline),
+                    return_when=FIRST_COMPLETED,
+                )
+                if not done:
+                    break
+                for future in done:
+                    del pending[future]
+                    yield future.result()
+            for future, device in pending.items():
+                yield self._result_or_deadline(future, device)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _devices_executor(self, devices: list) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(
+            max_workers=max(min(self.max_workers, len(devices)), 1)
         )
-        data_dict = convert_xml_to_dict(xml_string=rpc.reply())
-        parser = get_parser(netconf_filter=self._filter_id)
-        parsed_data = parser.parse(
-            data_to_parse=data_dict,
-            device=device,
-            netconf_filter_id=self._filter_id,
+
+    def _run_deadline(self) -> Optional[float]:
+        """Returns the time.monotonic() at which the run ends, if any."""
+        if self.deadline is None:
+            return None
+        if self.deadline <= 0:
+            raise ValueError(f"deadline must be above 0, got {self.deadline}")
+        return time.monotonic() + self.deadline
+
+    def _process_device_isolated(
+        self, device: dict, deadline: Optional[float] = None
+    ) -> list:
+        """
+        Processes a device, returning error records if it raises.
+        With a deadline, the timeout of the device is cut to the time
+        left, so a hung device does not outlive the run for long.
+        """
+        try:
+            if deadline is not None:
+                device = self._bound_timeout(device, deadline)
+            return self._process_device(device)
+        except Exception as err:
+            return error_records(device, self._filters, err)
+
+    def _bound_timeout(self, device: dict, deadline: float) -> dict:
+        remaining = _remaining(deadline)
+        if remaining <= 0:
+            raise self._deadline_error(device)
+        timeout = int(device.get("timeout") or NetconfDevice.timeout)
+        return {**device, "timeout": min(timeout, math.ceil(remaining))}
+
+    def _result_or_deadline(self, future, device: dict) -> list:
+        """Returns the result of a finished device, or its deadline errors."""
+        if future.done() and not future.cancelled():
+            return future.result()
+        return error_records(device, self._filters, self._deadline_error(device))
+
+    def _deadline_error(self, device: dict) -> DeadlineExceeded:
+        return DeadlineExceeded(
+            f"Device {device.get('host')} did not finish "
+            f"within the deadline of {self.deadline} seconds"
         )
+
+    def _check_max_workers(self) -> None:
+        if self.max_workers < 1:
+            raise ValueError(
+                f"max_workers must be 1 or greater, got {self.max_workers}"
+            )
+
+    def _process_device(
+        self, device: dict, netconf_filters: Optional[list] = None
+    ) -> list:
+        """
+        Processes a single device operation and parsing its replies.
+        All filters are fetched over one session,
+        each reply is parsed by the parser of its filter.
+        netconf_filters defaults to the filters loaded from the settings.
+        """
+        netconf_filters = netconf_filters or self._filters
+        device = NetconfDevice(**device)
+        timings = None
+        if self.collect_timings or self.timings_callback:
+            timings = DeviceTimings(device=device.hostname, ip=device.host)
+        rpc = self._open_session(device, netconf_filters, timings)
+        parse = self.parse_pool.parse if self.parse_pool else parse_reply
+        parsed_data = []
+        for netconf_filter, reply in zip(netconf_filters, rpc.replies()):
+            parsed_data += parse(
+                reply=reply,
+                device=device,
+                netconf_filter=netconf_filter,
+                timings=timings,
+            )
+        if self.change_filter:
+            parsed_data = self.change_filter.select(parsed_data)
+        if timings is None:
+            return parsed_data
+
+        if self.timings_callback:
+            self.timings_callback(timings)
+        if self.collect_timings:
+            parsed_data.append(timings.to_record())
         return parsed_data
 
+    def _open_session(
+        self,
+        device: NetconfDevice,
+        netconf_filters: list,
+        timings: Optional[DeviceTimings],
+    ) -> NetconfSession:
+        """
+        Runs the operations of a device, through its circuit breaker if any.
+        Raises CircuitOpen without connecting when the device is skipped.
+        """
+        breaker = self.circuit_breaker
+        if breaker:
+            breaker.check(device.host)
+        try:
+            session = NetconfSession(
+                device=device,
+                netconf_filters=netconf_filters,
+                operation=self._operation,
+                pool=self.session_pool,
+                timings=timings,
+            )
+        except Exception:
+            if breaker:
+                breaker.record_failure(device.host)
+            raise
+        if breaker:
+            breaker.record_success(device.host)
+        return session
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    """Returns the seconds left until deadline, None without deadline."""
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
+
+
+def _split_timings_record(parsed_data: list) -> tuple[list, Optional[dict]]:
+    """Separates the timings record, added last, from the records of a device."""
+    if parsed_data and is_timings_record(parsed_data[-1]):
+        return parsed_data[:-1], parsed_data[-1]
+    return parsed_data, None
+
 
 def cli() -> None:
     """Runs the netconf client using the CLI with the arguments supplied."""
+    argv = sys.argv[1:]
+    if argv[:1] == [POLL_COMMAND]:
+        from ncpeek.poller import poll_cli
+
+        poll_cli(argv=argv[1:])
+        return
+    if argv[:1] == [SERVE_COMMAND]:
+        from ncpeek.exporter import serve_cli
+
+        serve_cli(argv=argv[1:])
+        return
+
     client = NetconfClient()
     try:
-        print(client.execute_cli())
+        client.setup_cli()
+        client.write_results(output=sys.stdout)
     except Exception as err:
         print(f"Error found: {err=}")
         sys.exit(2)
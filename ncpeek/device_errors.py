@@ -0,0 +1,48 @@
+"""
+Module for the records of the devices that failed during a run.
+A device that raises, or misses the deadline of the run, gives an error
+record per filter instead of its records, so the records of the other
+devices are still written.
+"""
+
+from typing import Optional
+from ncpeek.netconf_filters import NetconfFilter
+
+ERROR_KEY = "error"
+
+
+class DeadlineExceeded(TimeoutError):
+    """A device did not finish before the deadline of the run."""
+
+
+def error_records(
+    device: dict, netconf_filters: Optional[list[NetconfFilter]], error: Exception
+) -> list[dict]:
+    """
+    Returns the error records of a device, one per filter.
+
+    Args:
+        device (dict): The settings of the device.
+        netconf_filters (list[NetconfFilter]): The filters of the device.
+        error (Exception): The error raised by the device.
+
+    Returns: list[dict]: Records with the device, ip and field of the
+        records of the device, the class of the error and its message.
+    """
+    host = device.get("host")
+    device_name = device.get("hostname") or host
+    return [
+        {
+            "field": netconf_filter.filter_id,
+            "device": device_name,
+            "ip": host,
+            ERROR_KEY: type(error).__name__,
+            "message": str(error),
+        }
+        for netconf_filter in netconf_filters or []
+    ]
+
+
+def is_error_record(record: dict) -> bool:
+    """Checks whether a record holds the error of a device rather than data."""
+    return isinstance(record, dict) and ERROR_KEY in record
@@ -0,0 +1,404 @@
+"""
+Module for exporting netconf data to Prometheus.
+Scrapes of /metrics?target=<device>&filter=<filter> are fetched with the
+parsers of the filters, and the numeric fields of the records are
+rendered as OpenMetrics. Results are cached for a short ttl, so
+concurrent scrapes of the same target share one netconf round-trip.
+"""
+
+import re
+import sys
+import math
+import time
+import threading
+from typing import Any, Callable, Hashable, Iterator, Optional, TextIO, TypeVar
+from dataclasses import dataclass, field
+from urllib.parse import parse_qs, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from ncpeek.client import NetconfClient
+from ncpeek.netconf_filters import NetconfFilter
+from ncpeek.session_pool import SessionPool
+from ncpeek.parse_pool import ParsePool
+from ncpeek.circuit_breaker import CircuitBreaker
+from ncpeek.args.parse_settings import SettingsParser
+from ncpeek.args.arg_parser import DEFAULT_CACHE_TTL
+from ncpeek.utils.record_utils import (
+    DATA_KEY,
+    as_number,
+    flatten_numbers,
+    record_to_dict,
+)
+
+OPENMETRICS_CONTENT_TYPE = (
+    "application/openmetrics-text; version=1.0.0; charset=utf-8"
+)
+METRICS_PATH = "/metrics"
+METRIC_PREFIX = "ncpeek_"
+# Fields of every record, exported as labels with these names.
+RECORD_LABELS = {"device": "device", "ip": "ip", "field": "filter"}
+
+_INVALID_NAME_CHARACTERS = re.compile(r"[^a-zA-Z0-9_]")
+
+T = TypeVar("T")
+
+
+@dataclass
+class ScrapeCache:
+    """
+    Keeps the result of each scrape for ttl seconds.
+
+    Scrapes of the same key wait for the one already fetching,
+    then share its result instead of fetching again.
+    Fetches that raise are not kept, the next scrape tries again.
+    The lock of a key is dropped with its expired result.
+    """
+
+    ttl: float = DEFAULT_CACHE_TTL
+    _entries: dict = field(default_factory=dict, repr=False)
+    _locks: dict = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def get(self, key: Hashable, fetch: Callable[[], T]) -> T:
+        """
+        Returns the cached result of key, calling fetch if it expired.
+
+        Args:
+            key (Hashable): Identifies the scrape.
+            fetch (Callable): Returns the result of the scrape.
+
+        Returns: The result of fetch, cached or new.
+        """
+        cached = self._fresh(key)
+        if cached is not None:
+            return cached[1]
+
+        try:
+            with self._key_lock(key):
+                cached = self._fresh(key)
+                if cached is not None:
+                    return cached[1]
+                result = fetch()
+                self._put(key, result)
+                return result
+        finally:
+            self._expire()
+
+    def clear(self) -> None:
+        """Forgets all the results."""
+        with self._lock:
+            self._entries.clear()
+
+    def _fresh(self, key: Hashable) -> Optional[tuple]:
+        with self._lock:
+            cached = self._entries.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached
+        return None
+
+    def _key_lock(self, key: Hashable) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _put(self, key: Hashable, result: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+
+    def _expire(self) -> None:
+        """Drops the expired results, and the locks no scrape holds."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                expired_key
+                for expired_key, (expires, _) in self._entries.items()
+                if expires <= now
+            ]
+            for expired_key in expired:
+                del self._entries[expired_key]
+            unused = [
+                unused_key
+                for unused_key, key_lock in self._locks.items()
+                if unused_key not in self._entries and not key_lock.locked()
+            ]
+            for unused_key in unused:
+                del self._locks[unused_key]
+
+
+@dataclass
+class Exporter:
+    """
+    Renders the records of a device as OpenMetrics.
+
+    devices are the device settings, found by hostname or host.
+    filters are the filters that can be scraped, found by filter id.
+    Sessions are kept open between scrapes by the session pool of client.
+    """
+
+    devices: list
+    filters: list[NetconfFilter]
+    cache_ttl: float = DEFAULT_CACHE_TTL
+    client: NetconfClient = field(
+        default_factory=lambda: NetconfClient(session_pool=SessionPool())
+    )
+    error_stream: TextIO = field(default_factory=lambda: sys.stderr)
+    _targets: dict = field(default_factory=dict, init=False, repr=False)
+    _cache: ScrapeCache = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._cache = ScrapeCache(ttl=self.cache_ttl)
+        for index, device in enumerate(self.devices):
+            for name in (device.get("host"), device.get("hostname")):
+                if name:
+                    self._targets.setdefault(name, index)
+
+    def scrape(self, target: str, filter_ids: Optional[list] = None) -> str:
+        """
+        Returns the OpenMetrics of a target, fetched or cached.
+
+        Args:
+            target (str): Hostname or host of a device.
+            filter_ids (list): Filters to fetch, all filters if empty.
+
+        Returns: str: The metrics, ending with '# EOF'.
+
+        Raises: LookupError: If the target or a filter is unknown.
+        """
+        if target not in self._targets:
+            raise LookupError(f"Unknown target: {target}")
+        index = self._targets[target]
+        netconf_filters = self._find_filters(filter_ids or [])
+        key = (index, tuple(f.filter_id for f in netconf_filters))
+        try:
+            return self._cache.get(
+                key,
+                lambda: self._collect(self.devices[index], netconf_filters),
+            )
+        except _FailedScrape as failed:
+            return failed.metrics
+
+    def close(self) -> None:
+        """Closes the sessions kept open between scrapes, and the parse pool."""
+        self.client.close()
+
+    def _find_filters(self, filter_ids: list) -> list[NetconfFilter]:
+        if not filter_ids:
+            return self.filters
+        filters = {f.filter_id: f for f in self.filters}
+        unknown = [filter_id for filter_id in filter_ids if filter_id not in filters]
+        if unknown:
+            raise LookupError(f"Unknown filter: {', '.join(unknown)}")
+        return [filters[filter_id] for filter_id in dict.fromkeys(filter_ids)]
+
+    def _collect(self, device: dict, netconf_filters: list) -> str:
+        """
+        Fetchs the device and renders its records.
+        A failed fetch raises _FailedScrape with its metrics, so the
+        cache does not keep them.
+        """
+        start = time.perf_counter()
+        try:
+            records = self.client.fetch_device(device, netconf_filters)
+            success = 1
+        except Exception as err:
+            self.error_stream.write(
+                f"Error found: {device.get('host')} {err=}\n"
+            )
+            self.error_stream.flush()
+            records, success = [], 0
+
+        labels = {
+            "device": device.get("hostname") or device.get("host"),
+            "ip": device.get("host"),
+        }
+        scrape_samples = [
+            ("scrape_success", labels, success),
+            ("scrape_duration_seconds", labels, time.perf_counter() - start),
+        ]
+        metrics = render_openmetrics(
+            samples=[*records_to_samples(records), *scrape_samples]
+        )
+        if not success:
+            raise _FailedScrape(metrics)
+        return metrics
+
+
+class _FailedScrape(Exception):
+    """Carries the metrics of a failed scrape past the cache."""
+
+    def __init__(self, metrics: str):
+        super().__init__(metrics)
+        self.metrics = metrics
+
+
+def records_to_samples(records: list[dict]) -> Iterator[tuple[str, dict, Any]]:
+    """
+    Yields a sample for each numeric field of the records.
+
+    device, ip and field become the device, ip and filter labels,
+    other text fields become labels of the samples of the same record.
+    Nested dictionaries are flattened, joining their keys with '_'.
+    Lists are skipped, their entries have no name to tell them apart.
+
+    Args: records (list[dict]): Records of the parsers.
+    Returns: Iterator of (name, labels, value) tuples.
+    """
+    for record in map(record_to_dict, records):
+        labels = {label: record.get(key) for key, label in RECORD_LABELS.items()}
+        numbers = {}
+        for key, value in record.items():
+            if key in RECORD_LABELS:
+                continue
+            if isinstance(value, dict):
+                prefix = () if key == DATA_KEY else (key,)
+                numbers.update(flatten_numbers(value, prefix))
+                continue
+            number = as_number(value)
+            if number is not None:
+                numbers[(key,)] = number
+            elif isinstance(value, str):
+                labels[_sanitize_name(key)] = value
+        for path, number in numbers.items():
+            yield "_".join(path), labels, number
+
+
+def render_openmetrics(samples: list[tuple[str, dict, Any]]) -> str:
+    """
+    Renders samples in the OpenMetrics text format, as gauges.
+
+    Args: samples (list): (name, labels, value) tuples, name without prefix.
+    Returns: str: The metrics, ending with '# EOF'.
+    """
+    families: dict = {}
+    for name, labels, value in samples:
+        families.setdefault(METRIC_PREFIX + _sanitize_name(name), []).append(
+            (labels, value)
+        )
+
+    lines = []
+    for name, family_samples in families.items():
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in family_samples:
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def _sanitize_name(name: str) -> str:
+    name = _INVALID_NAME_CHARACTERS.sub("_", str(name))
+    return f"_{name}" if name[:1].isdigit() else name
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape_label_value(value)}"'
+        for name, value in labels.items()
+        if value is not None
+    )
+    return f"{{{pairs}}}"
+
+
+def _escape_label_value(value: Any) -> str:
+    return (
+        str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    )
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "NaN"
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Answers GET /metrics with the metrics of the exporter of the server."""
+
+    server: "ExporterServer"
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path != METRICS_PATH:
+            self._send(404, f"Not found, scrape {METRICS_PATH}?target=<device>\n")
+            return
+        query = parse_qs(url.query)
+        target = query.get("target", [""])[0]
+        if not target:
+            self._send(400, "Missing target parameter\n")
+            return
+        try:
+            metrics = self.server.exporter.scrape(target, query.get("filter", []))
+        except LookupError as err:
+            self._send(404, f"{err}\n")
+            return
+        self._send(200, metrics, content_type=OPENMETRICS_CONTENT_TYPE)
+
+    def _send(
+        self,
+        status: int,
+        body: str,
+        content_type: str = "text/plain; charset=utf-8",
+    ) -> None:
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Scrapes are not logged, errors of devices go to the error stream."""
+
+
+class ExporterServer(ThreadingHTTPServer):
+    """HTTP server answering each scrape on its own thread."""
+
+    def __init__(self, exporter: Exporter, address: str, port: int):
+        self.exporter = exporter
+        super().__init__((address, port), _MetricsHandler)
+
+
+def serve_cli(argv: Optional[list] = None) -> None:
+    """Runs the serve command with the arguments supplied."""
+    settings = SettingsParser()
+    try:
+        args = settings.parse_serve_arguments(argv)
+        parse_pool = None
+        if args.parse_workers:
+            parse_pool = ParsePool(
+                workers=args.parse_workers, threshold=args.parse_threshold
+            )
+        circuit_breaker = None
+        if args.breaker_failures:
+            circuit_breaker = CircuitBreaker(
+                failure_threshold=args.breaker_failures,
+                state_file=args.breaker_state,
+            )
+        exporter = Exporter(
+            devices=settings.get_device_settings(),
+            filters=settings.get_filters(),
+            cache_ttl=args.cache_ttl,
+            client=NetconfClient(
+                session_pool=SessionPool(),
+                parse_pool=parse_pool,
+                circuit_breaker=circuit_breaker,
+            ),
+        )
+        server = ExporterServer(exporter, args.address, args.port)
+    except Exception as err:
+        print(f"Error found: {err=}")
+        sys.exit(2)
+
+    print(
+        f"Serving metrics on http://{args.address}:{args.port}{METRICS_PATH}",
+        file=sys.stderr,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        exporter.close()
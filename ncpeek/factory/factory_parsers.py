@@ -1,23 +1,93 @@
+import importlib
+from functools import lru_cache
+from typing import TYPE_CHECKING
 from ncpeek.netconf_parsers import Parser
 from ncpeek.factory.factory_mappings import PARSER_MAPPING
 
+if TYPE_CHECKING:
+    from pathlib import Path
+    from importlib.metadata import EntryPoint
+
+ENTRY_POINT_GROUP = "ncpeek.parsers"
+
 
 def get_parser(netconf_filter: str) -> Parser:
     """
     Returns a parser instance based on the provided Netconf filter.
 
+    A new instance is returned on each call, since parsers keep
+    the device they are parsing. The class is resolved only once.
+
     Args: netconf_filter: The Netconf filter ID.
     Returns: An instance of the appropriate parser.
     """
+    return get_parser_class(netconf_filter)()
+
+
+@lru_cache(maxsize=None)
+def get_parser_class(netconf_filter: str) -> type[Parser]:
+    """
+    Returns the parser class for the Netconf filter, resolved once and cached.
+
+    Parsers of PARSER_MAPPING are looked up first, then the parser specs,
+    built-in or in the directories of NCPEEK_PARSER_SPECS, then the parsers
+    installed by other packages under the 'ncpeek.parsers' entry point group,
+    and finally the default parser.
+    Modules are only imported, and specs compiled, when their filter is used.
+
+    Args: netconf_filter: The Netconf filter ID.
+    Returns: The class of the appropriate parser.
+    """
+    if netconf_filter in PARSER_MAPPING:
+        return _import_parser_class(PARSER_MAPPING[netconf_filter])
+
+    spec_file = _discover_parser_specs().get(netconf_filter)
+    if spec_file is not None:
+        from ncpeek.parsers.spec_parser import load_spec_parser
+
+        return load_spec_parser(spec_file)
+
+    entry_point = _discover_parser_entry_points().get(netconf_filter)
+    if entry_point is not None:
+        return entry_point.load()
+
+    return _import_parser_class(PARSER_MAPPING["default_parser"])
+
+
+def clear_parser_cache() -> None:
+    """
+    Forgets the resolved parsers, the discovered specs and entry points.
+    Useful after installing a parser package or adding a spec
+    in a running process.
+    """
+    get_parser_class.cache_clear()
+    _discover_parser_specs.cache_clear()
+    _discover_parser_entry_points.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def _discover_parser_specs() -> dict[str, "Path"]:
+    """
+    Returns the parser spec files by filter ID, without compiling them.
+    """
+    from ncpeek.parsers.spec_parser import find_spec_files
+
+    return find_spec_files()
+
+
+@lru_cache(maxsize=None)
+def _discover_parser_entry_points() -> dict[str, "EntryPoint"]:
+    """
+    Returns the parser entry points by filter ID, without loading them.
+    """
+    from importlib.metadata import entry_points
 
-    parser_config = PARSER_MAPPING.get(
-        netconf_filter, PARSER_MAPPING["default_parser"]
-    )
+    return {
+        entry_point.name: entry_point
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP)
+    }
 
-    parser_module = __import__(
-        parser_config["module"], fromlist=[parser_config["class"]]
-    )
-    # The last () in the line parser_instance is used to instantiate the class.
-    parser_instance = getattr(parser_module, parser_config["class"])()
 
-    return parser_instance
+def _import_parser_class(parser_config: dict[str, str]) -> type[Parser]:
+    parser_module = importlib.import_module(parser_config["module"])
+    return getattr(parser_module, parser_config["class"])
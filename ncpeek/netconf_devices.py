@@ -63,6 +63,19 @@ class NetconfDevice:
                 f"Missing field(s){host_msg}: {fields}. These must be provided in JSON format."
             )
 
+    def session_key(self) -> tuple:
+        """
+        Returns the values identifying a netconf session to this device.
+        Devices with the same key can share a session.
+        """
+        return (
+            self.host,
+            self.port,
+            self.username,
+            self.password,
+            repr(sorted(self.device_params.items())),
+        )
+
     @staticmethod
     def convert_str_to_bool(str_value: Union[bool, str]) -> bool:
         """
@@ -0,0 +1,16 @@
+from typing import Union
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class NetconfFilter:
+    """
+    This class represents a filter to retrieve data with.
+
+    filter_id selects the parser for the reply and is used as 'field' tag.
+    netconf_filter is the xml string or xpath tuple sent to the device.
+    Filters are shared through the filter cache, so they are immutable.
+    """
+
+    filter_id: str
+    netconf_filter: Union[str, tuple]
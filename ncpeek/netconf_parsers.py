@@ -1,4 +1,4 @@
-from typing import List
+from typing import Any, Iterable, List, Optional
 from abc import ABC, abstractmethod
 from ncpeek.netconf_devices import NetconfDevice
 
@@ -7,8 +7,21 @@ class Parser(ABC):
     """
     This is an abstract base class for parsers. It enforces the implementation
     of the 'parse' method in any derived class.
+
+    Parsers of list based replies can opt in to streaming by setting
+    'record_path' and implementing 'parse_records'. The records are then
+    delivered one at a time instead of building the whole reply dictionary.
+
+    Parsers setting 'strip_namespaces' receive the reply dictionary
+    without namespace declarations, removed while the xml is converted.
+    The client then sets 'namespaces_stripped' on the parser instance,
+    dictionaries given by other callers may still have them.
     """
 
+    record_path: Optional[tuple] = None
+    strip_namespaces: bool = False
+    namespaces_stripped: bool = False
+
     @classmethod
     @abstractmethod
     def parse(
@@ -31,3 +44,59 @@ class Parser(ABC):
         raise NotImplementedError(
             "Subclasses must implement this parse method."
         )
+
+    def parse_records(
+        self,
+        records: Iterable[dict],
+        device: NetconfDevice,
+        netconf_filter_id: str,
+    ) -> List:
+        """
+        Parse the records found at 'record_path', one at a time.
+        Only called when 'record_path' is set.
+
+        Args:
+            records: Iterable of the records, with the same structure
+                     as the dictionary given to 'parse'.
+            device: The network device.
+            netconf_filter_id: The filter ID for netconf.
+
+        Returns: A list of parsed data.
+        """
+        raise NotImplementedError(
+            "Streaming parsers must implement the parse_records method."
+        )
+
+
+class ElementParser(Parser):
+    """
+    Base class for parsers reading fields straight from the reply elements,
+    with compiled XPath expressions, skipping the conversion to a dictionary.
+
+    The elements found at 'record_path' are given one at a time
+    to 'parse_elements'. Derived classes must set 'record_path'.
+    """
+
+    record_path: tuple = ()
+
+    @abstractmethod
+    def parse_elements(
+        self,
+        elements: Iterable[Any],
+        device: NetconfDevice,
+        netconf_filter_id: str,
+    ) -> List:
+        """
+        This is an abstract method that must be implemented in any derived class.
+        It should read the given lxml elements and return a list.
+
+        Args:
+            elements: Iterable of the lxml elements found at 'record_path'.
+            device: The network device.
+            netconf_filter_id: The filter ID for netconf.
+
+        Returns: A list of parsed data.
+        """
+        raise NotImplementedError(
+            "Subclasses must implement this parse_elements method."
+        )
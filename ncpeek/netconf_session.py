@@ -1,17 +1,29 @@
-from typing import Optional
-from dataclasses import dataclass
-from ncclient import manager
+import time
+from typing import TYPE_CHECKING, Optional
+from dataclasses import dataclass, field
 from ncpeek.netconf_devices import NetconfDevice
+from ncpeek.netconf_filters import NetconfFilter
+from ncpeek.session_pool import SessionPool, close_transport, is_session_error
+from ncpeek.timings import DeviceTimings
+
+if TYPE_CHECKING:
+    from ncclient import manager
 
 
 @dataclass
 class NetconfSession:
-    """Handles the netconf session for a device."""
+    """
+    Handles the netconf session for a device.
+    The operation runs once per filter, all over the same session.
+    When timings are provided, the connection and operations are timed.
+    """
 
     device: NetconfDevice
-    netconf_filter: str
+    netconf_filters: list[NetconfFilter]
     operation: str
-    result: Optional[str] = None
+    results: list = field(default_factory=list)
+    pool: Optional[SessionPool] = None
+    timings: Optional[DeviceTimings] = None
 
     def __post_init__(self) -> None:
         """
@@ -19,34 +31,89 @@ class NetconfSession:
 
         Returns: The result of the Netconf  operation.
         """
-        self.result = self._perform_operation()
+        self.results = self._perform_operation()
 
-    def reply(self) -> str:
-        """retrieves rpc reply from operation performed.
+    def replies(self) -> list[str]:
+        """retrieves rpc replies from operation performed.
 
         Returns:
-            str: rpc result from data_xml attribute.
+            list[str]: rpc results from data_xml attribute,
+            in the same order as the filters.
         """
-        return self.result.data_xml
+        return [result.data_xml for result in self.results]
 
-    def _perform_operation(self) -> str:
+    def _perform_operation(self) -> list:
         """
         Executes the specified operation on the device.
 
-        Args: operation: The operation to perform.
+        Uses a session of the pool when one is provided,
+        otherwise a new session is opened and closed for the operation.
+
         Returns: The result of the operation.
         """
-        with self._establish_connection() as session:
-            match self.operation:
-                case "fetch":
-                    return session.get(self.netconf_filter)
+        connect = (
+            self._establish_connection
+            if self.timings is None
+            else self._establish_timed_connection
+        )
+        if self.pool:
+            return self.pool.run(
+                device=self.device,
+                operation=self._run_operation,
+                connect=connect,
+            )
+        session = connect()
+        try:
+            results = self._run_operation(session)
+        except Exception as err:
+            # A dropped transport can't close the session, trying would wait
+            # for the timeout and replace the error with a TimeoutExpiredError.
+            if is_session_error(err):
+                close_transport(session)
+            else:
+                session.close_session()
+            raise
+        session.close_session()
+        return results
+
+    def _run_operation(self, session: "manager.Manager") -> list:
+        """
+        Runs the specified operation on an established session,
+        once for each filter.
 
-    def _establish_connection(self) -> manager:
+        Args: session: The netconf session.
+        Returns: The results of the operation.
+        """
+        match self.operation:
+            case "fetch":
+                if self.timings is None:
+                    return [
+                        session.get(netconf_filter.netconf_filter)
+                        for netconf_filter in self.netconf_filters
+                    ]
+                results = []
+                for netconf_filter in self.netconf_filters:
+                    start = time.perf_counter()
+                    results.append(session.get(netconf_filter.netconf_filter))
+                    self.timings.add("rpc", start)
+                return results
+
+    def _establish_timed_connection(self) -> "manager.Manager":
+        """Establishes the Netconf session, adding its time to the timings."""
+        start = time.perf_counter()
+        session = self._establish_connection()
+        self.timings.add("connect", start)
+        return session
+
+    def _establish_connection(self) -> "manager.Manager":
         """
         Establishes a Netconf session with the device.
+        ncclient is imported here, so it is only loaded once a session is needed.
 
         Returns: The established session.
         """
+        from ncclient import manager
+
         return manager.connect(
             host=self.device.host,
             port=self.device.port,
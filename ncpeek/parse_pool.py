@@ -0,0 +1,240 @@
+"""
+Module for parsing rpc replies, in-process or in a pool of processes.
+
+Converting and parsing large replies is CPU bound, so with many devices
+a single process keeps one core busy while the others are idle.
+ParsePool hands the replies above a size threshold to worker processes.
+The records come back packed as tuples of their fields, grouped by
+record type, which is smaller and faster to transfer than the records.
+Smaller replies are parsed in-process, where transferring them would
+cost more than parsing them.
+"""
+
+import time
+import threading
+import dataclasses
+from itertools import groupby, starmap
+from functools import lru_cache
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any, Callable, Optional
+from dataclasses import dataclass, field
+from ncpeek.utils.text_utils import (
+    convert_xml_to_dict,
+    iterparse_xml_records,
+    iterparse_xml_elements,
+)
+from ncpeek.netconf_devices import NetconfDevice
+from ncpeek.netconf_filters import NetconfFilter
+from ncpeek.factory.factory_parsers import get_parser
+from ncpeek.netconf_parsers import ElementParser
+from ncpeek.timings import DeviceTimings
+from ncpeek.args.arg_parser import DEFAULT_PARSE_THRESHOLD
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+
+def parse_reply(
+    reply: str,
+    device: NetconfDevice,
+    netconf_filter: NetconfFilter,
+    timings: Optional[DeviceTimings] = None,
+) -> list:
+    """
+    Parses a rpc reply with the parser of its filter.
+    Streams the record elements or records to parsers supporting it.
+    When timings are provided, the convert and parse phases are added.
+
+    Args:
+        reply (str): The rpc reply.
+        device (NetconfDevice): The device the reply comes from.
+        netconf_filter (NetconfFilter): The filter of the reply.
+        timings (DeviceTimings): The timings of the device, if measured.
+
+    Returns: list: The records of the parser.
+    """
+    parser = get_parser(netconf_filter=netconf_filter.filter_id)
+    if timings is not None:
+        timings.reply_bytes += _utf8_size(reply)
+        start = time.perf_counter()
+
+    if isinstance(parser, ElementParser):
+        records = parser.parse_elements(
+            elements=iterparse_xml_elements(
+                xml_string=reply, record_path=parser.record_path
+            ),
+            device=device,
+            netconf_filter_id=netconf_filter.filter_id,
+        )
+    elif parser.record_path:
+        records = parser.parse_records(
+            records=iterparse_xml_records(
+                xml_string=reply, record_path=parser.record_path
+            ),
+            device=device,
+            netconf_filter_id=netconf_filter.filter_id,
+        )
+    else:
+        data_dict = convert_xml_to_dict(
+            xml_string=reply, strip_namespaces=parser.strip_namespaces
+        )
+        parser.namespaces_stripped = parser.strip_namespaces
+        if timings is not None:
+            timings.add("convert", start)
+            start = time.perf_counter()
+        records = parser.parse(
+            data_to_parse=data_dict,
+            device=device,
+            netconf_filter_id=netconf_filter.filter_id,
+        )
+
+    if timings is not None:
+        timings.add("parse", start)
+        timings.records += len(records)
+    return records
+
+
+@dataclass
+class ParsePool:
+    """
+    Parses the replies of at least threshold bytes in worker processes.
+
+    workers: processes of the pool, started on the first large reply.
+    threshold: size in bytes from which a reply is sent to the pool.
+
+    Safe to use from several threads, each waits for its own replies.
+    Call close() to stop the processes once the pool is not needed.
+    """
+
+    workers: int
+    threshold: int = DEFAULT_PARSE_THRESHOLD
+    _executor: Optional["ProcessPoolExecutor"] = field(
+        default=None, init=False, repr=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.workers < 1:
+            raise ValueError(f"workers must be 1 or greater, got {self.workers}")
+        if self.threshold < 0:
+            raise ValueError(
+                f"threshold must be 0 or greater, got {self.threshold}"
+            )
+
+    def parse(
+        self,
+        reply: str,
+        device: NetconfDevice,
+        netconf_filter: NetconfFilter,
+        timings: Optional[DeviceTimings] = None,
+    ) -> list:
+        """
+        Parses a rpc reply, in a worker process if it is large enough.
+        With timings, the transfer to and from the worker is part of parse.
+
+        Args: see parse_reply.
+        Returns: list: The records of the parser.
+        """
+        if _utf8_size(reply) < self.threshold:
+            return parse_reply(reply, device, netconf_filter, timings)
+
+        start = time.perf_counter()
+        future = self._get_executor().submit(
+            _parse_in_worker, reply, device, netconf_filter, timings is not None
+        )
+        packed, worker_timings = future.result()
+        records = unpack_records(packed)
+        if timings is not None:
+            elapsed = time.perf_counter() - start
+            timings.merge(worker_timings)
+            timings.parse += elapsed - worker_timings.convert - worker_timings.parse
+        return records
+
+    def close(self) -> None:
+        """Stops the worker processes, a new pool starts if used again."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _get_executor(self) -> "ProcessPoolExecutor":
+        # Imported on first use, multiprocessing slows down the client import.
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Workers start from a clean server process rather than forked from
+        # the client, whose threads may hold locks at the time of the fork.
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context(
+            "forkserver" if "forkserver" in methods else "spawn"
+        )
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=context
+                )
+            return self._executor
+
+
+def _utf8_size(reply: str) -> int:
+    """Returns the size in bytes of a reply, encoding it only if not ASCII."""
+    return len(reply) if reply.isascii() else len(reply.encode("utf-8"))
+
+
+def _parse_in_worker(
+    reply: str, device: NetconfDevice, netconf_filter: NetconfFilter, timed: bool
+) -> tuple[list, Optional[DeviceTimings]]:
+    """Runs in a worker process, returns the packed records and their timings."""
+    timings = DeviceTimings() if timed else None
+    records = parse_reply(reply, device, netconf_filter, timings)
+    return pack_records(records), timings
+
+
+def pack_records(records: list) -> list:
+    """
+    Packs records to send them to another process.
+    Consecutive dataclass records of the same type become a single
+    (type, rows) entry, each row a tuple of the fields of a record.
+    Other records, like dictionaries, are kept as (None, records).
+
+    Args: records (list): Records of a parser.
+    Returns: list: The packed records, see unpack_records.
+    """
+    packed = []
+    for record_type, group in groupby(records, key=type):
+        get_fields = _fields_getter(record_type)
+        if get_fields is None:
+            packed.append((None, list(group)))
+        else:
+            packed.append((record_type, list(map(get_fields, group))))
+    return packed
+
+
+def unpack_records(packed: list) -> list:
+    """
+    Rebuilds the records packed by pack_records, in the same order.
+
+    Args: packed (list): The packed records.
+    Returns: list: The records.
+    """
+    records = []
+    for record_type, rows in packed:
+        if record_type is None:
+            records.extend(rows)
+        else:
+            records.extend(starmap(record_type, rows))
+    return records
+
+
+@lru_cache(maxsize=None)
+def _fields_getter(record_type: type) -> Optional[Callable[[Any], tuple]]:
+    """Returns a getter of the fields of a dataclass as a tuple, in order."""
+    if not dataclasses.is_dataclass(record_type):
+        return None
+    names = [record_field.name for record_field in dataclasses.fields(record_type)]
+    if len(names) == 1:
+        getter = attrgetter(names[0])
+        return lambda record: (getter(record),)
+    return attrgetter(*names)
@@ -1,7 +1,8 @@
 from collections import defaultdict
-from typing import List, Dict
+from typing import Iterable, List, Dict
 from ncpeek.netconf_parsers import Parser
 from ncpeek.netconf_devices import NetconfDevice
+from ncpeek.records import IsisNeighbor, IsisStats, IsisSystem, intern_metadata
 
 
 class ISISStatsIOSXEParser(Parser):
@@ -9,6 +10,13 @@ class ISISStatsIOSXEParser(Parser):
     A parser for ISIS stats for IOSXE devices.
     """
 
+    record_path = (
+        "data",
+        "isis-oper-data",
+        "isis-instance",
+        "isis-neighbor",
+    )
+
     def __init__(self, device: NetconfDevice = None):
         """
         Initialize the parser.
@@ -24,7 +32,7 @@ class ISISStatsIOSXEParser(Parser):
         data_to_parse: Dict,
         device: NetconfDevice,
         netconf_filter_id: str,
-    ) -> List[Dict]:
+    ) -> List[IsisStats]:
         """
         Parse ISIS stats data.
 
@@ -34,13 +42,35 @@ class ISISStatsIOSXEParser(Parser):
             filter_id (str): The filter ID used for netconf.
 
         Returns:
-            List[Dict]: The parsed data.
+            List[IsisStats]: The parsed data.
         """
         self.device = device
         self.filter_id = netconf_filter_id
         grouped_data = self._group_data_by_system_id(data_to_parse)
         return self._prepare_output_data(grouped_data)
 
+    def parse_records(
+        self,
+        records: Iterable[Dict],
+        device: NetconfDevice,
+        netconf_filter_id: str,
+    ) -> List[IsisStats]:
+        """
+        Parse ISIS stats data, one neighbor at a time.
+
+        Args:
+            records (Iterable[Dict]): The isis-neighbor entries.
+            device (NetconfDevice): The device the data is related to.
+            filter_id (str): The filter ID used for netconf.
+
+        Returns:
+            List[IsisStats]: The parsed data.
+        """
+        self.device = device
+        self.filter_id = netconf_filter_id
+        grouped_data = self._group_neighbors_by_system_id(records)
+        return self._prepare_output_data(grouped_data)
+
     def _group_data_by_system_id(self, data: Dict) -> Dict:
         """
         Group data by system-id.
@@ -51,39 +81,51 @@ class ISISStatsIOSXEParser(Parser):
         Returns:
             Dict: The grouped data.
         """
-        grouped_data = defaultdict(list)
         neighbors = data["data"]["isis-oper-data"]["isis-instance"][
             "isis-neighbor"
         ]
 
         if isinstance(neighbors, dict):
             neighbors = [neighbors]
+        return self._group_neighbors_by_system_id(neighbors)
+
+    def _group_neighbors_by_system_id(self, neighbors: Iterable[Dict]) -> Dict:
+        """
+        Group neighbors by system-id.
+
+        Args:
+            neighbors (Iterable[Dict]): The isis-neighbor entries.
+
+        Returns:
+            Dict: The grouped data.
+        """
+        grouped_data = defaultdict(list)
         for neighbor in neighbors:
             grouped_data[neighbor["system-id"]].append(
-                self._create_neighbor_dict(neighbor)
+                self._create_neighbor(neighbor)
             )
         return grouped_data
 
     @staticmethod
-    def _create_neighbor_dict(neighbor: Dict) -> Dict:
+    def _create_neighbor(neighbor: Dict) -> IsisNeighbor:
         """
-        Create a dictionary for a neighbor.
+        Create the record of a neighbor.
 
         Args:
             neighbor (Dict): The neighbor data.
 
         Returns:
-            Dict: The neighbor dictionary.
+            IsisNeighbor: The neighbor record.
         """
-        return {
-            "interface_name": neighbor["if-name"],
-            "level": neighbor["level"],
-            "local_ipv4_address": neighbor["ipv4-address"],
-            "isis_status": neighbor["state"],
-            "holdtime": neighbor["holdtime"],
-        }
-
-    def _prepare_output_data(self, grouped_data: Dict) -> List[Dict]:
+        return IsisNeighbor(
+            interface_name=neighbor["if-name"],
+            level=neighbor["level"],
+            local_ipv4_address=neighbor["ipv4-address"],
+            isis_status=neighbor["state"],
+            holdtime=neighbor["holdtime"],
+        )
+
+    def _prepare_output_data(self, grouped_data: Dict) -> List[IsisStats]:
         """
         Prepare the output data.
 
@@ -91,20 +133,16 @@ class ISISStatsIOSXEParser(Parser):
             grouped_data (Dict): The grouped data.
 
         Returns:
-            List[Dict]: The output data.
-        """
-        output_data = [
-            {
-                "isis_neighbors_count": len(grouped_data),
-                "isis-neighbors": self._prepare_neighbor_data(grouped_data),
-                "field": self.filter_id,
-                "device": self.device.hostname,
-                "ip": self.device.host,
-            }
+            List[IsisStats]: The output data.
+        """
+        return [
+            IsisStats(
+                self._prepare_neighbor_data(grouped_data),
+                *intern_metadata(self.device, self.filter_id),
+            )
         ]
-        return output_data
 
-    def _prepare_neighbor_data(self, grouped_data: Dict) -> List[Dict]:
+    def _prepare_neighbor_data(self, grouped_data: Dict) -> tuple:
         """
         Prepare the neighbor data.
 
@@ -112,20 +150,20 @@ class ISISStatsIOSXEParser(Parser):
             grouped_data (Dict): The grouped data.
 
         Returns:
-            List[Dict]: The neighbor data.
+            tuple[IsisSystem]: The neighbor systems.
         """
-        return [
-            {
-                "system-id": system_id,
-                "local_interfaces_status": interfaces,
-                "neighbor_status": (
+        return tuple(
+            IsisSystem(
+                system_id=system_id,
+                neighbors=tuple(neighbors),
+                neighbor_status=(
                     1
                     if any(
-                        interface["isis_status"] == "isis-adj-up"
-                        for interface in interfaces
+                        neighbor.isis_status == "isis-adj-up"
+                        for neighbor in neighbors
                     )
                     else 0
                 ),
-            }
-            for system_id, interfaces in grouped_data.items()
-        ]
+            )
+            for system_id, neighbors in grouped_data.items()
+        )
@@ -1,8 +1,6 @@
 from ncpeek.netconf_parsers import Parser
 from ncpeek.netconf_devices import NetconfDevice
-from ncpeek.parsers.remove_namespaces import (
-    remove_namespaces_from_dict,
-)
+from ncpeek.parsers.remove_namespaces import remove_namespaces_from_dict
 
 
 class DefaultParser(Parser):
@@ -10,6 +8,8 @@ class DefaultParser(Parser):
     A default parser which translate the rcp reply to a generic structure.
     """
 
+    strip_namespaces = True
+
     def parse(
         self,
         data_to_parse: dict,
@@ -27,7 +27,11 @@ class DefaultParser(Parser):
         Returns:
             List[Dict]: The parsed data.
         """
-        data = remove_namespaces_from_dict(data=data_to_parse["data"])
+        data = data_to_parse["data"]
+        # The client drops namespaces while converting the reply,
+        # dictionaries built elsewhere may still have them at any depth.
+        if not self.namespaces_stripped:
+            data = remove_namespaces_from_dict(data=data)
         return [
             {
                 "ip": device.host,
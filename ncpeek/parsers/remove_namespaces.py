@@ -3,47 +3,63 @@ Module for removing namespaces from rpc-reply.
 namespaces are keys on a dictionary
 """
 
-from collections import deque
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 KEYS_TO_REMOVE = {"@xmlns", "@xmlns:nc"}
+NAMESPACE_PREFIX = "@xmlns:"
+
+
+def is_namespace_key(key: str) -> bool:
+    """Checks if the key is a namespace declaration, i.e. '@xmlns' or '@xmlns:nc'."""
+    return key in KEYS_TO_REMOVE or key.startswith(NAMESPACE_PREFIX)
 
 
 def remove_namespaces_from_dict(
-    data: Dict[str, Any], depth_limit=10
+    data: Dict[str, Any], depth_limit: Optional[int] = None
 ) -> Dict[str, Any]:
     """
-    Remove specified keys from a dictionary up to a certain depth.
+    Remove namespace keys from a dictionary, including the dictionaries
+    inside lists. Each value is visited once.
 
     Args:
         data (Dict[str, Any]): The original dictionary.
-        depth_limit (int): The maximum depth to search into the dictionary.
-                           Default is 10.
+        depth_limit (Optional[int]): The maximum depth to search into the dictionary.
+                           Default is None, no limit.
                            After the depth is reached, the remaining
                            dictionaries are copied and not processed.
 
     Returns:
         Dict[str, Any]: A new dictionary without the specified keys.
     """
-    queue = deque([((), data)])
-    result = {}
+    result: dict = {}
+    stack: list = [(data, result, 0)]
+
+    while stack:
+        source, target, depth = stack.pop()
+        if isinstance(source, list):
+            for value in source:
+                target.append(_copy_value(value, depth, stack))
+            continue
 
-    while queue:
-        path, current_data = queue.popleft()
-        depth = len(path)
+        if depth_limit is not None and depth >= depth_limit:
+            target.update(source)
+            continue
 
-        for key, value in current_data.items():
-            if key in KEYS_TO_REMOVE and depth < depth_limit:
+        for key, value in source.items():
+            if is_namespace_key(key):
                 continue
+            target[key] = _copy_value(value, depth + 1, stack)
 
-            new_path = path + (key,)
+    return result
 
-            if isinstance(value, dict) and depth < depth_limit - 1:
-                queue.append((new_path, value))
-            else:
-                current_level = result
-                for sub_key in new_path[:-1]:
-                    current_level = current_level.setdefault(sub_key, {})
-                current_level[new_path[-1]] = value
 
-    return result
+def _copy_value(value: Any, depth: int, stack: list) -> Any:
+    """Returns an empty container to fill later for dicts and lists, or the value."""
+    if isinstance(value, dict):
+        container: Any = {}
+    elif isinstance(value, list):
+        container = []
+    else:
+        return value
+    stack.append((value, container, depth))
+    return container
@@ -0,0 +1,469 @@
+"""
+Module for parsers declared in a spec file instead of Python code.
+
+A spec gives the filter ID, the path to the list of entries and the fields
+read from each entry, in output order:
+
+    {
+      "filter_id": "Cisco-IOS-XE-memory-oper.xml",
+      "record_path": ["data", "memory-statistics", "memory-statistic"],
+      "record": "ncpeek.records.MemoryStats",
+      "fields": [
+        {"name": "name", "path": "name"},
+        {"name": "percent_used", "percent": ["used-memory", "total-memory"]}
+      ]
+    }
+
+Each field reads 'path', a leaf relative to the entry like
+'statistics/in-octets', converted by 'type' (str, int or float).
+'replace' is an [old, new] pair applied to the text, and 'equals'
+gives 1 when the text is that value, 0 otherwise. Derived fields
+use 'percent': [used, total], the used leaf as a percentage of the total.
+field, device and ip are added after the fields of every record.
+
+'record' optionally names a record type of ncpeek.records, built with the
+values of the fields in order: the field names must be the KEYS of the
+record type, without field, device and ip. Records are dictionaries
+otherwise.
+
+Specs are compiled once into a parser class: the leaves of each container
+are read in a single XPath pass, and the fields become a table of
+converters, applied to the texts of each entry. Consecutive fields of
+the same type, like counters, are converted in a single step.
+"""
+
+import os
+import sys
+import json
+import importlib
+from pathlib import Path
+from functools import lru_cache
+from operator import itemgetter
+import dataclasses
+from dataclasses import dataclass
+from typing import Any, Callable, ClassVar, Iterable, Optional, Union
+from ncpeek.netconf_parsers import ElementParser
+from ncpeek.netconf_devices import NetconfDevice
+from ncpeek.records import METADATA_KEYS, attribute_name, intern_metadata
+
+SPEC_SUFFIXES = (".json", ".yaml", ".yml")
+# Directories of user specs, separated like PATH. They override built-in specs.
+SPECS_DIRS_ENV = "NCPEEK_PARSER_SPECS"
+BUILTIN_SPECS_DIR = Path(__file__).parent / "specs"
+FIELD_TYPES = {"str": str, "int": int, "float": float}
+# Containers with at least this many leaves are read in a single pass.
+GROUP_READ_MIN_LEAVES = 3
+
+_SPEC_KEYS = {"filter_id", "record_path", "record", "fields"}
+_FIELD_KEYS = {"name", "path", "type", "replace", "equals", "percent"}
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """A field of the records, read from the leaves of an entry."""
+
+    name: str
+    path: Optional[str] = None
+    type: str = "str"
+    replace: Optional[tuple] = None
+    equals: Optional[str] = None
+    percent: Optional[tuple] = None
+
+    def leaves(self) -> tuple:
+        """Returns the paths of the leaves the field reads."""
+        return self.percent if self.percent else (self.path,)
+
+
+@dataclass(frozen=True)
+class ParserSpec:
+    """A parser declared in a spec file."""
+
+    filter_id: str
+    record_path: tuple
+    fields: tuple[FieldSpec, ...]
+    record: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, spec: dict) -> "ParserSpec":
+        """
+        Builds and validates a spec from its dictionary.
+
+        Args: spec (dict): The content of a spec file.
+        Returns: ParserSpec: The spec.
+        Raises: ValueError: If the spec is not valid.
+        """
+        _check_keys(spec, _SPEC_KEYS, "spec")
+        for required in ("filter_id", "record_path", "fields"):
+            if not spec.get(required):
+                raise ValueError(f"Parser spec without '{required}'")
+        return cls(
+            filter_id=spec["filter_id"],
+            record_path=tuple(spec["record_path"]),
+            fields=tuple(_field_from_dict(field) for field in spec["fields"]),
+            record=spec.get("record"),
+        )
+
+
+def _field_from_dict(field: dict) -> FieldSpec:
+    _check_keys(field, _FIELD_KEYS, "field")
+    name = field.get("name")
+    if not name:
+        raise ValueError(f"Parser spec field without 'name': {field}")
+    if ("path" in field) == ("percent" in field):
+        raise ValueError(f"Field '{name}' needs either 'path' or 'percent'")
+    if field.get("type", "str") not in FIELD_TYPES:
+        raise ValueError(
+            f"Field '{name}' has an unknown type: {field['type']}. "
+            f"Valid options: {', '.join(FIELD_TYPES)}"
+        )
+    if "percent" in field and len(field["percent"]) != 2:
+        raise ValueError(f"Field '{name}' percent needs [used, total] leaves")
+    if "replace" in field and len(field["replace"]) != 2:
+        raise ValueError(f"Field '{name}' replace needs [old, new] strings")
+    return FieldSpec(
+        name=name,
+        path=field.get("path"),
+        type=field.get("type", "str"),
+        replace=tuple(field["replace"]) if "replace" in field else None,
+        equals=field.get("equals"),
+        percent=tuple(field["percent"]) if "percent" in field else None,
+    )
+
+
+def _check_keys(spec: dict, valid: set, kind: str) -> None:
+    unknown = set(spec) - valid
+    if unknown:
+        raise ValueError(
+            f"Unknown {kind} keys: {', '.join(sorted(unknown))}. "
+            f"Valid options: {', '.join(sorted(valid))}"
+        )
+
+
+def read_spec(path: Union[str, Path]) -> ParserSpec:
+    """
+    Reads a spec file, json or yaml. Yaml needs PyYAML installed.
+
+    Args: path (str): The spec file.
+    Returns: ParserSpec: The spec.
+    Raises: ValueError: If the file can not be read or the spec is not valid.
+    """
+    path = Path(path)
+    try:
+        text = path.read_text(encoding="utf-8")
+    except OSError as err:
+        raise ValueError(f"Unable to open parser spec. Error: {err=}") from err
+    if path.suffix == ".json":
+        return ParserSpec.from_dict(json.loads(text))
+    try:
+        yaml = importlib.import_module("yaml")
+    except ImportError as err:
+        raise ValueError(
+            f"PyYAML is needed to read the parser spec {path.name}"
+        ) from err
+    return ParserSpec.from_dict(yaml.safe_load(text))
+
+
+def load_spec_parser(path: Union[str, Path]) -> type["SpecParser"]:
+    """
+    Returns the parser class of a spec file, compiled once per file.
+
+    Args: path (str): The spec file.
+    Returns: type[SpecParser]: The compiled parser class.
+    """
+    return _load_spec_parser(os.path.realpath(path))
+
+
+@lru_cache(maxsize=None)
+def _load_spec_parser(path: str) -> type["SpecParser"]:
+    return compile_spec(read_spec(path))
+
+
+def load_builtin_spec_parser(filename: str) -> type["SpecParser"]:
+    """Returns the parser class of a spec of ncpeek/parsers/specs."""
+    return load_spec_parser(BUILTIN_SPECS_DIR / filename)
+
+
+def find_spec_files() -> dict[str, Path]:
+    """
+    Returns the spec files by filter ID: the built-in specs, then those
+    of the directories of NCPEEK_PARSER_SPECS, later ones taking precedence.
+    A spec file that is not valid is reported on stderr and skipped,
+    so it does not break the filters of the other specs.
+    """
+    directories = [BUILTIN_SPECS_DIR]
+    directories.extend(
+        Path(directory).expanduser()
+        for directory in os.environ.get(SPECS_DIRS_ENV, "").split(os.pathsep)
+        if directory
+    )
+    specs = {}
+    for directory in directories:
+        if not directory.is_dir():
+            continue
+        for path in sorted(directory.iterdir()):
+            if path.suffix in SPEC_SUFFIXES and path.is_file():
+                try:
+                    specs[read_spec(path).filter_id] = path
+                except Exception as err:
+                    print(f"Skipping parser spec {path}: {err}", file=sys.stderr)
+    return specs
+
+
+def compile_spec(spec: ParserSpec) -> type["SpecParser"]:
+    """
+    Compiles a spec into a parser class.
+
+    Args: spec (ParserSpec): The spec.
+    Returns: type[SpecParser]: A SpecParser subclass reading the spec fields.
+    """
+    leaves = tuple(dict.fromkeys(leaf for f in spec.fields for leaf in f.leaves()))
+    index = {leaf: position for position, leaf in enumerate(leaves)}
+    return type(
+        f"SpecParser[{spec.filter_id}]",
+        (SpecParser,),
+        {
+            "spec": spec,
+            "record_path": spec.record_path,
+            "_read_element": staticmethod(_compile_element_reader(leaves)),
+            "_read_entry": staticmethod(_compile_entry_reader(leaves)),
+            "_steps": _compile_steps(spec.fields, index),
+            "_build": staticmethod(_compile_builder(spec)),
+        },
+    )
+
+
+def _compile_element_reader(leaves: tuple) -> Callable[[Any], list]:
+    """
+    Returns a function reading the text of the leaves of an lxml element,
+    in the order of leaves. Leaves of containers holding many of them are
+    read in a single pass, the others with their own XPath.
+    """
+    from ncpeek.utils.xpath_utils import compile_text_xpath, compile_texts_xpath
+
+    containers: dict = {}
+    for leaf in leaves:
+        parent, _, name = leaf.rpartition("/")
+        containers.setdefault(parent, []).append(name)
+
+    readers = []
+    order = []
+    for parent, names in containers.items():
+        if len(names) >= GROUP_READ_MIN_LEAVES:
+            texts = compile_texts_xpath(f"{parent}/*" if parent else "*")
+            readers.append(_texts_reader(texts, names))
+        else:
+            for name in names:
+                readers.append(_text_reader(compile_text_xpath(_join(parent, name))))
+        order.extend(_join(parent, name) for name in names)
+
+    def read(element: Any) -> list:
+        texts = []
+        for reader in readers:
+            texts.extend(reader(element))
+        return texts
+
+    if order == list(leaves):
+        return read
+
+    # Readers go by container, fields by spec order.
+    positions = itemgetter(*(order.index(leaf) for leaf in leaves))
+    return lambda element: _as_list(positions(read(element)), len(leaves))
+
+
+def _texts_reader(texts: Callable, names: list) -> Callable[[Any], tuple]:
+    get = itemgetter(*names)
+    if len(names) == 1:
+        return lambda element: (get(texts(element)),)
+    return lambda element: get(texts(element))
+
+
+def _text_reader(xpath: Callable) -> Callable[[Any], tuple]:
+    return lambda element: (xpath(element),)
+
+
+def _compile_entry_reader(leaves: tuple) -> Callable[[dict], list]:
+    """Returns a function reading the leaves of an entry of the reply dictionary."""
+    paths = tuple(tuple(leaf.split("/")) for leaf in leaves)
+
+    def read(entry: dict) -> list:
+        texts = []
+        for path in paths:
+            value = entry
+            for name in path:
+                value = value[name]
+            texts.append(value)
+        return texts
+
+    return read
+
+
+def _compile_steps(fields: tuple, index: dict) -> tuple:
+    """
+    Returns the steps converting the texts of an entry into the values of
+    its fields, in order. Each step returns the values of one or more fields,
+    consecutive fields with a plain type conversion share a single step.
+    """
+    steps = []
+    run: list = []
+    for field in fields + (None,):
+        if field is not None and _is_plain(field):
+            if run and (run[-1].type != field.type):
+                steps.append(_compile_run(run, index))
+                run = []
+            run.append(field)
+            continue
+        if run:
+            steps.append(_compile_run(run, index))
+            run = []
+        if field is not None:
+            convert = _compile_field(field, index)
+            steps.append(lambda texts, convert=convert: (convert(texts),))
+    return tuple(steps)
+
+
+def _is_plain(field: FieldSpec) -> bool:
+    return not (field.percent or field.replace or field.equals is not None)
+
+
+def _compile_run(run: list, index: dict) -> Callable[[list], Iterable]:
+    """Returns the step of fields of the same type without other conversion."""
+    convert = FIELD_TYPES[run[0].type]
+    positions = [index[field.path] for field in run]
+    start, stop = positions[0], positions[-1] + 1
+    if positions == list(range(start, stop)):
+        if convert is str:
+            return lambda texts: texts[start:stop]
+        return lambda texts: map(convert, texts[start:stop])
+    get = itemgetter(*positions)
+    if len(positions) == 1:
+        return lambda texts: (convert(get(texts)),)
+    return lambda texts: map(convert, get(texts))
+
+
+def _compile_field(field: FieldSpec, index: dict) -> Callable[[list], Any]:
+    """Returns the converter of a field, reading the texts of an entry."""
+    if field.percent:
+        used, total = (index[leaf] for leaf in field.percent)
+        return lambda texts: (int(texts[used]) / int(texts[total])) * 100
+
+    position = index[field.path]
+    if field.equals is not None:
+        equals = field.equals
+        return lambda texts: 1 if texts[position] == equals else 0
+    convert = FIELD_TYPES[field.type]
+    if field.replace:
+        old, new = field.replace
+        return lambda texts: convert(texts[position].replace(old, new))
+    if convert is str:
+        return itemgetter(position)
+    return lambda texts: convert(texts[position])
+
+
+def _compile_builder(spec: ParserSpec) -> Callable[[list, tuple], Any]:
+    """Returns the function building a record from its values and metadata."""
+    if spec.record:
+        module_name, _, class_name = spec.record.rpartition(".")
+        record_type = getattr(importlib.import_module(module_name), class_name)
+        _check_record_keys(spec, record_type)
+        return lambda values, metadata: record_type(*values, *metadata)
+
+    keys = (*(field.name for field in spec.fields), *METADATA_KEYS)
+    return lambda values, metadata: dict(zip(keys, (*values, *metadata)))
+
+
+def _check_record_keys(spec: ParserSpec, record_type: type) -> None:
+    """
+    Checks the fields of a spec are the keys of its record type, in order,
+    as the record is built with their values by position.
+
+    Raises:
+        ValueError: If the field names differ from the record keys.
+    """
+    names = (*(field.name for field in spec.fields), *METADATA_KEYS)
+    keys = getattr(record_type, "KEYS", None)
+    attributes = tuple(field.name for field in dataclasses.fields(record_type))
+    if names != keys or tuple(map(attribute_name, names)) != attributes:
+        raise ValueError(
+            f"The fields of spec '{spec.filter_id}' must be the keys of "
+            f"{spec.record} in order: {', '.join(keys or attributes)}"
+        )
+
+
+def _join(parent: str, name: str) -> str:
+    return f"{parent}/{name}" if parent else name
+
+
+def _as_list(values: Any, count: int) -> list:
+    """itemgetter returns a single value, not a tuple, for a single item."""
+    return [values] if count == 1 else list(values)
+
+
+class SpecParser(ElementParser):
+    """
+    Base class of the parsers compiled from specs, see compile_spec.
+    Reads the reply elements, or the reply dictionary given to 'parse'.
+    """
+
+    spec: ClassVar[ParserSpec]
+    _steps: ClassVar[tuple]
+
+    def parse(
+        self,
+        data_to_parse: dict,
+        device: NetconfDevice,
+        netconf_filter_id: str,
+    ) -> list:
+        """
+        Parse the entries found at 'record_path' of the reply dictionary.
+
+        Args:
+            data_to_parse (dict): The data to parse.
+            device (NetconfDevice): The device the data is related to.
+            netconf_filter_id (str): The filter ID used for netconf.
+
+        Returns:
+            list: The parsed records.
+        """
+        entries = data_to_parse
+        for name in self.record_path:
+            entries = entries[name]
+        if isinstance(entries, dict):
+            entries = [entries]
+        return self._parse(entries, self._read_entry, device, netconf_filter_id)
+
+    def parse_elements(
+        self,
+        elements: Iterable[Any],
+        device: NetconfDevice,
+        netconf_filter_id: str,
+    ) -> list:
+        """
+        Parse the entries, one element at a time.
+
+        Args:
+            elements (Iterable[etree._Element]): The elements at 'record_path'.
+            device (NetconfDevice): The device the data is related to.
+            netconf_filter_id (str): The filter ID used for netconf.
+
+        Returns:
+            list: The parsed records.
+        """
+        return self._parse(elements, self._read_element, device, netconf_filter_id)
+
+    def _parse(
+        self,
+        entries: Iterable,
+        read: Callable[[Any], list],
+        device: NetconfDevice,
+        netconf_filter_id: str,
+    ) -> list:
+        metadata = intern_metadata(device, netconf_filter_id)
+        steps = self._steps
+        build = self._build
+        records = []
+        for texts in map(read, entries):
+            values = []
+            for step in steps:
+                values.extend(step(texts))
+            records.append(build(values, metadata))
+        return records
@@ -0,0 +1,76 @@
+import sys
+import time
+from typing import Optional, TextIO
+from dataclasses import dataclass, field
+from ncpeek.client import NetconfClient
+from ncpeek.session_pool import SessionPool
+
+
+@dataclass
+class Poller:
+    """
+    Keeps a NetconfClient loaded and fetches data on every cycle.
+
+    Follows the Telegraf execd protocol:
+    without interval, a cycle runs for each new line read from stdin
+    and the poller stops when stdin is closed.
+    With interval, a cycle runs every interval seconds.
+
+    Each cycle writes its records to the output using the output
+    format of the client, one line of JSON by default.
+    A failed cycle is reported on stderr and the poller keeps running.
+    """
+
+    client: NetconfClient
+    interval: Optional[float] = None
+    input_stream: TextIO = field(default_factory=lambda: sys.stdin)
+    output_stream: TextIO = field(default_factory=lambda: sys.stdout)
+    error_stream: TextIO = field(default_factory=lambda: sys.stderr)
+
+    def run(self) -> None:
+        """Runs poll cycles until stdin is closed or the process is stopped."""
+        try:
+            if self.interval:
+                self._run_on_interval()
+            else:
+                self._run_on_input()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.client.close()
+
+    def poll_once(self) -> None:
+        """Runs a single cycle and writes its result."""
+        try:
+            self.client.write_results(output=self.output_stream)
+        except Exception as err:
+            self.error_stream.write(f"Error found: {err=}\n")
+            self.error_stream.flush()
+
+    def _run_on_input(self) -> None:
+        """Runs a cycle for each line received, until the input is closed."""
+        for _ in self.input_stream:
+            self.poll_once()
+
+    def _run_on_interval(self) -> None:
+        """Runs a cycle every interval seconds, without drifting."""
+        next_cycle = time.monotonic()
+        while True:
+            self.poll_once()
+            next_cycle += self.interval
+            delay = next_cycle - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_cycle = time.monotonic()
+
+
+def poll_cli(argv: Optional[list] = None) -> None:
+    """Runs the poll command with the arguments supplied."""
+    client = NetconfClient(session_pool=SessionPool())
+    try:
+        client.setup_cli(argv=argv, poll=True)
+    except Exception as err:
+        print(f"Error found: {err=}")
+        sys.exit(2)
+    Poller(client=client, interval=client.get_poll_interval()).run()
@@ -0,0 +1,187 @@
+"""
+Module for the record types produced by the built-in parsers.
+Records are frozen and slotted, so they hold no per-record dictionary,
+and share interned device, ip and field strings. They are converted to
+dictionaries only where written, by the JSON backends, the output formats
+and fetch_iter. to_dict() returns the keys the parsers always returned.
+Records built from a parser spec list these keys in KEYS, in the order of
+their attributes, which replace the '-' of the keys by '_'.
+"""
+
+import sys
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import ClassVar, Optional
+from ncpeek.netconf_devices import NetconfDevice
+
+METADATA_KEYS = ("field", "device", "ip")
+# Output key of each counter of InterfaceStats, in output order.
+# Attributes replace the '-' of the keys by '_'.
+INTERFACE_COUNTERS = (
+    "in_octets",
+    "in_errors",
+    "out_octets",
+    "out_errors",
+    "in-broadcast-pkts",
+    "in-crc-errors",
+    "in-discards",
+    "in-discards-64",
+    "in-errors-64",
+    "in-multicast-pkts",
+    "in-unicast-pkts",
+    "in-unknown-protos",
+    "in-unknown-protos-64",
+    "num-flaps",
+    "out-broadcast-pkts",
+    "out-discards",
+    "out-multicast-pkts",
+    "out-octets-64",
+    "out-unicast-pkts",
+    "rx-kbps",
+    "rx-pps",
+    "tx-kbps",
+    "tx-pps",
+)
+
+
+def intern_metadata(
+    device: NetconfDevice, netconf_filter_id: Optional[str]
+) -> tuple:
+    """
+    Returns the field, device and ip of the records of a reply, interned
+    so every record and cycle of a device shares the same strings.
+    """
+    return tuple(
+        sys.intern(value) if isinstance(value, str) else value
+        for value in (netconf_filter_id, device.hostname, device.host)
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class InterfaceStats:
+    """Counters and status of an interface, see INTERFACE_COUNTERS."""
+
+    KEYS: ClassVar[tuple] = (
+        *INTERFACE_COUNTERS,
+        "operational_status",
+        "name",
+        *METADATA_KEYS,
+    )
+
+    in_octets: int
+    in_errors: int
+    out_octets: int
+    out_errors: int
+    in_broadcast_pkts: int
+    in_crc_errors: int
+    in_discards: int
+    in_discards_64: int
+    in_errors_64: int
+    in_multicast_pkts: int
+    in_unicast_pkts: int
+    in_unknown_protos: int
+    in_unknown_protos_64: int
+    num_flaps: int
+    out_broadcast_pkts: int
+    out_discards: int
+    out_multicast_pkts: int
+    out_octets_64: int
+    out_unicast_pkts: int
+    rx_kbps: int
+    rx_pps: int
+    tx_kbps: int
+    tx_pps: int
+    operational_status: int
+    name: str
+    field: Optional[str]
+    device: Optional[str]
+    ip: Optional[str]
+
+    def to_dict(self) -> dict:
+        return dict(zip(self.KEYS, _INTERFACE_STATS_VALUES(self)))
+
+
+@dataclass(frozen=True, slots=True)
+class MemoryStats:
+    """Usage of a memory pool."""
+
+    KEYS: ClassVar[tuple] = ("name", "percent_used", *METADATA_KEYS)
+
+    name: str
+    percent_used: float
+    field: Optional[str]
+    device: Optional[str]
+    ip: Optional[str]
+
+    def to_dict(self) -> dict:
+        return dict(zip(self.KEYS, _MEMORY_STATS_VALUES(self)))
+
+
+@dataclass(frozen=True, slots=True)
+class IsisNeighbor:
+    """An ISIS adjacency, on one local interface."""
+
+    interface_name: str
+    level: str
+    local_ipv4_address: Optional[str]
+    isis_status: str
+    holdtime: str
+
+    def to_dict(self) -> dict:
+        return {
+            "interface_name": self.interface_name,
+            "level": self.level,
+            "local_ipv4_address": self.local_ipv4_address,
+            "isis_status": self.isis_status,
+            "holdtime": self.holdtime,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class IsisSystem:
+    """The adjacencies of an ISIS neighbor system, up if any is up."""
+
+    system_id: str
+    neighbors: tuple[IsisNeighbor, ...]
+    neighbor_status: int
+
+    def to_dict(self) -> dict:
+        return {
+            "system-id": self.system_id,
+            "local_interfaces_status": [
+                neighbor.to_dict() for neighbor in self.neighbors
+            ],
+            "neighbor_status": self.neighbor_status,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class IsisStats:
+    """The ISIS neighbor systems of a device."""
+
+    systems: tuple[IsisSystem, ...]
+    field: Optional[str]
+    device: Optional[str]
+    ip: Optional[str]
+
+    @property
+    def isis_neighbors_count(self) -> int:
+        return len(self.systems)
+
+    def to_dict(self) -> dict:
+        return {
+            "isis_neighbors_count": self.isis_neighbors_count,
+            "isis-neighbors": [system.to_dict() for system in self.systems],
+            "field": self.field,
+            "device": self.device,
+            "ip": self.ip,
+        }
+
+
+def attribute_name(key: str) -> str:
+    """Returns the attribute of a record holding an output key."""
+    return key.replace("-", "_")
+
+
+_INTERFACE_STATS_VALUES = attrgetter(*map(attribute_name, InterfaceStats.KEYS))
+_MEMORY_STATS_VALUES = attrgetter(*map(attribute_name, MemoryStats.KEYS))
@@ -0,0 +1,244 @@
+"""
+Module for keeping netconf sessions open between operations.
+Sessions are grouped by device identity and reused until they
+are idle longer than the configured TTL or found broken.
+"""
+
+import time
+import threading
+from typing import Any, Callable, Optional, TypeVar
+from dataclasses import dataclass, field
+from ncpeek.netconf_devices import NetconfDevice
+
+DEFAULT_MAX_SESSIONS_PER_DEVICE = 1
+DEFAULT_IDLE_TTL = 300
+DEFAULT_KEEPALIVE_INTERVAL = 30
+
+T = TypeVar("T")
+
+
+@dataclass
+class PooledSession:
+    """A netconf manager kept open by the pool."""
+
+    manager: Any
+    last_used: float = field(default_factory=time.monotonic)
+
+    def is_alive(self) -> bool:
+        """Checks the underlying ssh session is still connected."""
+        return bool(getattr(self.manager, "connected", False))
+
+    def close(self) -> None:
+        """Closes the netconf session, ignoring errors of dead sessions."""
+        try:
+            self.manager.close_session()
+        except Exception:
+            pass
+
+
+@dataclass
+class SessionPool:
+    """
+    Keeps netconf sessions open between fetch() calls.
+
+    max_sessions_per_device: sessions allowed per device at the same time.
+    idle_ttl: seconds an unused session is kept before being closed.
+    keepalive_interval: seconds between ssh keepalives, 0 disables them.
+    """
+
+    max_sessions_per_device: int = DEFAULT_MAX_SESSIONS_PER_DEVICE
+    idle_ttl: float = DEFAULT_IDLE_TTL
+    keepalive_interval: int = DEFAULT_KEEPALIVE_INTERVAL
+    _idle: dict = field(default_factory=dict, repr=False)
+    _active: dict = field(default_factory=dict, repr=False)
+    _condition: threading.Condition = field(
+        default_factory=threading.Condition, repr=False
+    )
+
+    def run(
+        self,
+        device: NetconfDevice,
+        operation: Callable[[Any], T],
+        connect: Callable[[], Any],
+    ) -> T:
+        """
+        Runs an operation on a pooled session of the device.
+
+        If the transport of a reused session broke, the session is
+        discarded and the operation is retried once on a new session.
+        An rpc-error leaves the session usable, it goes back to the pool
+        and the error is raised. Other errors discard the session.
+
+        Args:
+            device: The device the session belongs to.
+            operation: Callable receiving the netconf manager.
+            connect: Callable returning a new netconf manager.
+
+        Returns: The result of the operation.
+        """
+        key = device.session_key()
+        session, reused = self._acquire(key, device, connect)
+        try:
+            return self._run_on(key, session, operation)
+        except Exception as err:
+            if not reused or not is_session_error(err):
+                raise
+        session, _ = self._acquire(key, device, connect)
+        return self._run_on(key, session, operation)
+
+    def close(self) -> None:
+        """Closes all idle sessions."""
+        with self._condition:
+            idle_sessions = [
+                session
+                for sessions in self._idle.values()
+                for session in sessions
+            ]
+            self._idle.clear()
+        for session in idle_sessions:
+            session.close()
+
+    def size(self) -> int:
+        """Returns the number of open sessions, idle and in use."""
+        with self._condition:
+            return sum(len(sessions) for sessions in self._idle.values()) + sum(
+                self._active.values()
+            )
+
+    def _acquire(
+        self,
+        key: tuple,
+        device: NetconfDevice,
+        connect: Callable[[], Any],
+    ) -> tuple[PooledSession, bool]:
+        """
+        Returns a healthy idle session or a new one, and whether it was reused.
+        Waits for a free slot if the device reached max_sessions_per_device.
+        """
+        self._evict_idle()
+        deadline = time.monotonic() + (device.timeout or NetconfDevice.timeout)
+        with self._condition:
+            while True:
+                idle_sessions = self._idle.get(key, [])
+                while idle_sessions:
+                    session = idle_sessions.pop()
+                    if session.is_alive():
+                        self._active[key] = self._active.get(key, 0) + 1
+                        return session, True
+                    session.close()
+                if self._active.get(key, 0) < self.max_sessions_per_device:
+                    self._active[key] = self._active.get(key, 0) + 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"No netconf session available for host '{device.host}'"
+                    )
+                self._condition.wait(timeout=remaining)
+
+        try:
+            manager = connect()
+        except Exception:
+            self._release_slot(key)
+            raise
+        self._enable_keepalive(manager)
+        return PooledSession(manager=manager), False
+
+    def _run_on(
+        self, key: tuple, session: PooledSession, operation: Callable[[Any], T]
+    ) -> T:
+        """Runs an operation, then releases the session or discards it."""
+        try:
+            result = operation(session.manager)
+        except Exception as err:
+            if _is_rpc_error(err):
+                self._release(key, session)
+            elif is_session_error(err):
+                # A close-session rpc would wait for the timeout.
+                close_transport(session.manager)
+                self._release_slot(key)
+            else:
+                self._discard(key, session)
+            raise
+        self._release(key, session)
+        return result
+
+    def _release(self, key: tuple, session: PooledSession) -> None:
+        """Returns a session to the idle list."""
+        session.last_used = time.monotonic()
+        with self._condition:
+            self._idle.setdefault(key, []).append(session)
+            self._decrement_active(key)
+            self._condition.notify_all()
+
+    def _discard(self, key: tuple, session: PooledSession) -> None:
+        """Closes a failed session and frees its slot."""
+        session.close()
+        self._release_slot(key)
+
+    def _release_slot(self, key: tuple) -> None:
+        with self._condition:
+            self._decrement_active(key)
+            self._condition.notify_all()
+
+    def _decrement_active(self, key: tuple) -> None:
+        """Must be called holding the condition lock."""
+        self._active[key] = self._active.get(key, 1) - 1
+        if self._active[key] <= 0:
+            del self._active[key]
+
+    def _evict_idle(self) -> None:
+        """Closes the sessions that have been idle longer than idle_ttl."""
+        now = time.monotonic()
+        expired = []
+        with self._condition:
+            for key, sessions in list(self._idle.items()):
+                alive = []
+                for session in sessions:
+                    if now - session.last_used > self.idle_ttl:
+                        expired.append(session)
+                    else:
+                        alive.append(session)
+                if alive:
+                    self._idle[key] = alive
+                else:
+                    del self._idle[key]
+        for session in expired:
+            session.close()
+
+    def _enable_keepalive(self, manager: Any) -> None:
+        """Enables ssh keepalives so idle sessions are not dropped silently."""
+        if not self.keepalive_interval:
+            return
+        transport: Optional[Any] = getattr(
+            getattr(manager, "_session", None), "_transport", None
+        )
+        if transport is not None and hasattr(transport, "set_keepalive"):
+            transport.set_keepalive(self.keepalive_interval)
+
+
+def is_session_error(err: Exception) -> bool:
+    """Checks whether an error broke the session rather than the rpc."""
+    # ncclient is loaded by then, a session ran the operation.
+    from ncclient.transport.errors import TransportError
+
+    # SessionCloseError is a TransportError, socket errors are OSError.
+    return isinstance(err, (TransportError, OSError))
+
+
+def close_transport(manager: Any) -> None:
+    """
+    Closes the ssh transport of a broken session and stops its thread,
+    without the close-session rpc. Errors are ignored.
+    """
+    try:
+        manager._session.close()
+    except Exception:
+        pass
+
+
+def _is_rpc_error(err: Exception) -> bool:
+    """Checks whether an error is an rpc-error replied by the device."""
+    from ncclient.operations.rpc import RPCError
+
+    return isinstance(err, RPCError)
@@ -0,0 +1,86 @@
+"""
+Runs simulated netconf devices until interrupted.
+
+Usage:
+    python -m ncpeek.simulator --devices 50 --base-port 10830 --settings-file sim.json
+    python -m ncpeek -d sim.json -x Cisco-IOS-XE-interfaces-oper.xml
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from ncpeek.simulator.replies import DEFAULT_REPLY_SIZE, ReplyCatalog
+from ncpeek.simulator.server import (
+    DEFAULT_HOST,
+    FAILURE_MODES,
+    NetconfSimulator,
+)
+
+
+def create_simulator_argument_parser() -> argparse.ArgumentParser:
+    """Create and return the argument parser of the simulator."""
+    parser = argparse.ArgumentParser(
+        prog="python -m ncpeek.simulator",
+        description="Simulated netconf devices on localhost, for load tests.",
+    )
+    parser.add_argument("--devices", type=int, default=1)
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument(
+        "--base-port", type=int, default=0, help="First port. Default: free ports."
+    )
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=DEFAULT_REPLY_SIZE,
+        help="Entries of each generated reply, i.e. interfaces.",
+    )
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--failure-mode", choices=FAILURE_MODES, default="error")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--settings-file",
+        help="Write the device settings to this file. Default: stdout.",
+    )
+    return parser
+
+
+def main(argv: list = None) -> None:
+    args = create_simulator_argument_parser().parse_args(argv)
+    simulator = NetconfSimulator(
+        devices=args.devices,
+        replies=ReplyCatalog(size=args.size),
+        host=args.host,
+        base_port=args.base_port,
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        failure_mode=args.failure_mode,
+        seed=args.seed,
+    )
+    with simulator:
+        settings = json.dumps(simulator.device_settings(), indent=2)
+        if args.settings_file:
+            # Written whole at once, so readers never see a partial file.
+            partial_file = f"{args.settings_file}.partial"
+            with open(partial_file, "w", encoding="utf-8") as file:
+                file.write(settings)
+            os.replace(partial_file, args.settings_file)
+            print(
+                f"{args.devices} devices listening, settings in {args.settings_file}",
+                file=sys.stderr,
+            )
+        else:
+            print(settings, flush=True)
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Generators of synthetic rpc-replies, used by the simulator and the benchmarks.
+
+The replies have the shape of the real device replies, with the same
+namespaces, so the parsers and converters take the same code paths
+as with a device. No device or network access is needed.
+"""
+
+from typing import Callable, Optional
+from dataclasses import dataclass, field
+from ncpeek.records import INTERFACE_COUNTERS
+
+DEFAULT_REPLY_SIZE = 10
+# Output key and element name of each counter under 'statistics'.
+STATISTICS = tuple((key, key.replace("_", "-")) for key in INTERFACE_COUNTERS)
+
+NETCONF_NAMESPACE = "urn:ietf:params:xml:ns:netconf:base:1.0"
+IOSXE_INTERFACES_NAMESPACE = "http://cisco.com/ns/yang/Cisco-IOS-XE-interfaces-oper"
+IOSXE_ISIS_NAMESPACE = "http://cisco.com/ns/yang/Cisco-IOS-XE-isis-oper"
+IOSXE_MEMORY_NAMESPACE = "http://cisco.com/ns/yang/Cisco-IOS-XE-memory-oper"
+GENERIC_NAMESPACE = "http://example.com/ns/yang/deep-oper"
+
+
+def _data(body: str) -> str:
+    return (
+        f'<data xmlns="{NETCONF_NAMESPACE}" xmlns:nc="{NETCONF_NAMESPACE}">'
+        f"{body}</data>"
+    )
+
+
+def iosxe_interfaces_reply(count: int) -> str:
+    """Cisco-IOS-XE-interfaces-oper reply with 'count' interfaces."""
+    interfaces = []
+    for index in range(count):
+        counters = "".join(
+            f"<{name}>{index + n}</{name}>" for n, (_, name) in enumerate(STATISTICS)
+        )
+        interfaces.append(
+            "<interface>"
+            f"<name>GigabitEthernet1/0/{index}</name>"
+            "<oper-status>if-oper-state-ready</oper-status>"
+            f"<statistics>{counters}</statistics>"
+            "</interface>"
+        )
+    return _data(
+        f'<interfaces xmlns="{IOSXE_INTERFACES_NAMESPACE}">{"".join(interfaces)}</interfaces>'
+    )
+
+
+def isis_neighbors_reply(count: int, neighbors_per_system: int = 4) -> str:
+    """
+    Cisco-IOS-XE-isis-oper reply with 'count' neighbors,
+    'neighbors_per_system' adjacencies per system-id.
+    """
+    neighbors = []
+    for index in range(count):
+        system = index // neighbors_per_system
+        neighbors.append(
+            "<isis-neighbor>"
+            f"<system-id>{system >> 16 & 0xFF:04x}.{system >> 8 & 0xFF:04x}.{system & 0xFF:04x}</system-id>"
+            f"<if-name>GigabitEthernet{index % 48}</if-name>"
+            f"<level>level-{index % 2 + 1}</level>"
+            f"<ipv4-address>10.{index >> 16 & 0xFF}.{index >> 8 & 0xFF}.{index & 0xFF}</ipv4-address>"
+            "<state>isis-adj-up</state>"
+            f"<holdtime>{20 + index % 10}</holdtime>"
+            "</isis-neighbor>"
+        )
+    return _data(
+        f'<isis-oper-data xmlns="{IOSXE_ISIS_NAMESPACE}">'
+        f"<isis-instance><tag>1</tag>{''.join(neighbors)}</isis-instance>"
+        "</isis-oper-data>"
+    )
+
+
+def iosxe_memory_reply(count: int) -> str:
+    """Cisco-IOS-XE-memory-oper reply with 'count' memory pools."""
+    statistics = "".join(
+        "<memory-statistic>"
+        f"<name>Pool{index}</name>"
+        "<total-memory>2028113884</total-memory>"
+        f"<used-memory>{192040880 + index}</used-memory>"
+        "</memory-statistic>"
+        for index in range(count)
+    )
+    return _data(
+        f'<memory-statistics xmlns="{IOSXE_MEMORY_NAMESPACE}">{statistics}</memory-statistics>'
+    )
+
+
+def deep_generic_reply(nodes: int, depth: int = 25, leaves_per_entry: int = 4) -> str:
+    """
+    Reply with about 'nodes' elements, as a list of entries nested
+    'depth' containers deep. Every element declares a namespace.
+    """
+    entries = max((nodes - depth) // (leaves_per_entry + 1), 1)
+    entry = "".join(
+        f'<leaf-{n} xmlns="{GENERIC_NAMESPACE}">{n}</leaf-{n}>'
+        for n in range(leaves_per_entry)
+    )
+    body = f'<entry xmlns="{GENERIC_NAMESPACE}">{entry}</entry>' * entries
+    for level in reversed(range(depth)):
+        body = f'<level-{level} xmlns="{GENERIC_NAMESPACE}">{body}</level-{level}>'
+    return _data(body)
+
+
+def empty_reply(count: int = 0) -> str:
+    """Reply without data, as sent for filters matching nothing."""
+    return _data("")
+
+
+DEFAULT_GENERATORS: dict[str, Callable[[int], str]] = {
+    "interfaces": iosxe_interfaces_reply,
+    "memory-statistics": iosxe_memory_reply,
+    "isis-oper-data": isis_neighbors_reply,
+}
+
+
+@dataclass
+class ReplyCatalog:
+    """
+    Selects the reply of each filter.
+
+    Filters are identified by the name of their top element, without
+    namespace: the first element of subtree filters or the first step
+    of xpath filters. i.e. 'interfaces' for '/ios:interfaces/interface'.
+    canned replies are sent as they are, generators are called with size.
+    Filters without reply get an empty data element.
+    Generated replies are built once per filter and reused.
+    """
+
+    canned: dict[str, str] = field(default_factory=dict)
+    generators: dict[str, Callable[[int], str]] = field(
+        default_factory=lambda: dict(DEFAULT_GENERATORS)
+    )
+    size: int = DEFAULT_REPLY_SIZE
+    _generated: dict = field(default_factory=dict, repr=False)
+
+    def reply(self, filter_key: Optional[str]) -> str:
+        """
+        Returns the data element to send for the filter.
+
+        Args: filter_key (str): The name of the top element of the filter.
+        Returns: str: The data element, as xml.
+        """
+        if filter_key in self.canned:
+            return self.canned[filter_key]
+        if filter_key not in self._generated:
+            generator = self.generators.get(filter_key, empty_reply)
+            self._generated[filter_key] = generator(self.size)
+        return self._generated[filter_key]
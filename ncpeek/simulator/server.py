@@ -0,0 +1,331 @@
+"""
+Module for simulating netconf devices on localhost.
+Each simulated device is a NETCONF over SSH server on its own port,
+answering <get> with replies of a ReplyCatalog.
+Only meant for tests and load tests, not for production use.
+"""
+
+import socket
+import random
+import threading
+import time
+from typing import Any, Iterator, Optional
+from dataclasses import dataclass, field
+from xml.sax.saxutils import escape
+import paramiko
+from lxml import etree
+from ncpeek.simulator.replies import ReplyCatalog
+
+NETCONF_NAMESPACE = "urn:ietf:params:xml:ns:netconf:base:1.0"
+MESSAGE_SEPARATOR = b"]]>]]>"
+CAPABILITIES = (
+    "urn:ietf:params:netconf:base:1.0",
+    "urn:ietf:params:netconf:capability:xpath:1.0",
+)
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_USERNAME = "admin"
+DEFAULT_PASSWORD = "admin"
+FAILURE_MODES = ("error", "disconnect")
+READ_SIZE = 65536
+
+
+@dataclass
+class NetconfSimulator:
+    """
+    Runs 'devices' simulated netconf devices, one per port.
+
+    Ports start at base_port, 0 lets the system pick free ports.
+    Each reply is delayed by latency seconds, plus or minus a random jitter.
+    failure_rate is the probability of a <get> failing, with failure_mode:
+    'error' replies with an rpc-error, 'disconnect' closes the session.
+    seed makes jitter and failures repeatable.
+
+    Use it as a context manager, or call start() and stop().
+    """
+
+    devices: int = 1
+    replies: ReplyCatalog = field(default_factory=ReplyCatalog)
+    host: str = DEFAULT_HOST
+    base_port: int = 0
+    username: str = DEFAULT_USERNAME
+    password: str = DEFAULT_PASSWORD
+    latency: float = 0.0
+    jitter: float = 0.0
+    failure_rate: float = 0.0
+    failure_mode: str = "error"
+    seed: Optional[int] = None
+    ports: list = field(default_factory=list, init=False)
+    _sockets: list = field(default_factory=list, init=False, repr=False)
+    _threads: list = field(default_factory=list, init=False, repr=False)
+    _transports: list = field(default_factory=list, init=False, repr=False)
+    _stopped: threading.Event = field(
+        default_factory=threading.Event, init=False, repr=False
+    )
+    _random: random.Random = field(init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+    _host_key: Any = field(default=None, init=False, repr=False)
+    _session_ids: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.failure_mode not in FAILURE_MODES:
+            raise ValueError(
+                f"failure_mode must be one of {FAILURE_MODES}, got {self.failure_mode}"
+            )
+        self._random = random.Random(self.seed)
+
+    def __enter__(self) -> "NetconfSimulator":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Opens the ports of the devices and starts accepting sessions."""
+        self._host_key = paramiko.RSAKey.generate(2048)
+        self._stopped.clear()
+        for index in range(self.devices):
+            port = self.base_port + index if self.base_port else 0
+            listener = socket.create_server((self.host, port), backlog=128)
+            self._sockets.append(listener)
+            self.ports.append(listener.getsockname()[1])
+            self._start_thread(self._accept_sessions, listener)
+
+    def stop(self) -> None:
+        """Closes the ports and the open sessions."""
+        self._stopped.set()
+        for listener in self._sockets:
+            # shutdown wakes up the thread blocked on accept()
+            try:
+                listener.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            listener.close()
+        with self._lock:
+            transports = list(self._transports)
+        for transport in transports:
+            transport.close()
+        with self._lock:
+            threads = list(self._threads)
+        for thread in threads:
+            thread.join(timeout=5)
+        self._sockets.clear()
+        self._threads.clear()
+        self._transports.clear()
+        self.ports.clear()
+
+    def device_settings(self, timeout: int = 30) -> list[dict]:
+        """
+        Returns the settings of the devices, ready for NetconfClient.
+
+        Args: timeout (int): Seconds the client waits for each device.
+        Returns: list[dict]: One device settings per simulated device.
+        """
+        return [
+            {
+                "host": self.host,
+                "port": port,
+                "username": self.username,
+                "password": self.password,
+                "hostname": f"simulated-{index}",
+                "timeout": timeout,
+                "hostkey_verify": False,
+                "allow_agent": False,
+                "look_for_keys": False,
+            }
+            for index, port in enumerate(self.ports)
+        ]
+
+    def _start_thread(self, target, *args) -> None:
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        with self._lock:
+            self._threads = [
+                running for running in self._threads if running.is_alive()
+            ]
+            self._threads.append(thread)
+
+    def _accept_sessions(self, listener: socket.socket) -> None:
+        """Starts a session handler for each incoming connection."""
+        while not self._stopped.is_set():
+            try:
+                connection, _ = listener.accept()
+            except OSError:
+                return
+            self._start_thread(self._serve_connection, connection)
+
+    def _serve_connection(self, connection: socket.socket) -> None:
+        """Runs the ssh server side and the netconf subsystem of a connection."""
+        transport = paramiko.Transport(connection)
+        transport.add_server_key(self._host_key)
+        subsystem_ready = threading.Event()
+        with self._lock:
+            self._transports.append(transport)
+        try:
+            transport.start_server(
+                server=_SSHServer(self.username, self.password, subsystem_ready)
+            )
+            channel = transport.accept(timeout=30)
+            if channel is None or not subsystem_ready.wait(timeout=30):
+                return
+            self._serve_netconf(channel)
+        except (EOFError, OSError, paramiko.SSHException):
+            pass
+        finally:
+            transport.close()
+            with self._lock:
+                if transport in self._transports:
+                    self._transports.remove(transport)
+
+    def _serve_netconf(self, channel: Any) -> None:
+        """Exchanges hellos, then answers rpcs until the session is closed."""
+        with self._lock:
+            self._session_ids += 1
+            session_id = self._session_ids
+        channel.sendall(_hello(session_id))
+
+        messages = _read_messages(channel)
+        if next(messages, None) is None:
+            return
+        for message in messages:
+            reply, keep_open = self._handle_rpc(message)
+            if reply is not None:
+                channel.sendall(reply)
+            if not keep_open:
+                return
+
+    def _handle_rpc(self, message: bytes) -> tuple[Optional[bytes], bool]:
+        """Returns the framed rpc-reply and whether the session stays open."""
+        try:
+            rpc = etree.fromstring(message)
+        except etree.XMLSyntaxError as err:
+            error = _rpc_error("malformed-message", str(err), error_type="rpc")
+            return _rpc_reply(None, error), True
+        message_id = rpc.get("message-id", "")
+        operation = rpc[0] if len(rpc) else None
+        name = etree.QName(operation).localname if operation is not None else ""
+
+        if name == "close-session":
+            return _rpc_reply(message_id, "<ok/>"), False
+        if name != "get":
+            return (
+                _rpc_reply(message_id, _rpc_error("operation-not-supported", name)),
+                True,
+            )
+
+        self._delay()
+        if self._fails():
+            if self.failure_mode == "disconnect":
+                return None, False
+            return (
+                _rpc_reply(
+                    message_id, _rpc_error("operation-failed", "injected failure")
+                ),
+                True,
+            )
+        return _rpc_reply(message_id, self.replies.reply(_filter_key(operation))), True
+
+    def _delay(self) -> None:
+        with self._lock:
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _fails(self) -> bool:
+        with self._lock:
+            return self._random.random() < self.failure_rate
+
+
+class _SSHServer(paramiko.ServerInterface):
+    """Accepts password logins and the netconf subsystem."""
+
+    def __init__(
+        self, username: str, password: str, subsystem_ready: threading.Event
+    ):
+        self.username = username
+        self.password = password
+        self.subsystem_ready = subsystem_ready
+
+    def check_auth_password(self, username: str, password: str) -> int:
+        if (username, password) == (self.username, self.password):
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def get_allowed_auths(self, username: str) -> str:
+        return "password"
+
+    def check_channel_request(self, kind: str, chanid: int) -> int:
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_subsystem_request(self, channel: Any, name: str) -> bool:
+        if name != "netconf":
+            return False
+        self.subsystem_ready.set()
+        return True
+
+
+def _read_messages(channel: Any) -> Iterator[bytes]:
+    """Yields the netconf messages received, framed with ']]>]]>'."""
+    buffer = b""
+    while True:
+        data = channel.recv(READ_SIZE)
+        if not data:
+            return
+        buffer += data
+        while MESSAGE_SEPARATOR in buffer:
+            message, buffer = buffer.split(MESSAGE_SEPARATOR, 1)
+            yield message.strip()
+
+
+def _filter_key(operation: Any) -> Optional[str]:
+    """Returns the name of the top element of the filter of a <get>."""
+    netconf_filter = next(
+        (child for child in operation if etree.QName(child).localname == "filter"),
+        None,
+    )
+    if netconf_filter is None:
+        return None
+    select = netconf_filter.get("select")
+    if select is not None:
+        first_step = select.strip("/").split("/")[0]
+        return first_step.split(":")[-1].split("[")[0]
+    for child in netconf_filter:
+        if isinstance(child.tag, str):
+            return etree.QName(child).localname
+    return None
+
+
+def _hello(session_id: int) -> bytes:
+    capabilities = "".join(
+        f"<capability>{capability}</capability>" for capability in CAPABILITIES
+    )
+    return (
+        f'<hello xmlns="{NETCONF_NAMESPACE}">'
+        f"<capabilities>{capabilities}</capabilities>"
+        f"<session-id>{session_id}</session-id>"
+        "</hello>"
+    ).encode("utf-8") + MESSAGE_SEPARATOR
+
+
+def _rpc_reply(message_id: Optional[str], body: str) -> bytes:
+    """The reply to a malformed message has no message-id, it was not read."""
+    attributes = "" if message_id is None else f' message-id="{message_id}"'
+    return (
+        f'<rpc-reply xmlns="{NETCONF_NAMESPACE}"{attributes}>'
+        f"{body}</rpc-reply>"
+    ).encode("utf-8") + MESSAGE_SEPARATOR
+
+
+def _rpc_error(tag: str, message: str, error_type: str = "application") -> str:
+    return (
+        "<rpc-error>"
+        f"<error-type>{error_type}</error-type>"
+        f"<error-tag>{tag}</error-tag>"
+        "<error-severity>error</error-severity>"
+        f"<error-message>{escape(message)}</error-message>"
+        "</rpc-error>"
+    )
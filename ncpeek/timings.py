@@ -0,0 +1,80 @@
+"""
+Module for timing the phases of a device operation.
+Only used when timings are requested, so polling without them
+pays nothing but a None check per phase.
+"""
+
+import time
+from typing import Optional
+from dataclasses import dataclass
+
+TIMINGS_FIELD = "ncpeek_timings"
+PHASES = ("connect", "rpc", "convert", "parse", "serialize")
+
+
+@dataclass
+class DeviceTimings:
+    """
+    Seconds spent on each phase of a device, summed over its filters.
+
+    connect: opening the netconf session, 0 when a pooled session is reused.
+    rpc: the netconf operations, until their replies are received.
+    convert: convert_xml_to_dict, for parsers working on dictionaries.
+    parse: the parsers, including the streamed xml parsing of
+        record and element parsers.
+    serialize: encoding the records to JSON, and writing them with ndjson.
+        Only measured by write_results, None otherwise.
+    reply_bytes: utf-8 size of the replies.
+    records: records produced by the parsers.
+    """
+
+    device: Optional[str] = None
+    ip: Optional[str] = None
+    connect: float = 0.0
+    rpc: float = 0.0
+    convert: float = 0.0
+    parse: float = 0.0
+    serialize: Optional[float] = None
+    reply_bytes: int = 0
+    records: int = 0
+
+    def add(self, phase: str, start: float) -> None:
+        """
+        Adds the time elapsed since start to a phase.
+
+        Args:
+            phase (str): One of PHASES.
+            start (float): time.perf_counter() when the phase started.
+        """
+        elapsed = time.perf_counter() - start
+        setattr(self, phase, (getattr(self, phase) or 0.0) + elapsed)
+
+    def merge(self, other: "DeviceTimings") -> None:
+        """
+        Adds the phases, reply bytes and records of other,
+        measured apart, like in a worker process of a parse pool.
+        """
+        for phase in PHASES:
+            value = getattr(other, phase)
+            if value is not None:
+                setattr(self, phase, (getattr(self, phase) or 0.0) + value)
+        self.reply_bytes += other.reply_bytes
+        self.records += other.records
+
+    def to_record(self) -> dict:
+        """Returns the timings as a record, written next to the parsed records."""
+        return {
+            "field": TIMINGS_FIELD,
+            "device": self.device,
+            "ip": self.ip,
+            "data": {
+                **{phase: getattr(self, phase) for phase in PHASES},
+                "reply_bytes": self.reply_bytes,
+                "records": self.records,
+            },
+        }
+
+
+def is_timings_record(record: dict) -> bool:
+    """Checks whether a record holds timings rather than device data."""
+    return isinstance(record, dict) and record.get("field") == TIMINGS_FIELD
@@ -0,0 +1,186 @@
+"""
+Module for writing parser records as InfluxDB line protocol.
+device, field, ip and name are tags, numeric values are fields.
+The error records of failed devices are written to the '<measurement>_error'
+measurement, with the class of the error as tag and up=0i.
+Escaped tag sets and field templates are computed once per device and
+record shape, since the same devices and keys come back in every cycle.
+"""
+
+import math
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, Iterable, Optional, TextIO
+from ncpeek.utils.record_utils import (
+    DATA_KEY,
+    as_number,
+    flatten_numbers,
+    record_to_dict,
+)
+from ncpeek.utils.text_utils import write_bytes_line
+from ncpeek.device_errors import ERROR_KEY, is_error_record
+
+MEASUREMENT = "ncpeek"
+# Sorted by key, as InfluxDB recommends for faster writes.
+TAG_KEYS = ("device", "field", "ip", "name")
+CACHE_SIZE = 65536
+
+_TAG_KEYS = frozenset(TAG_KEYS)
+_INT_TYPE = {int}
+_KEY_ESCAPES = str.maketrans({",": r"\,", "=": r"\=", " ": r"\ ", "\n": " "})
+_MEASUREMENT_ESCAPES = str.maketrans({",": r"\,", " ": r"\ ", "\n": " "})
+_STRING_ESCAPES = str.maketrans({'"': r'\"', "\\": r"\\", "\n": " "})
+
+
+def records_to_line_protocol(
+    records: Iterable[dict], measurement: str = MEASUREMENT
+) -> str:
+    """
+    Convert records to lines of line protocol, without timestamp.
+    Records without numeric values are skipped, error records
+    are written to the error measurement, see _error_line.
+
+    Args:
+        records (Iterable[dict]): Records of the parsers.
+        measurement (str): The measurement of every line.
+
+    Returns: str: One line per record, separated by newlines.
+    """
+    prefix = _escape_measurement(measurement)
+    lines = []
+    for record in map(record_to_dict, records):
+        if is_error_record(record):
+            lines.append(_error_line(measurement, record))
+            continue
+        field_set = _field_set(record)
+        if not field_set:
+            continue
+        tag_set = _device_tag_set(
+            record.get("device"), record.get("field"), record.get("ip")
+        )
+        name = record.get("name")
+        if name is not None and name != "":
+            tag_set = f"{tag_set},name={_escape_key(name)}"
+        lines.append(f"{prefix}{tag_set} {field_set}")
+    return "\n".join(lines)
+
+
+def write_line_protocol(
+    output: TextIO, records: Iterable[dict], measurement: str = MEASUREMENT
+) -> None:
+    """
+    Write records as line protocol to output and flush it.
+
+    Args:
+        output (TextIO): The stream to write to, i.e. sys.stdout.
+        records (Iterable[dict]): Records of the parsers.
+        measurement (str): The measurement of every line.
+    """
+    lines = records_to_line_protocol(records, measurement=measurement)
+    if lines:
+        write_bytes_line(output=output, payload=lines.encode("utf-8"))
+
+
+def _error_line(measurement: str, record: dict) -> str:
+    """
+    Returns the line of an error record, tagged with the device and the
+    class of the error, its message as string field and up=0i.
+    """
+    tag_set = "".join(
+        f",{key}={_escape_key(record[key])}"
+        for key in ("device", ERROR_KEY, "field", "ip")
+        if record.get(key) is not None and record.get(key) != ""
+    )
+    message = str(record.get("message", "")).translate(_STRING_ESCAPES)
+    return (
+        f"{_escape_measurement(measurement + '_error')}{tag_set} "
+        f'message="{message}",up=0i'
+    )
+
+
+def _field_set(record: dict) -> str:
+    """Returns the fields of the numeric values of a record, joined by ','."""
+    get_values, template = _shape_template(tuple(record))
+    if template:
+        values = get_values(record)
+        # Records made of counters only are formatted in a single step.
+        if set(map(type, values)) == _INT_TYPE:
+            return template % values
+    return _generic_field_set(record)
+
+
+def _generic_field_set(record: dict) -> str:
+    fields = []
+    for key, value in record.items():
+        if key in _TAG_KEYS:
+            continue
+        # Counters are int, checked first to skip the generic conversion.
+        if type(value) is int:
+            fields.append(f"{_field_key(key)}{value}i")
+        elif isinstance(value, dict):
+            prefix = () if key == DATA_KEY else (key,)
+            for path, number in flatten_numbers(value, prefix):
+                _append_field(fields, "_".join(path), number)
+        else:
+            number = as_number(value)
+            if number is not None:
+                _append_field(fields, key, number)
+    return ",".join(fields)
+
+
+def _append_field(fields: list, key: str, number: Any) -> None:
+    value = _field_value(number)
+    if value is not None:
+        fields.append(f"{_field_key(key)}{value}")
+
+
+def _field_value(number: Any) -> Optional[str]:
+    """Integers get the 'i' suffix, NaN and infinity are not supported."""
+    if isinstance(number, int):
+        return f"{number}i"
+    if math.isfinite(number):
+        return repr(number)
+    return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _shape_template(keys: tuple) -> tuple[Any, str]:
+    """
+    Returns a getter of the values that are not tags of records with
+    these keys, and the template of their fields if they are integers.
+    """
+    field_keys = tuple(key for key in keys if key not in _TAG_KEYS)
+    if len(field_keys) < 2:
+        return None, ""
+    template = ",".join(
+        f"{_field_key(key).replace('%', '%%')}%di" for key in field_keys
+    )
+    return itemgetter(*field_keys), template
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _field_key(key: str) -> str:
+    return f"{_escape_key(key)}="
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _device_tag_set(device: Any, field: Any, ip: Any) -> str:
+    """Returns the escaped tags shared by the records of a device and filter."""
+    return "".join(
+        f",{key}={_escape_key(value)}"
+        for key, value in (("device", device), ("field", field), ("ip", ip))
+        if value is not None and value != ""
+    )
+
+
+def _escape_key(value: Any) -> str:
+    """Escapes tag values and field keys, most need no escaping at all."""
+    value = str(value)
+    if " " in value or "," in value or "=" in value or "\n" in value:
+        return value.translate(_KEY_ESCAPES)
+    return value
+
+
+@lru_cache(maxsize=16)
+def _escape_measurement(measurement: str) -> str:
+    return measurement.translate(_MEASUREMENT_ESCAPES)
@@ -0,0 +1,62 @@
+"""
+Module for reading the values of parser records,
+shared by the output formats made of numeric fields.
+"""
+
+import re
+from typing import Any, Iterator, Optional
+
+# Key holding the data of the default parser, flattened without prefix.
+DATA_KEY = "data"
+
+_NUMBER = re.compile(r"^[-+]?\d+(\.\d+)?([eE][-+]?\d+)?$")
+
+
+def record_to_dict(record: Any) -> Any:
+    """
+    Returns a record as a dictionary. Records of the types of
+    ncpeek.records are converted, dictionaries are returned as they are.
+
+    Args: record (Any): A record of a parser.
+    Returns: dict: The record, with the keys of its output.
+    """
+    to_dict = getattr(record, "to_dict", None)
+    return record if to_dict is None else to_dict()
+
+
+def as_number(value: Any) -> Optional[Any]:
+    """
+    Returns value as a number, None if it is not numeric.
+    Booleans are 1 or 0, numeric strings are converted to int or float.
+
+    Args: value (Any): A value of a record.
+    Returns: int, float or None.
+    """
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str) and _NUMBER.match(value):
+        return float(value) if any(c in value for c in ".eE") else int(value)
+    return None
+
+
+def flatten_numbers(data: dict, prefix: tuple = ()) -> Iterator[tuple[tuple, Any]]:
+    """
+    Yields the path and value of each numeric value of nested dictionaries.
+    Lists are skipped, their entries have no name to tell them apart.
+
+    Args:
+        data (dict): The dictionary to walk.
+        prefix (tuple): Keys prepended to every path.
+
+    Returns: Iterator of (path, number) tuples.
+    """
+    for key, value in data.items():
+        path = (*prefix, key)
+        if isinstance(value, dict):
+            yield from flatten_numbers(value, path)
+        else:
+            number = as_number(value)
+            if number is not None:
+                yield path, number
@@ -1,6 +1,113 @@
+import io
+import os
 import json
-import xml.etree.ElementTree as ET
-import xmltodict
+import importlib
+from functools import lru_cache, partial
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional, TextIO, Union
+from ncpeek.utils.record_utils import record_to_dict
+
+# xmltodict and lxml are imported by the functions using them,
+# so the CLI does not load them for --help or invalid arguments.
+if TYPE_CHECKING:
+    from lxml import etree
+
+JSON_BACKEND_ENV = "NCPEEK_JSON_BACKEND"
+JSON_BACKENDS = ("orjson", "msgspec", "json")
+
+
+@dataclass(frozen=True)
+class JsonSerializer:
+    """
+    A JSON backend. dumps returns bytes, loads accepts str or bytes.
+    """
+
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[Union[str, bytes]], Any]
+
+
+def _json_default(value: Any) -> Any:
+    """
+    'default' hook of the JSON backends, encoding the records
+    of ncpeek.records as dictionaries when they are written.
+    """
+    to_dict = getattr(value, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(
+            f"Object of type {type(value).__name__} is not JSON serializable"
+        )
+    return to_dict()
+
+
+def _records_to_dicts(data: Any) -> Any:
+    """
+    Converts a record, or the records of a list, to dictionaries.
+    msgspec encodes dataclasses by their attributes, ignoring 'enc_hook'.
+    """
+    if isinstance(data, list):
+        return [record_to_dict(item) for item in data]
+    return record_to_dict(data)
+
+
+def _stdlib_json_dumps(data: Any) -> bytes:
+    return json.dumps(data, default=_json_default).encode("utf-8")
+
+
+def _load_json_backend(name: str) -> JsonSerializer:
+    """
+    Load a JSON backend by name.
+    Raises ImportError if the backend is not installed.
+    """
+    match name:
+        case "orjson":
+            orjson = importlib.import_module("orjson")
+            return JsonSerializer(
+                name=name,
+                dumps=partial(
+                    orjson.dumps,
+                    default=_json_default,
+                    option=orjson.OPT_PASSTHROUGH_DATACLASS,
+                ),
+                loads=orjson.loads,
+            )
+        case "msgspec":
+            msgspec_json = importlib.import_module("msgspec.json")
+            return JsonSerializer(
+                name=name,
+                dumps=lambda data: msgspec_json.encode(_records_to_dicts(data)),
+                loads=msgspec_json.decode,
+            )
+        case "json":
+            return JsonSerializer(
+                name=name, dumps=_stdlib_json_dumps, loads=json.loads
+            )
+    raise ValueError(
+        f"Unknown JSON backend: {name}. Valid options: {', '.join(JSON_BACKENDS)}"
+    )
+
+
+@lru_cache(maxsize=None)
+def get_json_serializer(name: Optional[str] = None) -> JsonSerializer:
+    """
+    Get a JSON serializer.
+
+    Args:
+        name (str): Backend to use. If not provided, the NCPEEK_JSON_BACKEND
+            environment variable is used, otherwise the fastest installed
+            backend among orjson, msgspec and the stdlib json.
+
+    Returns: JsonSerializer: The JSON serializer.
+    """
+    name = name or os.environ.get(JSON_BACKEND_ENV)
+    if name:
+        return _load_json_backend(name)
+    for backend in JSON_BACKENDS:
+        try:
+            return _load_json_backend(backend)
+        except ImportError:
+            continue
+    return _load_json_backend("json")
 
 
 def is_string_valid_xml(xml_string):
@@ -12,6 +119,8 @@ def is_string_valid_xml(xml_string):
     Returns:
         bool: true if the string is valid xml otherwise false
     """
+    import xml.etree.ElementTree as ET
+
     try:
         ET.fromstring(xml_string)
         return True
@@ -27,20 +136,45 @@ def convert_json_to_dict(json_string: str) -> dict:
 
     Returns: dict: The converted dictionary.
     """
-    return json.loads(json_string)
+    return get_json_serializer().loads(json_string)
 
 
-def convert_xml_to_dict(xml_string: str) -> dict:
+def convert_xml_to_dict(xml_string: str, strip_namespaces: bool = False) -> dict:
     """
     Convert XML string to dictionary.
 
-    Args:  xml_string (str): The XML string.
+    Args:
+        xml_string (str): The XML string.
+        strip_namespaces (bool): Drop the namespace declarations,
+            '@xmlns' and '@xmlns:<prefix>', while converting. A leaf
+            with only declarations keeps its text under '#text', as
+            when they are removed from the converted dictionary.
 
     Returns: dict: The converted dictionary.
     """
+    import xmltodict
+
+    if strip_namespaces:
+        return xmltodict.parse(
+            xml_string, postprocessor=_drop_namespace_declarations
+        )
     return xmltodict.parse(xml_string)
 
 
+def _drop_namespace_declarations(
+    path: list, key: str, value: Any
+) -> Optional[tuple]:
+    """xmltodict postprocessor skipping the namespace declarations."""
+    if key == "@xmlns" or key.startswith("@xmlns:"):
+        return None
+    # xmltodict gives the bare text of a leaf left without attributes,
+    # path ends with the leaf and the attributes it was declared with.
+    if (value is None or isinstance(value, str)) and not key.startswith(("@", "#")):
+        if path and path[-1][1]:
+            return key, {"#text": value} if value is not None else {}
+    return key, value
+
+
 def convert_dict_to_json(input_dict: dict) -> str:
     """
     Convert dictionary to JSON string.
@@ -49,4 +183,153 @@ def convert_dict_to_json(input_dict: dict) -> str:
 
     Returns: str: The converted JSON string.
     """
-    return json.dumps(input_dict)
+    return json.dumps(input_dict, default=_json_default)
+
+
+def convert_dict_to_json_bytes(input_dict: Any) -> bytes:
+    """
+    Convert dictionary to JSON bytes using the fastest JSON backend.
+    Output is compact, without whitespace between items.
+
+    Args: input_dict (dict): The dictionary.
+
+    Returns: bytes: The converted JSON, utf-8 encoded.
+    """
+    return get_json_serializer().dumps(input_dict)
+
+
+def write_json_line(output: TextIO, data: Any) -> None:
+    """
+    Write data as a line of JSON to output and flush it.
+    The encoded bytes go straight to the binary buffer of output when
+    there is one, skipping the intermediate str.
+
+    Args:
+        output (TextIO): The stream to write to, i.e. sys.stdout.
+        data (Any): The data to serialize.
+    """
+    write_bytes_line(output=output, payload=convert_dict_to_json_bytes(data))
+
+
+def write_bytes_line(output: TextIO, payload: bytes) -> None:
+    """
+    Write an already encoded payload as a line to output and flush it.
+
+    Args:
+        output (TextIO): The stream to write to, i.e. sys.stdout.
+        payload (bytes): The utf-8 encoded text, without final newline.
+    """
+    payload += b"\n"
+    buffer = getattr(output, "buffer", None)
+    if buffer is None:
+        output.write(payload.decode("utf-8"))
+        output.flush()
+        return
+    output.flush()
+    buffer.write(payload)
+    buffer.flush()
+
+
+def iterparse_xml_elements(
+    xml_string: str, record_path: tuple
+) -> Iterator["etree._Element"]:
+    """
+    Yield the lxml elements found at record_path one at a time.
+
+    Each element is cleared once the consumer moves to the next one,
+    so memory is bounded by the size of one record instead of
+    the whole document.
+
+    Args:
+        xml_string (str): The XML string.
+        record_path (tuple): Element names from the root to the records,
+            without namespaces. i.e. ("data", "interfaces", "interface")
+
+    Returns: Iterator[etree._Element]: One element per record.
+    """
+    from lxml import etree
+
+    source = io.BytesIO(xml_string.encode("utf-8"))
+    parents = record_path[-2::-1]
+
+    for _, element in etree.iterparse(
+        source,
+        events=("end",),
+        tag=f"{{*}}{record_path[-1]}",
+        remove_comments=True,
+        # Large replies are trusted for their size, not for entities.
+        huge_tree=True,
+        resolve_entities=False,
+        no_network=True,
+    ):
+        if not _has_parents(element, parents):
+            continue
+        yield element
+        element.clear()
+        parent = element.getparent()
+        while element.getprevious() is not None:
+            del parent[0]
+
+
+def _has_parents(element: "etree._Element", parents: tuple) -> bool:
+    """Check the ancestors of the element are 'parents', from the closest to the root."""
+    for name in parents:
+        element = element.getparent()
+        if element is None or _local_name(element.tag) != name:
+            return False
+    return element.getparent() is None
+
+
+def iterparse_xml_records(
+    xml_string: str, record_path: tuple
+) -> Iterator[dict]:
+    """
+    Yield the elements found at record_path one at a time,
+    converted to the same dictionary structure as convert_xml_to_dict.
+
+    Memory is bounded by the size of one record instead of the whole document.
+
+    Args:
+        xml_string (str): The XML string.
+        record_path (tuple): Element names from the root to the records,
+            without namespaces. i.e. ("data", "interfaces", "interface")
+
+    Returns: Iterator[dict]: One dictionary per record.
+    """
+    for element in iterparse_xml_elements(xml_string, record_path):
+        yield _element_to_dict(element)
+
+
+def _element_to_dict(element: "etree._Element") -> Optional[Union[dict, str]]:
+    """
+    Convert an element to a dictionary following xmltodict conventions.
+    Attributes are prefixed with '@', repeated elements become lists
+    and text of elements with attributes or children is under '#text'.
+    """
+    result: dict = {}
+    for key, value in element.attrib.items():
+        result[f"@{_local_name(key)}"] = value
+
+    for child in element:
+        if not isinstance(child.tag, str):
+            continue
+        name = _local_name(child.tag)
+        value = _element_to_dict(child)
+        if name not in result:
+            result[name] = value
+        elif isinstance(result[name], list):
+            result[name].append(value)
+        else:
+            result[name] = [result[name], value]
+
+    text = element.text.strip() if element.text else ""
+    if not result:
+        return text or None
+    if text:
+        result["#text"] = text
+    return result
+
+
+def _local_name(tag: str) -> str:
+    """Remove the namespace from an element tag."""
+    return tag.rsplit("}", 1)[-1]
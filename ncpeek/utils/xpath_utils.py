@@ -0,0 +1,46 @@
+from functools import lru_cache
+from lxml import etree
+
+
+def _local_name_steps(path: str) -> str:
+    """Turn 'a/b/*' into steps matching the element names in any namespace."""
+    return "/".join(
+        name if name == "*" else f"*[local-name()='{name}']"
+        for name in path.split("/")
+    )
+
+
+@lru_cache(maxsize=None)
+def compile_text_xpath(path: str) -> etree.XPath:
+    """
+    Compile a path of element names into an XPath returning the text
+    of the element, or an empty string if the element is missing.
+    Namespaces are ignored. Each path is compiled only once.
+
+    Args: path (str): Element names separated by '/'. i.e. 'statistics/in-octets'
+
+    Returns: etree.XPath: The compiled XPath, to call with the parent element.
+    """
+    return etree.XPath(f"string({_local_name_steps(path)})", smart_strings=False)
+
+
+@lru_cache(maxsize=None)
+def compile_texts_xpath(path: str) -> etree.XPath:
+    """
+    Compile a path of element names into an XPath returning a dictionary
+    of the local name and text of each element found.
+    Use it to read many leaves of the same container in a single pass.
+    Namespaces are ignored. Each path is compiled only once.
+
+    Args: path (str): Element names separated by '/'. i.e. 'statistics/*'
+
+    Returns: Callable: Receives the parent element and returns the dictionary.
+    """
+    xpath = etree.XPath(_local_name_steps(path))
+
+    def texts(element: etree._Element) -> dict:
+        return {
+            child.tag.rpartition("}")[2]: child.text for child in xpath(element)
+        }
+
+    return texts
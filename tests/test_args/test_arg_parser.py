@@ -1,6 +1,13 @@
 import argparse
 import pytest
-from ncpeek.args.arg_parser import create_argument_parser
+from ncpeek.args.arg_parser import (
+    DEFAULT_CACHE_TTL,
+    DEFAULT_PARSE_THRESHOLD,
+    DEFAULT_SERVE_PORT,
+    create_argument_parser,
+    create_poll_argument_parser,
+    create_serve_argument_parser,
+)
 
 
 def test_create_argument_parser():
@@ -17,3 +24,74 @@ def test_create_argument_parser():
     assert any(action.dest == "device_settings" for action in parser._actions)
     assert any(action.dest == "xml_filter" for action in parser._actions)
     assert any(action.dest == "xpath_filter" for action in parser._actions)
+    assert any(action.dest == "workers" for action in parser._actions)
+    assert any(action.dest == "format" for action in parser._actions)
+    assert any(action.dest == "timings" for action in parser._actions)
+    assert any(action.dest == "parse_workers" for action in parser._actions)
+    assert any(action.dest == "deadline" for action in parser._actions)
+
+
+def test_create_serve_argument_parser():
+    """
+    Test the serve parser has the settings options and the exporter options.
+    """
+    args = create_serve_argument_parser().parse_args(
+        ["-d", "devices.json", "-x", "filter.xml"]
+    )
+
+    assert args.device_settings == "devices.json"
+    assert args.xml_filter == ["filter.xml"]
+    assert args.port == DEFAULT_SERVE_PORT
+    assert args.cache_ttl == DEFAULT_CACHE_TTL
+    assert args.parse_workers is None
+    assert args.breaker_failures is None
+    assert args.parse_threshold == DEFAULT_PARSE_THRESHOLD
+    assert not hasattr(args, "workers")
+
+
+@pytest.mark.parametrize(
+    "option",
+    [
+        "--workers=0",
+        "--deadline=0",
+        "--deadline=-1",
+        "--breaker-failures=0",
+        "--parse-workers=0",
+        "--parse-threshold=-1",
+        "--workers=many",
+    ],
+)
+def test_invalid_execution_options(option, capsys):
+    """
+    Test counts below 1 and deadlines of 0 or less are rejected.
+    """
+    with pytest.raises(SystemExit):
+        create_argument_parser().parse_args(["-x", "filter.xml", option])
+
+    assert option.split("=")[0] in capsys.readouterr().err
+
+
+@pytest.mark.parametrize(
+    "option", ["--interval=0", "--interval=-5", "--heartbeat=-1", "--workers=0"]
+)
+def test_invalid_poll_options(option, capsys):
+    """
+    Test intervals of 0 or less and negative heartbeats are rejected.
+    """
+    with pytest.raises(SystemExit):
+        create_poll_argument_parser().parse_args(["-x", "filter.xml", option])
+
+    assert option.split("=")[0] in capsys.readouterr().err
+
+
+@pytest.mark.parametrize(
+    "option", ["--port=-1", "--port=65536", "--port=http", "--cache-ttl=-1"]
+)
+def test_invalid_serve_options(option, capsys):
+    """
+    Test ports out of range and negative cache ttls are rejected.
+    """
+    with pytest.raises(SystemExit):
+        create_serve_argument_parser().parse_args(["-x", "filter.xml", option])
+
+    assert option.split("=")[0] in capsys.readouterr().err
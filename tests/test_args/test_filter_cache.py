@@ -0,0 +1,120 @@
+import os
+import pytest
+from ncpeek.args import filter_cache
+from ncpeek.args.filter_cache import FilterCache
+
+XML_FILTER = "<interfaces><interface/></interfaces>"
+
+
+@pytest.fixture
+def cache():
+    """Return a new, empty filter cache."""
+    return FilterCache()
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Count the filter files read from disk."""
+    files_read = []
+    read_file = filter_cache.read_file
+
+    def counting_read_file(filename):
+        files_read.append(filename)
+        return read_file(filename=filename)
+
+    monkeypatch.setattr(filter_cache, "read_file", counting_read_file)
+    return files_read
+
+
+def test_xml_filter_inline(cache):
+    """
+    Test inline xml filters use the generic filter id and are reused.
+    """
+    netconf_filter = cache.xml_filter(XML_FILTER)
+
+    assert netconf_filter.filter_id == "generic"
+    assert netconf_filter.netconf_filter == XML_FILTER
+    assert cache.xml_filter(XML_FILTER) is netconf_filter
+
+
+def test_xml_filter_file_read_once(cache, reads, tmp_path):
+    """
+    Test a filter file is read once while it does not change.
+    """
+    filter_file = tmp_path / "my-filter.xml"
+    filter_file.write_text(XML_FILTER)
+
+    first = cache.xml_filter(str(filter_file))
+    second = cache.xml_filter(str(filter_file))
+
+    assert first is second
+    assert first.filter_id == "my-filter.xml"
+    assert len(reads) == 1
+
+
+def test_xml_filter_file_reloaded_on_change(cache, reads, tmp_path):
+    """
+    Test a filter file is read again once it is modified.
+    """
+    filter_file = tmp_path / "my-filter.xml"
+    filter_file.write_text(XML_FILTER)
+    cache.xml_filter(str(filter_file))
+
+    filter_file.write_text("<memory-statistics/>")
+    stat = filter_file.stat()
+    os.utime(filter_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert cache.xml_filter(str(filter_file)).netconf_filter == "<memory-statistics/>"
+    assert len(reads) == 2
+
+
+def test_xml_filter_default_directory(cache):
+    """
+    Test filenames are looked up in the default filters directory.
+    """
+    netconf_filter = cache.xml_filter("Cisco-IOS-XE-memory-oper.xml")
+
+    assert netconf_filter.filter_id == "Cisco-IOS-XE-memory-oper.xml"
+    assert "memory-statistics" in netconf_filter.netconf_filter
+
+
+def test_xml_filter_missing_file(cache):
+    """
+    Test a missing file raises a ValueError.
+    """
+    with pytest.raises(ValueError):
+        cache.xml_filter("missing-filter.xml")
+
+
+def test_xml_filter_invalid_xml(cache, tmp_path):
+    """
+    Test a file without valid xml raises a ValueError.
+    """
+    filter_file = tmp_path / "invalid.xml"
+    filter_file.write_text("<interfaces>")
+
+    with pytest.raises(ValueError):
+        cache.xml_filter(str(filter_file))
+
+
+def test_xpath_filter(cache):
+    """
+    Test xpath filters are parsed once.
+    """
+    xpath = "http://cisco.com/ns/yang/Cisco-IOS-XE-interfaces-oper:interfaces/interface"
+    netconf_filter = cache.xpath_filter(xpath)
+
+    assert netconf_filter.filter_id == xpath
+    assert netconf_filter.netconf_filter[0] == "xpath"
+    assert cache.xpath_filter(xpath) is netconf_filter
+
+
+def test_max_filters(cache):
+    """
+    Test the least recently used filters are dropped first.
+    """
+    cache.max_filters = 2
+    for index in range(3):
+        cache.xml_filter(f"<filter-{index}/>")
+
+    assert cache.size() == 2
@@ -0,0 +1,92 @@
+import json
+import os
+import pytest
+from ncpeek.args.inventory import (
+    DeviceInventory,
+    iter_ndjson_devices,
+    parse_shard,
+    select_shard,
+    shard_of,
+)
+
+DEVICES = [{"host": f"10.0.0.{index}", "username": "u"} for index in range(100)]
+
+
+@pytest.fixture
+def inventory_file(tmp_path):
+    path = tmp_path / "devices.ndjson"
+    path.write_text(
+        "\n".join(json.dumps(device) for device in DEVICES) + "\n\n",
+        encoding="utf-8",
+    )
+    return str(path)
+
+
+def test_parse_shard():
+    """
+    Test shards are k/n, counted from 1.
+    """
+    assert parse_shard("2/4") == (2, 4)
+    assert parse_shard("1/1") == (1, 1)
+
+
+@pytest.mark.parametrize("shard", ["0/4", "5/4", "1", "a/b", "1/2/3"])
+def test_invalid_shard(shard):
+    """
+    Test shards outside 1 <= k <= n are rejected.
+    """
+    with pytest.raises(ValueError):
+        parse_shard(shard)
+
+
+def test_shards_are_disjoint_and_stable():
+    """
+    Test every device lands in exactly one shard, the same on every call.
+    """
+    shards = [list(select_shard(DEVICES, (index, 4))) for index in range(1, 5)]
+
+    assert sorted(
+        (device["host"] for shard in shards for device in shard)
+    ) == sorted(device["host"] for device in DEVICES)
+    assert all(shards)
+    assert shard_of("10.0.0.1", 4) == shard_of("10.0.0.1", 4)
+    assert list(select_shard(DEVICES, None)) == DEVICES
+
+
+def test_iter_ndjson_devices(inventory_file):
+    """
+    Test each line is a device, blank lines are skipped.
+    """
+    assert list(iter_ndjson_devices(inventory_file)) == DEVICES
+
+
+@pytest.mark.parametrize("line, message", [("{", "invalid JSON"), ("[1]", "object")])
+def test_iter_ndjson_devices_invalid_line(tmp_path, line, message):
+    """
+    Test an invalid line is reported with its line number.
+    """
+    path = tmp_path / "devices.ndjson"
+    path.write_text(f'{{"host": "a"}}\n{line}\n', encoding="utf-8")
+
+    with pytest.raises(ValueError) as error:
+        list(iter_ndjson_devices(str(path)))
+    assert "devices.ndjson:2: " in str(error.value)
+    assert message in str(error.value)
+
+
+def test_inventory_reads_its_shard_again_on_change(inventory_file):
+    """
+    Test the devices of the shard are kept, and read again once the file changes.
+    """
+    inventory = DeviceInventory(filename=inventory_file, shard=(1, 2))
+    devices = inventory.devices()
+
+    assert devices == list(select_shard(DEVICES, (1, 2)))
+    assert inventory.devices() is devices
+
+    with open(inventory_file, "a", encoding="utf-8") as file:
+        file.write(json.dumps({"host": "new"}) + "\n")
+    stat = os.stat(inventory_file)
+    os.utime(inventory_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert inventory.devices() is not devices
@@ -1,3 +1,4 @@
+import json
 import pytest
 from ncpeek.args.parse_settings import SettingsParser
 
@@ -104,3 +105,216 @@ def test_set_xpath_filter():
 
     assert parser.get_filter_id() == test_xpath_filter
     assert parser.get_netconf_filter() == xpath_filter_result
+
+
+def test_parse_poll_arguments():
+    """
+    Test parsing the arguments of the poll command.
+    """
+    parser = SettingsParser()
+    parser.parse_poll_arguments(
+        [
+            "--device-settings=devnet_xr_sandbox.json",
+            "--xml-filter=Cisco-IOS-XR-hostname.xml",
+            "--interval=10",
+            "--workers=4",
+        ]
+    )
+
+    assert parser.get_interval() == 10
+    assert parser.get_workers() == 4
+    assert parser.get_filter_id() == "Cisco-IOS-XR-hostname.xml"
+    assert parser.get_timings() is False
+    assert parser.get_changes_only() is False
+
+
+def test_parse_poll_arguments_changes_only():
+    """
+    Test --changes-only and --heartbeat are kept by the settings.
+    """
+    parser = SettingsParser()
+    parser.parse_poll_arguments(
+        [
+            "--device-settings=devnet_xr_sandbox.json",
+            "--xml-filter=Cisco-IOS-XR-hostname.xml",
+            "--changes-only",
+            "--heartbeat=10",
+        ]
+    )
+
+    assert parser.get_changes_only() is True
+    assert parser.get_heartbeat() == 10
+
+
+def test_parse_arguments_timings():
+    """
+    Test --timings is kept by the settings.
+    """
+    parser = SettingsParser()
+    parser.parse_arguments(
+        [
+            "--device-settings=devnet_xr_sandbox.json",
+            "--xml-filter=Cisco-IOS-XR-hostname.xml",
+            "--timings",
+        ]
+    )
+
+    assert parser.get_timings() is True
+
+
+def test_parse_arguments_execution_options():
+    """
+    Test the parse pool, deadline and circuit breaker options are kept.
+    """
+    parser = SettingsParser()
+    parser.parse_arguments(
+        [
+            "--device-settings=devnet_xr_sandbox.json",
+            "--xml-filter=Cisco-IOS-XR-hostname.xml",
+            "--parse-workers=2",
+            "--parse-threshold=4096",
+            "--deadline=8.5",
+            "--breaker-failures=3",
+            "--breaker-state=breaker.json",
+        ]
+    )
+
+    assert parser.get_deadline() == 8.5
+    assert parser.get_breaker_failures() == 3
+    assert parser.get_breaker_state() == "breaker.json"
+
+    assert parser.get_parse_workers() == 2
+    assert parser.get_parse_threshold() == 4096
+
+
+def test_parse_serve_arguments():
+    """
+    Test parsing the arguments of the serve command.
+    """
+    parser = SettingsParser()
+    args = parser.parse_serve_arguments(
+        [
+            "--device-settings=devnet_xr_sandbox.json",
+            "--xml-filter=Cisco-IOS-XR-hostname.xml",
+            "--port=9999",
+            "--cache-ttl=2",
+        ]
+    )
+
+    assert args.port == 9999
+    assert args.cache_ttl == 2
+    assert parser.get_filter_id() == "Cisco-IOS-XR-hostname.xml"
+    assert parser.get_device_settings()[0]["host"] == "sandbox-iosxr-1.cisco.com"
+
+
+def test_set_multiple_filters():
+    """
+    Test setting several XML and XPath filters, kept in order.
+    """
+    test_xpath_filter = (
+        "http://cisco.com/ns/yang/Cisco-IOS-XE-native:/native/hostname"
+    )
+    parser = SettingsParser()
+    parser.set_xml_filter(
+        ["Cisco-IOS-XE-memory-oper.xml", "Cisco-IOS-XE-interfaces-oper.xml"]
+    )
+    parser.add_xpath_filter(test_xpath_filter)
+
+    assert [f.filter_id for f in parser.get_filters()] == [
+        "Cisco-IOS-XE-memory-oper.xml",
+        "Cisco-IOS-XE-interfaces-oper.xml",
+        test_xpath_filter,
+    ]
+    assert parser.get_filter_id() == "Cisco-IOS-XE-memory-oper.xml"
+
+    parser.set_xpath_filter(test_xpath_filter)
+    assert [f.filter_id for f in parser.get_filters()] == [test_xpath_filter]
+
+
+def test_parse_arguments_repeated_filters():
+    """
+    Test repeated -x and -p arguments are all kept, in the order given.
+    """
+    isis_xpath = (
+        "http://cisco.com/ns/yang/Cisco-IOS-XE-isis-oper:/isis-oper-data/isis-instance"
+    )
+    parser = SettingsParser()
+    parser.parse_arguments(
+        [
+            "-d",
+            "devnet_xe_sandbox.json",
+            "-x",
+            "Cisco-IOS-XE-memory-oper.xml",
+            "-p",
+            isis_xpath,
+            "-x",
+            "Cisco-IOS-XE-interfaces-oper.xml",
+        ]
+    )
+
+    assert [f.filter_id for f in parser.get_filters()] == [
+        "Cisco-IOS-XE-memory-oper.xml",
+        isis_xpath,
+        "Cisco-IOS-XE-interfaces-oper.xml",
+    ]
+
+
+def test_parse_arguments_without_filter():
+    """
+    Test the CLI exits when no filter is provided.
+    """
+    parser = SettingsParser()
+    with pytest.raises(SystemExit):
+        parser.parse_arguments(["-d", "devnet_xe_sandbox.json"])
+
+
+def test_set_device_settings_ndjson_with_shard(tmp_path):
+    """
+    Test NDJSON inventories and JSON settings select the same shard.
+    """
+    devices = [{"host": f"10.0.0.{index}"} for index in range(20)]
+    inventory = tmp_path / "devices.jsonl"
+    inventory.write_text(
+        "\n".join(json.dumps(device) for device in devices), encoding="utf-8"
+    )
+    parser = SettingsParser()
+    parser.set_shard((2, 3))
+
+    parser.set_device_settings(str(inventory))
+    from_inventory = parser.get_device_settings()
+    parser.set_device_settings(devices)
+
+    assert from_inventory == parser.get_device_settings()
+    assert 0 < len(from_inventory) < len(devices)
+
+
+def test_parse_arguments_shard():
+    """
+    Test --shard keeps the devices of the shard only.
+    """
+    parser = SettingsParser()
+    parser.parse_arguments(
+        [
+            "--device-settings=devnet_xr_sandbox.json",
+            "--xml-filter=Cisco-IOS-XR-hostname.xml",
+            "--shard=1/1",
+        ]
+    )
+
+    assert len(parser.get_device_settings()) == 1
+
+
+def test_parse_arguments_invalid_shard(capsys):
+    """
+    Test an invalid --shard exits with the help message.
+    """
+    with pytest.raises(SystemExit):
+        SettingsParser().parse_arguments(
+            [
+                "--device-settings=devnet_xr_sandbox.json",
+                "--xml-filter=Cisco-IOS-XR-hostname.xml",
+                "--shard=3/2",
+            ]
+        )
+
+    assert "1 <= k <= n" in capsys.readouterr().err
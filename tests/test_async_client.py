@@ -0,0 +1,137 @@
+import time
+import json
+import asyncio
+import pytest
+from ncpeek.async_client import AsyncNetconfClient
+
+DEVICES = [
+    {"host": "slow", "username": "user", "password": "pass"},
+    {"host": "fast", "username": "user", "password": "pass"},
+]
+DELAYS = {"slow": 0.2, "fast": 0.0}
+
+
+def fake_process_device(device: dict) -> list:
+    time.sleep(DELAYS[device["host"]])
+    return [{"device": device["host"]}]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Return an AsyncNetconfClient with a fake device operation."""
+    client = AsyncNetconfClient()
+    client.set_devices_settings(DEVICES)
+    client.set_xml_filter("Cisco-IOS-XR-hostname.xml")
+    monkeypatch.setattr(client, "_process_device", fake_process_device)
+    return client
+
+
+def test_fetch_keeps_device_order(client):
+    """
+    Test async fetch returns results in device order.
+    """
+    result = asyncio.run(client.fetch())
+    assert result == '[{"device": "slow"}, {"device": "fast"}]'
+
+
+def test_fetch_device_timeout(client):
+    """
+    Test a device exceeding device_timeout gives error records,
+    and the other devices their records.
+    """
+    client.device_timeout = 0.05
+    result = json.loads(asyncio.run(client.fetch()))
+
+    assert result[0]["device"] == "slow"
+    assert result[0]["error"] == "TimeoutError"
+    assert result[1] == {"device": "fast"}
+
+
+def test_fetch_deadline_caps_device_timeout(client):
+    """
+    Test the deadline of the run cuts device_timeout short,
+    a device still running gives DeadlineExceeded records.
+    """
+    client.device_timeout = 1
+    client.deadline = 0.05
+    start = time.monotonic()
+    result = json.loads(asyncio.run(client.fetch()))
+
+    assert time.monotonic() - start < 0.2
+    assert result[0]["device"] == "slow"
+    assert result[0]["error"] == "DeadlineExceeded"
+    assert result[1] == {"device": "fast"}
+
+
+def test_fetch_isolates_failed_devices(client, monkeypatch):
+    """
+    Test a device raising gives error records instead of failing the fetch.
+    """
+
+    def failing_process_device(device: dict) -> list:
+        if device["host"] == "slow":
+            raise ConnectionError("unreachable")
+        return [{"device": device["host"]}]
+
+    monkeypatch.setattr(client, "_process_device", failing_process_device)
+    result = json.loads(asyncio.run(client.fetch()))
+
+    assert result == [
+        {
+            "field": "Cisco-IOS-XR-hostname.xml",
+            "device": "slow",
+            "ip": "slow",
+            "error": "ConnectionError",
+            "message": "unreachable",
+        },
+        {"device": "fast"},
+    ]
+
+
+def test_fetch_bounded_concurrency(client, monkeypatch):
+    """
+    Test no more than max_concurrency devices run at the same time.
+    """
+    running = []
+    peak = []
+
+    def tracking_process_device(device: dict) -> list:
+        running.append(device)
+        peak.append(len(running))
+        time.sleep(0.01)
+        running.remove(device)
+        return []
+
+    client.max_concurrency = 2
+    client.set_devices_settings(
+        [{"host": f"device-{i}"} for i in range(10)]
+    )
+    monkeypatch.setattr(client, "_process_device", tracking_process_device)
+
+    assert asyncio.run(client.fetch()) == "[]"
+    assert max(peak) <= 2
+
+
+def test_timed_out_device_keeps_its_slot(client, monkeypatch):
+    """
+    Test a timed out device holds its concurrency slot until its thread
+    finishes, so no more than max_concurrency threads run.
+    """
+    running = []
+    peak = []
+
+    def tracking_process_device(device: dict) -> list:
+        running.append(device)
+        peak.append(len(running))
+        time.sleep(DELAYS[device["host"]])
+        running.remove(device)
+        return [{"device": device["host"]}]
+
+    client.max_concurrency = 1
+    client.device_timeout = 0.05
+    monkeypatch.setattr(client, "_process_device", tracking_process_device)
+    result = json.loads(asyncio.run(client.fetch()))
+
+    assert result[0]["error"] == "TimeoutError"
+    assert result[1] == {"device": "fast"}
+    assert max(peak) == 1
@@ -0,0 +1,104 @@
+import pytest
+from ncpeek.change_filter import ChangeFilter, record_fingerprint, record_key
+
+
+def memory_record(name: str, percent_used: float) -> dict:
+    return {
+        "name": name,
+        "percent_used": percent_used,
+        "field": "Cisco-IOS-XE-memory-oper.xml",
+        "device": "router1",
+        "ip": "10.0.0.1",
+    }
+
+
+def run_cycle(change_filter: ChangeFilter, records: list) -> list:
+    change_filter.next_cycle()
+    return change_filter.select(records)
+
+
+def test_only_changed_records_are_emitted():
+    """
+    Test records are emitted the first time and then only when they change.
+    """
+    change_filter = ChangeFilter()
+    first = [memory_record("Processor", 25), memory_record("io", 5)]
+
+    assert run_cycle(change_filter, first) == first
+    assert run_cycle(change_filter, first) == []
+    changed = [memory_record("Processor", 30), memory_record("io", 5)]
+    assert run_cycle(change_filter, changed) == [memory_record("Processor", 30)]
+
+
+def test_heartbeat_emits_unchanged_records():
+    """
+    Test unchanged records are emitted again every heartbeat cycles.
+    """
+    change_filter = ChangeFilter(heartbeat=3)
+    records = [memory_record("Processor", 25)]
+
+    emitted = [len(run_cycle(change_filter, records)) for _ in range(7)]
+
+    assert emitted == [1, 0, 0, 1, 0, 0, 1]
+
+
+def test_records_of_other_devices_are_kept_apart():
+    """
+    Test the same record of two devices is tracked separately.
+    """
+    change_filter = ChangeFilter()
+    other_device = {**memory_record("Processor", 25), "device": "router2"}
+
+    run_cycle(change_filter, [memory_record("Processor", 25)])
+    assert run_cycle(change_filter, [other_device]) == [other_device]
+
+
+def test_least_recently_seen_records_are_forgotten():
+    """
+    Test the state is bounded, forgotten records are emitted again.
+    """
+    change_filter = ChangeFilter(max_records=2)
+    run_cycle(
+        change_filter,
+        [memory_record("a", 1), memory_record("b", 1), memory_record("c", 1)],
+    )
+
+    assert change_filter.size() == 2
+    assert run_cycle(change_filter, [memory_record("a", 1)]) == [
+        memory_record("a", 1)
+    ]
+    assert run_cycle(change_filter, [memory_record("c", 1)]) == []
+
+
+def test_fingerprint_of_nested_records():
+    """
+    Test records with nested values, like the default parser's, are compared.
+    """
+    record = {"field": "generic", "device": "r1", "data": {"hostname": "r1"}}
+    renamed = {"field": "generic", "device": "r1", "data": {"hostname": "r2"}}
+
+    assert record_fingerprint(record) == record_fingerprint(dict(record))
+    assert record_fingerprint(record) != record_fingerprint(renamed)
+    assert record_key(record) == ("r1", "generic", None)
+
+
+def test_values_with_the_same_hash_are_changes():
+    """
+    Test a change between values sharing a hash, -1 and -2, is emitted.
+    """
+    change_filter = ChangeFilter()
+
+    assert run_cycle(change_filter, [memory_record("Processor", -1)])
+    assert run_cycle(change_filter, [memory_record("Processor", -2)]) == [
+        memory_record("Processor", -2)
+    ]
+
+
+def test_invalid_options():
+    """
+    Test negative heartbeats and empty stores are rejected.
+    """
+    with pytest.raises(ValueError):
+        ChangeFilter(heartbeat=-1)
+    with pytest.raises(ValueError):
+        ChangeFilter(max_records=0)
@@ -0,0 +1,160 @@
+import time
+import pytest
+from ncpeek.circuit_breaker import CircuitBreaker, CircuitOpen
+
+HOST = "10.0.0.1"
+
+
+def fail(breaker: CircuitBreaker, times: int, host: str = HOST) -> None:
+    for _ in range(times):
+        breaker.check(host)
+        breaker.record_failure(host)
+
+
+def test_opens_after_consecutive_failures():
+    """
+    Test a host is skipped once it reaches the failure threshold.
+    """
+    breaker = CircuitBreaker(failure_threshold=3, jitter=0)
+    fail(breaker, 2)
+
+    assert not breaker.is_open(HOST)
+    fail(breaker, 1)
+
+    assert breaker.is_open(HOST)
+    with pytest.raises(CircuitOpen) as error:
+        breaker.check(HOST)
+    assert "after 3 consecutive failures" in str(error.value)
+    breaker.check("10.0.0.2")
+
+
+def test_success_resets_failures():
+    """
+    Test a success forgets the failures, so they must be consecutive.
+    """
+    breaker = CircuitBreaker(failure_threshold=2)
+    fail(breaker, 1)
+    breaker.record_success(HOST)
+    fail(breaker, 1)
+
+    assert not breaker.is_open(HOST)
+
+
+def test_probe_with_exponential_backoff():
+    """
+    Test a single probe goes through once due, and a failed probe
+    doubles the delay until the next one.
+    """
+    breaker = CircuitBreaker(failure_threshold=1, base_delay=0.1, jitter=0)
+    fail(breaker, 1)
+    time.sleep(0.11)
+
+    breaker.check(HOST)
+    with pytest.raises(CircuitOpen):
+        breaker.check(HOST)
+    breaker.record_failure(HOST)
+    time.sleep(0.11)
+
+    with pytest.raises(CircuitOpen):
+        breaker.check(HOST)
+    time.sleep(0.15)
+    breaker.check(HOST)
+    breaker.record_success(HOST)
+
+    assert not breaker.is_open(HOST)
+
+
+def test_delay_with_jitter_and_max_delay():
+    """
+    Test the delay stays within the jitter and below max_delay.
+    """
+    breaker = CircuitBreaker(
+        failure_threshold=1, base_delay=10, max_delay=40, jitter=0.5
+    )
+
+    assert all(5 <= breaker._delay(1) <= 15 for _ in range(100))
+    assert all(20 <= breaker._delay(10) <= 60 for _ in range(100))
+
+
+def test_state_file_survives_breakers(tmp_path):
+    """
+    Test the failures are counted across breakers sharing a state file.
+    """
+    state_file = str(tmp_path / "breaker.json")
+    fail(CircuitBreaker(failure_threshold=2, state_file=state_file), 1)
+    fail(CircuitBreaker(failure_threshold=2, state_file=state_file), 1)
+
+    breaker = CircuitBreaker(failure_threshold=2, state_file=state_file)
+    assert breaker.is_open(HOST)
+    breaker.record_success(HOST)
+
+    assert not CircuitBreaker(failure_threshold=2, state_file=state_file).is_open(
+        HOST
+    )
+
+
+def test_state_file_shared_by_breakers(tmp_path):
+    """
+    Test breakers sharing a state file, like the processes of separate
+    shards, keep the hosts of each other.
+    """
+    state_file = str(tmp_path / "breaker.json")
+    first = CircuitBreaker(failure_threshold=1, state_file=state_file)
+    second = CircuitBreaker(failure_threshold=1, state_file=state_file)
+    first.record_failure("10.0.0.1")
+    second.record_failure("10.0.0.2")
+    first.record_success("10.0.0.1")
+    first.record_failure("10.0.0.3")
+
+    breaker = CircuitBreaker(failure_threshold=1, state_file=state_file)
+    assert not breaker.is_open("10.0.0.1")
+    assert breaker.is_open("10.0.0.2")
+    assert breaker.is_open("10.0.0.3")
+
+
+def test_probe_reserved_in_state_file(tmp_path):
+    """
+    Test a single breaker sharing the state file probes a host,
+    the others find the probe reserved.
+    """
+    state_file = str(tmp_path / "breaker.json")
+    options = dict(failure_threshold=1, base_delay=0.1, jitter=0, state_file=state_file)
+    first = CircuitBreaker(**options)
+    first.record_failure(HOST)
+    second = CircuitBreaker(**options)
+    time.sleep(0.11)
+
+    first.check(HOST)
+    with pytest.raises(CircuitOpen):
+        second.check(HOST)
+
+
+@pytest.mark.parametrize("content", ["not json", "[]", '{"10.0.0.1": "x"}'])
+def test_damaged_state_file(tmp_path, content):
+    """
+    Test a damaged state file starts with every circuit closed.
+    """
+    state_file = tmp_path / "breaker.json"
+    state_file.write_text(content, encoding="utf-8")
+    breaker = CircuitBreaker(failure_threshold=1, state_file=str(state_file))
+
+    assert not breaker.is_open(HOST)
+    fail(breaker, 1)
+    assert breaker.is_open(HOST)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"failure_threshold": 0},
+        {"base_delay": 0},
+        {"base_delay": 10, "max_delay": 5},
+        {"jitter": 1},
+    ],
+)
+def test_invalid_breaker(options):
+    """
+    Test invalid options are rejected.
+    """
+    with pytest.raises(ValueError):
+        CircuitBreaker(**options)
@@ -1,5 +1,15 @@
+import io
+import sys
+import json
+import time
+import subprocess
 import pytest
 from ncpeek.client import NetconfClient
+from ncpeek.timings import TIMINGS_FIELD, DeviceTimings
+from ncpeek.change_filter import ChangeFilter
+from ncpeek.parse_pool import ParsePool
+from ncpeek.circuit_breaker import CircuitBreaker
+from ncpeek.utils.record_utils import record_to_dict
 
 
 @pytest.fixture
@@ -51,3 +61,434 @@ def test_set_xpath_filter(client):
     )
     client.set_xpath_filter(test_xpath_filter)
     assert client._settings.get_filter_id() == test_xpath_filter
+
+
+def test_process_devices_keeps_order_with_workers(monkeypatch):
+    """
+    Test concurrent processing returns results in device order.
+    """
+    delays = {"slow": 0.2, "fast": 0.0, "medium": 0.1}
+
+    def fake_process_device(device: dict) -> list:
+        time.sleep(delays[device["host"]])
+        return [{"device": device["host"]}]
+
+    client = NetconfClient(max_workers=3)
+    monkeypatch.setattr(client, "_process_device", fake_process_device)
+
+    devices = [{"host": host} for host in delays]
+    start = time.monotonic()
+    results = client._process_devices(devices)
+    elapsed = time.monotonic() - start
+
+    assert results == [[{"device": host}] for host in delays]
+    assert elapsed < sum(delays.values())
+
+
+def test_process_devices_invalid_workers():
+    """
+    Test max_workers lower than 1 is rejected.
+    """
+    with pytest.raises(ValueError):
+        NetconfClient(max_workers=0)._process_devices([{"host": "a"}])
+
+
+MEMORY_REPLY = (
+    "<data><memory-statistics><memory-statistic><name>Processor</name>"
+    "<total-memory>100</total-memory><used-memory>25</used-memory>"
+    "</memory-statistic><memory-statistic><name>io</name>"
+    "<total-memory>10</total-memory><used-memory>5</used-memory>"
+    "</memory-statistic></memory-statistics></data>"
+)
+HOSTNAME_REPLY = "<data><hostname>router</hostname></data>"
+
+
+def fake_netconf_session(sessions: list):
+    """Return a NetconfSession replacement replying to the memory and hostname filters."""
+
+    class FakeNetconfSession:
+        def __init__(self, device, netconf_filters, operation, pool, timings):
+            sessions.append(netconf_filters)
+            if timings is not None:
+                timings.connect = 0.5
+                timings.rpc = 0.25
+
+        def replies(self):
+            return [MEMORY_REPLY, HOSTNAME_REPLY]
+
+    return FakeNetconfSession
+
+
+def test_process_device_parses_each_filter(client, monkeypatch):
+    """
+    Test every filter is fetched over one session and parsed by its parser.
+    """
+    sessions = []
+
+    monkeypatch.setattr(
+        "ncpeek.client.NetconfSession", fake_netconf_session(sessions)
+    )
+    client.set_devices_settings("devnet_xr_sandbox.json")
+    client.set_xml_filter(
+        ["Cisco-IOS-XE-memory-oper.xml", "Cisco-IOS-XR-hostname.xml"]
+    )
+    client._load_settings()
+    result = client._process_device(
+        {"host": "localhost", "username": "user", "password": "pass"}
+    )
+
+    assert len(sessions) == 1
+    result = [record_to_dict(record) for record in result]
+    assert [record["field"] for record in result] == [
+        "Cisco-IOS-XE-memory-oper.xml",
+        "Cisco-IOS-XE-memory-oper.xml",
+        "Cisco-IOS-XR-hostname.xml",
+    ]
+    assert result[0]["percent_used"] == 25
+    assert result[2]["data"] == {"hostname": "router"}
+
+
+def test_fetch_iter_yields_devices_as_they_finish(monkeypatch):
+    """
+    Test fetch_iter yields the first device to finish first.
+    """
+
+    def fake_process_device(device: dict) -> list:
+        time.sleep(0.2 if device["host"] == "slow" else 0)
+        return [{"device": device["host"]}]
+
+    client = NetconfClient(max_workers=2)
+    client.set_devices_settings([{"host": "slow"}, {"host": "fast"}])
+    client.set_xml_filter("Cisco-IOS-XR-hostname.xml")
+    monkeypatch.setattr(client, "_process_device", fake_process_device)
+
+    assert list(client.fetch_iter()) == [
+        {"device": "fast"},
+        {"device": "slow"},
+    ]
+
+
+def test_write_results_ndjson(monkeypatch):
+    """
+    Test ndjson output writes one JSON object per line.
+    """
+    client = NetconfClient(output_format="ndjson")
+    client.set_devices_settings([{"host": "a"}, {"host": "b"}])
+    client.set_xml_filter("Cisco-IOS-XR-hostname.xml")
+    monkeypatch.setattr(
+        client,
+        "_process_device",
+        lambda device: [{"device": device["host"]}, {"n": 1}],
+    )
+    output = io.StringIO()
+    client.write_results(output=output)
+
+    assert [json.loads(line) for line in output.getvalue().splitlines()] == [
+        {"device": "a"},
+        {"n": 1},
+        {"device": "b"},
+        {"n": 1},
+    ]
+
+
+def test_process_device_timings(monkeypatch):
+    """
+    Test collect_timings adds a timings record after the device records,
+    and the callback receives the same timings.
+    """
+    received = []
+    client = NetconfClient(collect_timings=True, timings_callback=received.append)
+    monkeypatch.setattr("ncpeek.client.NetconfSession", fake_netconf_session([]))
+    client.set_devices_settings("devnet_xr_sandbox.json")
+    client.set_xml_filter(
+        ["Cisco-IOS-XE-memory-oper.xml", "Cisco-IOS-XR-hostname.xml"]
+    )
+    client._load_settings()
+    result = client._process_device(
+        {"host": "10.0.0.1", "username": "user", "password": "pass"}
+    )
+
+    timings_record = result[-1]
+    assert len(result) == 4
+    assert timings_record["field"] == TIMINGS_FIELD
+    assert timings_record["ip"] == "10.0.0.1"
+    assert timings_record["data"]["connect"] == 0.5
+    assert timings_record["data"]["rpc"] == 0.25
+    assert timings_record["data"]["convert"] > 0
+    assert timings_record["data"]["parse"] > 0
+    assert timings_record["data"]["serialize"] is None
+    assert timings_record["data"]["records"] == 3
+    assert timings_record["data"]["reply_bytes"] == len(MEMORY_REPLY) + len(
+        HOSTNAME_REPLY
+    )
+    assert len(received) == 1
+    assert received[0].to_record() == timings_record
+
+
+def test_process_device_without_timings(client, monkeypatch):
+    """
+    Test no timings record is added by default.
+    """
+    monkeypatch.setattr("ncpeek.client.NetconfSession", fake_netconf_session([]))
+    client.set_devices_settings("devnet_xr_sandbox.json")
+    client.set_xml_filter("Cisco-IOS-XR-hostname.xml")
+    client._load_settings()
+    result = client._process_device(
+        {"host": "10.0.0.1", "username": "user", "password": "pass"}
+    )
+
+    assert all(record["field"] != TIMINGS_FIELD for record in result)
+
+
+@pytest.mark.parametrize("output_format", ["json", "ndjson"])
+def test_write_results_with_timings(monkeypatch, output_format):
+    """
+    Test write_results measures the serialize phase of each device,
+    keeping the records and timings of every device in the output.
+    """
+    client = NetconfClient(output_format=output_format, collect_timings=True)
+    client.set_devices_settings([{"host": "a"}, {"host": "b"}])
+    client.set_xml_filter("Cisco-IOS-XR-hostname.xml")
+    monkeypatch.setattr(
+        client,
+        "_process_device",
+        lambda device: [
+            {"device": device["host"]},
+            DeviceTimings(device=device["host"]).to_record(),
+        ],
+    )
+    output = io.StringIO()
+    client.write_results(output=output)
+
+    if output_format == "json":
+        records = json.loads(output.getvalue())
+    else:
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [record["device"] for record in records] == ["a", "a", "b", "b"]
+    assert records[1]["field"] == TIMINGS_FIELD
+    assert records[1]["data"]["serialize"] >= 0
+    assert records[3]["data"]["serialize"] >= 0
+
+
+def test_fetch_with_change_filter(monkeypatch):
+    """
+    Test each fetch only returns the records changed since the previous one,
+    plus the unchanged records due to their heartbeat.
+    """
+    client = NetconfClient(change_filter=ChangeFilter(heartbeat=2))
+    monkeypatch.setattr("ncpeek.client.NetconfSession", fake_netconf_session([]))
+    client.set_devices_settings(
+        [{"host": "10.0.0.1", "username": "user", "password": "pass"}]
+    )
+    client.set_xml_filter("Cisco-IOS-XE-memory-oper.xml")
+
+    assert [len(json.loads(client.fetch())) for _ in range(3)] == [2, 0, 2]
+
+
+def test_write_results_influx(monkeypatch):
+    """
+    Test influx output writes a line of line protocol per record.
+    """
+    client = NetconfClient(output_format="influx")
+    client.set_devices_settings([{"host": "a"}, {"host": "b"}])
+    client.set_xml_filter("Cisco-IOS-XR-hostname.xml")
+    monkeypatch.setattr(
+        client,
+        "_process_device",
+        lambda device: [{"device": device["host"], "percent_used": 25}],
+    )
+    output = io.StringIO()
+    client.write_results(output=output)
+
+    assert output.getvalue() == (
+        "ncpeek,device=a percent_used=25i\nncpeek,device=b percent_used=25i\n"
+    )
+
+
+def test_import_does_not_load_heavy_modules():
+    """
+    Test importing the client leaves ncclient, xmltodict, lxml and
+    multiprocessing to be loaded when a session, parse or pool is needed.
+    """
+    modules = ("ncclient", "paramiko", "xmltodict", "lxml", "multiprocessing")
+    code = (
+        "import sys, ncpeek.client; "
+        f"print([m for m in {modules!r} if m in sys.modules])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_process_device_with_parse_pool(client, monkeypatch):
+    """
+    Test the replies above the threshold of the parse pool give the same
+    records as the replies parsed in-process.
+    """
+    monkeypatch.setattr("ncpeek.client.NetconfSession", fake_netconf_session([]))
+    client.set_devices_settings("devnet_xr_sandbox.json")
+    client.set_xml_filter(
+        ["Cisco-IOS-XE-memory-oper.xml", "Cisco-IOS-XR-hostname.xml"]
+    )
+    client._load_settings()
+    device = {"host": "10.0.0.1", "username": "user", "password": "pass"}
+    expected = client._process_device(device)
+
+    pool_client = NetconfClient(parse_pool=ParsePool(workers=1, threshold=0))
+    pool_client._filters = client._filters
+    try:
+        assert pool_client._process_device(device) == expected
+    finally:
+        pool_client.close()
+
+
+def test_failed_device_gives_error_records(monkeypatch):
+    """
+    Test a device raising gives an error record per filter
+    and the records of the other devices are kept.
+    """
+
+    def fake_process_device(device: dict) -> list:
+        if device["host"] == "down":
+            raise ConnectionError("unreachable")
+        return [{"device": device["host"]}]
+
+    client = NetconfClient()
+    client.set_devices_settings([{"host": "down", "hostname": "r1"}, {"host": "up"}])
+    client.set_xml_filter(
+        ["Cisco-IOS-XE-memory-oper.xml", "Cisco-IOS-XR-hostname.xml"]
+    )
+    monkeypatch.setattr(client, "_process_device", fake_process_device)
+
+    assert json.loads(client.fetch()) == [
+        {
+            "field": "Cisco-IOS-XE-memory-oper.xml",
+            "device": "r1",
+            "ip": "down",
+            "error": "ConnectionError",
+            "message": "unreachable",
+        },
+        {
+            "field": "Cisco-IOS-XR-hostname.xml",
+            "device": "r1",
+            "ip": "down",
+            "error": "ConnectionError",
+            "message": "unreachable",
+        },
+        {"device": "up"},
+    ]
+
+
+@pytest.mark.parametrize(
+    "max_workers, fast_error", [(1, "DeadlineExceeded"), (2, None)]
+)
+def test_deadline_keeps_finished_devices(monkeypatch, max_workers, fast_error):
+    """
+    Test devices still running or waiting at the deadline give error
+    records, in their place with fetch and last with fetch_iter.
+    With a single worker, the fast device waits for the slow one.
+    """
+
+    def fake_process_device(device: dict) -> list:
+        time.sleep(1 if device["host"] == "slow" else 0)
+        return [{"device": device["host"], "timeout": device["timeout"]}]
+
+    client = NetconfClient(max_workers=max_workers, deadline=0.3)
+    client.set_devices_settings([{"host": "slow"}, {"host": "fast"}])
+    client.set_xml_filter("Cisco-IOS-XR-hostname.xml")
+    monkeypatch.setattr(client, "_process_device", fake_process_device)
+
+    start = time.perf_counter()
+    records = json.loads(client.fetch())
+    iter_records = list(client.fetch_iter())
+
+    assert time.perf_counter() - start < 1
+    assert [record.get("error") for record in records] == [
+        "DeadlineExceeded",
+        fast_error,
+    ]
+    assert sorted(record.get("error") or "" for record in iter_records) == sorted(
+        ["DeadlineExceeded", fast_error or ""]
+    )
+    assert iter_records[-1]["error"] == "DeadlineExceeded"
+    assert "deadline of 0.3 seconds" in records[0]["message"]
+    if fast_error is None:
+        assert records[1] == {"device": "fast", "timeout": 1}
+
+
+def test_invalid_deadline():
+    """
+    Test a deadline must be above 0.
+    """
+    client = NetconfClient(deadline=0)
+    client.set_devices_settings([{"host": "a"}])
+    client.set_xml_filter("Cisco-IOS-XR-hostname.xml")
+
+    with pytest.raises(ValueError):
+        client.fetch()
+
+
+def test_circuit_breaker_skips_failing_device(monkeypatch):
+    """
+    Test a device failing to connect is skipped once its circuit opens,
+    with a CircuitOpen error record and without connecting.
+    """
+    connections = []
+
+    class FailingSession:
+        def __init__(self, device, **kwargs):
+            connections.append(device.host)
+            raise ConnectionRefusedError("refused")
+
+    monkeypatch.setattr("ncpeek.client.NetconfSession", FailingSession)
+    client = NetconfClient(circuit_breaker=CircuitBreaker(failure_threshold=2))
+    client.set_devices_settings(
+        [{"host": "10.0.0.1", "username": "user", "password": "pass"}]
+    )
+    client.set_xml_filter("Cisco-IOS-XR-hostname.xml")
+
+    errors = [json.loads(client.fetch())[0]["error"] for _ in range(3)]
+
+    assert errors == [
+        "ConnectionRefusedError",
+        "ConnectionRefusedError",
+        "CircuitOpen",
+    ]
+    assert len(connections) == 2
+
+
+def test_setup_cli_options_override_defaults():
+    """
+    Test the execution options given on the command line replace those
+    of the client, and the options left out keep them.
+    """
+    client = NetconfClient(max_workers=4, deadline=30)
+    client.setup_cli(
+        [
+            "--device-settings=devnet_xr_sandbox.json",
+            "--xml-filter=Cisco-IOS-XR-hostname.xml",
+            "--workers=1",
+        ]
+    )
+
+    assert client.max_workers == 1
+    assert client.deadline == 30
+
+
+def test_setup_cli_poll_interval():
+    """
+    Test the interval of the poll command is read from the client.
+    """
+    client = NetconfClient()
+    client.setup_cli(
+        [
+            "--device-settings=devnet_xr_sandbox.json",
+            "--xml-filter=Cisco-IOS-XR-hostname.xml",
+            "--interval=10",
+        ],
+        poll=True,
+    )
+
+    assert client.get_poll_interval() == 10
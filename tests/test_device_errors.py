@@ -0,0 +1,51 @@
+from ncpeek.netconf_filters import NetconfFilter
+from ncpeek.device_errors import (
+    DeadlineExceeded,
+    error_records,
+    is_error_record,
+)
+
+
+def test_error_records_one_per_filter():
+    """
+    Test a record is made for each filter, with the error class and message.
+    """
+    filters = [NetconfFilter("a.xml", "<a/>"), NetconfFilter("b.xml", "<b/>")]
+
+    records = error_records(
+        {"host": "10.0.0.1", "hostname": "r1"},
+        filters,
+        DeadlineExceeded("too slow"),
+    )
+
+    assert records == [
+        {
+            "field": field,
+            "device": "r1",
+            "ip": "10.0.0.1",
+            "error": "DeadlineExceeded",
+            "message": "too slow",
+        }
+        for field in ("a.xml", "b.xml")
+    ]
+    assert all(map(is_error_record, records))
+
+
+def test_error_records_without_hostname():
+    """
+    Test the host is used as device, like NetconfDevice does.
+    """
+    records = error_records(
+        {"host": "10.0.0.1"}, [NetconfFilter("a.xml", "<a/>")], OSError()
+    )
+
+    assert records[0]["device"] == "10.0.0.1"
+    assert records[0]["error"] == "OSError"
+
+
+def test_is_error_record():
+    """
+    Test parsed records are not error records.
+    """
+    assert not is_error_record({"field": "a.xml", "data": {"error": 1}})
+    assert not is_error_record(None)
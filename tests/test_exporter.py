@@ -0,0 +1,293 @@
+import io
+import time
+import threading
+import urllib.request
+from urllib.error import HTTPError
+import pytest
+from ncpeek.netconf_filters import NetconfFilter
+from ncpeek.exporter import (
+    OPENMETRICS_CONTENT_TYPE,
+    Exporter,
+    ExporterServer,
+    ScrapeCache,
+    records_to_samples,
+    render_openmetrics,
+)
+
+DEVICES = [
+    {"host": "10.0.0.1", "hostname": "router1", "username": "u", "password": "p"},
+    {"host": "10.0.0.2", "username": "u", "password": "p"},
+]
+FILTERS = [
+    NetconfFilter(filter_id="Cisco-IOS-XE-memory-oper.xml", netconf_filter="<a/>"),
+    NetconfFilter(filter_id="Cisco-IOS-XR-hostname.xml", netconf_filter="<b/>"),
+]
+
+
+class FakeClient:
+    """Stand-in for NetconfClient returning a memory record per filter."""
+
+    def __init__(self, fail: bool = False, delay: float = 0):
+        self.calls = []
+        self.fail = fail
+        self.delay = delay
+        self.closed = False
+
+    def fetch_device(self, device: dict, netconf_filters: list) -> list:
+        self.calls.append((device["host"], [f.filter_id for f in netconf_filters]))
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("unreachable")
+        return [
+            {
+                "name": "Processor",
+                "percent_used": 25.5,
+                "field": netconf_filter.filter_id,
+                "device": device.get("hostname", device["host"]),
+                "ip": device["host"],
+            }
+            for netconf_filter in netconf_filters
+        ]
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def make_exporter(client: FakeClient, cache_ttl: float = 60) -> Exporter:
+    return Exporter(
+        devices=DEVICES,
+        filters=FILTERS,
+        cache_ttl=cache_ttl,
+        client=client,
+        error_stream=io.StringIO(),
+    )
+
+
+def test_records_to_samples():
+    """
+    Test numeric fields become samples, text fields become labels,
+    nested dictionaries are flattened and lists are skipped.
+    """
+    records = [
+        {
+            "isis_neighbors_count": 2,
+            "isis-neighbors": [{"neighbor_status": 1}],
+            "name": "Gi1",
+            "enabled": True,
+            "field": "isis",
+            "device": "router1",
+            "ip": "10.0.0.1",
+        },
+        {
+            "ip": "10.0.0.1",
+            "device": "router1",
+            "field": "generic",
+            "data": {"memory": {"free": "1024", "ratio": "0.5", "state": "ok"}},
+        },
+    ]
+
+    samples = list(records_to_samples(records))
+
+    isis_labels = {
+        "device": "router1",
+        "ip": "10.0.0.1",
+        "filter": "isis",
+        "name": "Gi1",
+    }
+    generic_labels = {"device": "router1", "ip": "10.0.0.1", "filter": "generic"}
+    assert samples == [
+        ("isis_neighbors_count", isis_labels, 2),
+        ("enabled", isis_labels, 1),
+        ("memory_free", generic_labels, 1024),
+        ("memory_ratio", generic_labels, 0.5),
+    ]
+
+
+def test_render_openmetrics():
+    """
+    Test samples are grouped by family, names and label values are escaped.
+    """
+    samples = [
+        ("in-octets", {"device": "r1", "name": 'Gi"1'}, 10),
+        ("rx-kbps", {"device": "r1"}, 1.5),
+        ("in-octets", {"device": "r2", "name": "Gi\\2"}, 20),
+    ]
+
+    assert render_openmetrics(samples) == (
+        "# TYPE ncpeek_in_octets gauge\n"
+        'ncpeek_in_octets{device="r1",name="Gi\\"1"} 10\n'
+        'ncpeek_in_octets{device="r2",name="Gi\\\\2"} 20\n'
+        "# TYPE ncpeek_rx_kbps gauge\n"
+        'ncpeek_rx_kbps{device="r1"} 1.5\n'
+        "# EOF\n"
+    )
+
+
+def test_scrape_cache_shares_concurrent_fetches():
+    """
+    Test concurrent gets of the same key wait for a single fetch.
+    """
+    cache = ScrapeCache(ttl=60)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return "metrics"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get("key", fetch)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["metrics"] * 5
+    assert len(calls) == 1
+
+
+def test_scrape_cache_expires():
+    """
+    Test results older than ttl are fetched again, and errors are not kept.
+    """
+    cache = ScrapeCache(ttl=0)
+    values = iter(["first", "second"])
+
+    assert cache.get("key", lambda: next(values)) == "first"
+    assert cache.get("key", lambda: next(values)) == "second"
+
+    def fail():
+        raise ConnectionError("unreachable")
+
+    with pytest.raises(ConnectionError):
+        ScrapeCache(ttl=60).get("key", fail)
+
+
+def test_scrape_cache_drops_expired_locks():
+    """
+    Test the lock of a key goes away with its expired result.
+    """
+    cache = ScrapeCache(ttl=0)
+    for key in range(3):
+        cache.get(key, lambda: "metrics")
+
+    assert cache._locks == {}
+    assert cache._entries == {}
+
+
+def test_scrape_uses_cache_for_hostname_and_host():
+    """
+    Test a target is found by hostname or host, sharing the cached result.
+    """
+    client = FakeClient()
+    exporter = make_exporter(client)
+
+    metrics = exporter.scrape("router1", ["Cisco-IOS-XE-memory-oper.xml"])
+    assert exporter.scrape("10.0.0.1", ["Cisco-IOS-XE-memory-oper.xml"]) == metrics
+    assert client.calls == [("10.0.0.1", ["Cisco-IOS-XE-memory-oper.xml"])]
+    assert (
+        'ncpeek_percent_used{device="router1",ip="10.0.0.1",'
+        'filter="Cisco-IOS-XE-memory-oper.xml",name="Processor"} 25.5'
+    ) in metrics
+    assert 'ncpeek_scrape_success{device="router1",ip="10.0.0.1"} 1' in metrics
+    assert metrics.endswith("# EOF\n")
+
+
+def test_scrape_all_filters_by_default():
+    """
+    Test all the filters are fetched over one session without filter.
+    """
+    client = FakeClient()
+    make_exporter(client).scrape("10.0.0.2")
+
+    assert client.calls == [
+        ("10.0.0.2", ["Cisco-IOS-XE-memory-oper.xml", "Cisco-IOS-XR-hostname.xml"])
+    ]
+
+
+def test_scrape_unknown_target_or_filter():
+    """
+    Test unknown targets and filters are rejected without fetching.
+    """
+    client = FakeClient()
+    exporter = make_exporter(client)
+
+    with pytest.raises(LookupError):
+        exporter.scrape("unknown")
+    with pytest.raises(LookupError):
+        exporter.scrape("router1", ["unknown.xml"])
+    assert client.calls == []
+
+
+def test_scrape_failure():
+    """
+    Test a failed fetch is reported by ncpeek_scrape_success.
+    """
+    exporter = make_exporter(FakeClient(fail=True))
+    metrics = exporter.scrape("router1")
+
+    assert 'ncpeek_scrape_success{device="router1",ip="10.0.0.1"} 0' in metrics
+    assert "percent_used" not in metrics
+    assert "unreachable" in exporter.error_stream.getvalue()
+
+
+def test_scrape_failure_is_not_cached():
+    """
+    Test the scrape after a failed one fetches the device again.
+    """
+    client = FakeClient(fail=True)
+    exporter = make_exporter(client)
+    exporter.scrape("router1")
+    client.fail = False
+    metrics = exporter.scrape("router1")
+
+    assert len(client.calls) == 2
+    assert 'ncpeek_scrape_success{device="router1",ip="10.0.0.1"} 1' in metrics
+
+
+@pytest.fixture
+def server():
+    """Serve an exporter with a fake client on a free port."""
+    exporter_server = ExporterServer(make_exporter(FakeClient()), "127.0.0.1", 0)
+    thread = threading.Thread(
+        target=exporter_server.serve_forever, args=(0.05,), daemon=True
+    )
+    thread.start()
+    yield f"http://127.0.0.1:{exporter_server.server_address[1]}"
+    exporter_server.shutdown()
+    exporter_server.server_close()
+
+
+def test_server_metrics(server):
+    """
+    Test /metrics answers with OpenMetrics.
+    """
+    url = f"{server}/metrics?target=router1&filter=Cisco-IOS-XE-memory-oper.xml"
+    with urllib.request.urlopen(url, timeout=5) as response:
+        body = response.read().decode("utf-8")
+        content_type = response.headers["Content-Type"]
+
+    assert content_type == OPENMETRICS_CONTENT_TYPE
+    assert "ncpeek_percent_used" in body
+
+
+@pytest.mark.parametrize(
+    "path, status",
+    [
+        ("/metrics", 400),
+        ("/metrics?target=unknown", 404),
+        ("/metrics?target=router1&filter=unknown.xml", 404),
+        ("/other", 404),
+    ],
+)
+def test_server_errors(server, path, status):
+    """
+    Test missing or unknown targets and paths are rejected.
+    """
+    with pytest.raises(HTTPError) as error:
+        urllib.request.urlopen(f"{server}{path}", timeout=5)
+
+    assert error.value.code == status
@@ -1,6 +1,53 @@
+import pytest
 from ncpeek.netconf_parsers import Parser
-from ncpeek.factory.factory_parsers import get_parser
+from ncpeek.factory import factory_parsers
+from ncpeek.factory.factory_parsers import (
+    ENTRY_POINT_GROUP,
+    clear_parser_cache,
+    get_parser,
+    get_parser_class,
+)
 from ncpeek.factory.factory_mappings import PARSER_MAPPING
+from ncpeek.parsers.default_parser import DefaultParser
+from ncpeek.parsers.spec_parser import SPECS_DIRS_ENV, SpecParser
+from ncpeek.parsers.cisco_ios_xe_memory_oper import CiscoIOSXEMemoryParser
+
+ISIS_FILTER = (
+    "http://cisco.com/ns/yang/Cisco-IOS-XE-isis-oper:/isis-oper-data/isis-instance"
+)
+
+
+class FakeEntryPoint:
+    """Entry point counting how many times it is loaded."""
+
+    def __init__(self, name: str, parser_class: type):
+        self.name = name
+        self.parser_class = parser_class
+        self.loads = 0
+
+    def load(self) -> type:
+        self.loads += 1
+        return self.parser_class
+
+
+@pytest.fixture
+def plugins(monkeypatch):
+    """Installs fake parser entry points."""
+    installed = {
+        "plugin_filter.xml": FakeEntryPoint(
+            "plugin_filter.xml", CiscoIOSXEMemoryParser
+        ),
+        "unused_filter.xml": FakeEntryPoint("unused_filter.xml", DefaultParser),
+    }
+
+    def fake_entry_points(group: str):
+        assert group == ENTRY_POINT_GROUP
+        return list(installed.values())
+
+    monkeypatch.setattr("importlib.metadata.entry_points", fake_entry_points)
+    clear_parser_cache()
+    yield installed
+    clear_parser_cache()
 
 
 def test_parser_mapping_structure():
@@ -29,3 +76,82 @@ def test_get_parser():
 
         # Check that the instance has a parse method
         assert hasattr(parser_instance, "parse")
+
+
+def test_get_parser_class_is_cached(monkeypatch):
+    """
+    Test the parser module is imported only once per filter.
+    """
+    clear_parser_cache()
+    imports = []
+    import_module = factory_parsers.importlib.import_module
+    monkeypatch.setattr(
+        factory_parsers.importlib,
+        "import_module",
+        lambda name: imports.append(name) or import_module(name),
+    )
+
+    for _ in range(3):
+        get_parser(ISIS_FILTER)
+
+    assert imports == ["ncpeek.parsers.cisco_ios_xe_isis_oper"]
+
+
+def test_get_parser_returns_new_instances():
+    """
+    Test each call returns its own parser instance.
+    """
+    assert get_parser("default_parser") is not get_parser("default_parser")
+
+
+def test_get_parser_from_entry_point(plugins):
+    """
+    Test parsers of other packages are found by filter ID and loaded on use.
+    """
+    assert get_parser_class("plugin_filter.xml") is CiscoIOSXEMemoryParser
+    assert get_parser_class("plugin_filter.xml") is CiscoIOSXEMemoryParser
+
+    assert plugins["plugin_filter.xml"].loads == 1
+    assert plugins["unused_filter.xml"].loads == 0
+
+
+def test_get_parser_unknown_filter(plugins):
+    """
+    Test unknown filters use the default parser.
+    """
+    assert isinstance(get_parser("unknown.xml"), DefaultParser)
+
+
+def test_get_parser_from_builtin_spec():
+    """
+    Test filters with a built-in spec use the parser compiled from it,
+    the same class as the one of the parser module.
+    """
+    clear_parser_cache()
+
+    assert get_parser_class("Cisco-IOS-XE-memory-oper.xml") is CiscoIOSXEMemoryParser
+    assert issubclass(
+        get_parser_class("Cisco-IOS-XE-interfaces-oper.xml"), SpecParser
+    )
+
+
+def test_get_parser_from_user_spec(tmp_path, monkeypatch):
+    """
+    Test specs of NCPEEK_PARSER_SPECS are registered by their filter ID.
+    """
+    (tmp_path / "hostname.json").write_text(
+        '{"filter_id": "Cisco-IOS-XR-hostname.xml",'
+        ' "record_path": ["data", "host-names"],'
+        ' "fields": [{"name": "hostname", "path": "host-name"}]}',
+        encoding="utf-8",
+    )
+    monkeypatch.setenv(SPECS_DIRS_ENV, str(tmp_path))
+    clear_parser_cache()
+
+    parser_class = get_parser_class("Cisco-IOS-XR-hostname.xml")
+
+    assert parser_class.spec.filter_id == "Cisco-IOS-XR-hostname.xml"
+    assert get_parser_class("Cisco-IOS-XR-hostname.xml") is parser_class
+    monkeypatch.delenv(SPECS_DIRS_ENV)
+    clear_parser_cache()
+    assert get_parser_class("Cisco-IOS-XR-hostname.xml") is DefaultParser
@@ -0,0 +1,105 @@
+import pytest
+from ncpeek.parse_pool import ParsePool, pack_records, parse_reply, unpack_records
+from ncpeek.netconf_devices import NetconfDevice
+from ncpeek.netconf_filters import NetconfFilter
+from ncpeek.records import IsisNeighbor, IsisStats, IsisSystem, MemoryStats
+from ncpeek.timings import DeviceTimings
+from ncpeek.simulator.replies import iosxe_memory_reply
+
+DEVICE = NetconfDevice(host="10.0.0.1", hostname="r1", username="u", password="p")
+MEMORY_FILTER = NetconfFilter(
+    filter_id="Cisco-IOS-XE-memory-oper.xml", netconf_filter="<filter/>"
+)
+
+
+@pytest.fixture
+def pool():
+    parse_pool = ParsePool(workers=1, threshold=100)
+    yield parse_pool
+    parse_pool.close()
+
+
+def test_pack_records_round_trip():
+    """
+    Test records are packed as rows by type and rebuilt in the same order.
+    """
+    neighbor = IsisNeighbor("Gi1", "level-2", None, "isis-adj-up", "25")
+    records = [
+        MemoryStats("Processor", 25.0, "f", "r1", "10.0.0.1"),
+        MemoryStats("lsmpi_io", 1.5, "f", "r1", "10.0.0.1"),
+        IsisStats((IsisSystem("0000.0000.0001", (neighbor,), 1),), "f", "r1", None),
+        {"field": "f", "data": {"hostname": "r1"}},
+    ]
+
+    packed = pack_records(records)
+
+    assert [record_type for record_type, _ in packed] == [MemoryStats, IsisStats, None]
+    assert packed[0][1][1] == ("lsmpi_io", 1.5, "f", "r1", "10.0.0.1")
+    assert unpack_records(packed) == records
+
+
+def test_small_reply_parsed_in_process(pool):
+    """
+    Test replies below the threshold do not start the worker processes.
+    """
+    reply = iosxe_memory_reply(1)
+    pool.threshold = len(reply) + 1
+
+    records = pool.parse(reply, DEVICE, MEMORY_FILTER)
+
+    assert records == parse_reply(reply, DEVICE, MEMORY_FILTER)
+    assert pool._executor is None
+
+
+def test_threshold_counts_bytes(pool):
+    """
+    Test the threshold is compared with the size of the reply in bytes,
+    not its length in characters.
+    """
+    reply = iosxe_memory_reply(1).replace("Pool0", "Pool0-\u00e9\u00e9\u00e9")
+    pool.threshold = len(reply) + 1
+
+    records = pool.parse(reply, DEVICE, MEMORY_FILTER)
+
+    assert pool._executor is not None
+    assert records == parse_reply(reply, DEVICE, MEMORY_FILTER)
+
+
+def test_large_reply_parsed_in_worker(pool):
+    """
+    Test replies above the threshold give the records parsed in-process,
+    with the phases and counts measured in the worker.
+    """
+    reply = iosxe_memory_reply(50)
+    timings = DeviceTimings(device="r1", ip="10.0.0.1", rpc=0.5)
+
+    records = pool.parse(reply, DEVICE, MEMORY_FILTER, timings)
+
+    assert pool._executor is not None
+    assert records == parse_reply(reply, DEVICE, MEMORY_FILTER)
+    assert all(isinstance(record, MemoryStats) for record in records)
+    assert timings.rpc == 0.5
+    assert timings.parse > 0
+    assert timings.records == len(records)
+    assert timings.reply_bytes == len(reply.encode("utf-8"))
+
+
+def test_close_then_reuse(pool):
+    """
+    Test a closed pool starts new worker processes when used again.
+    """
+    reply = iosxe_memory_reply(5)
+    first = pool.parse(reply, DEVICE, MEMORY_FILTER)
+    pool.close()
+
+    assert pool._executor is None
+    assert pool.parse(reply, DEVICE, MEMORY_FILTER) == first
+
+
+@pytest.mark.parametrize("workers, threshold", [(0, 100), (1, -1)])
+def test_invalid_pool(workers, threshold):
+    """
+    Test a pool needs a worker and a threshold of 0 or greater.
+    """
+    with pytest.raises(ValueError):
+        ParsePool(workers=workers, threshold=threshold)
@@ -1,4 +1,6 @@
 import pytest
+import xmltodict
+from ncpeek.utils.text_utils import iterparse_xml_elements
 from ncpeek.parsers.cisco_ios_xe_interfaces_oper import (
     InterfaceStatsIOSXEParser,
 )
@@ -160,4 +162,25 @@ def test_InterfaceStatsIOSXEParser_parser():
         netconf_filter_id=NETCONF_FILTER_ID,
     )
 
-    assert result == EXPECTED_DATA
+    assert [record.to_dict() for record in result] == EXPECTED_DATA
+
+
+def test_InterfaceStatsIOSXEParser_parse_elements():
+    """
+    Test parsing elements gives the same output as parsing the whole reply.
+    """
+
+    test_parser = InterfaceStatsIOSXEParser()
+    elements = iterparse_xml_elements(
+        xml_string=xmltodict.unparse(DATA_TO_PARSE),
+        record_path=test_parser.record_path,
+    )
+    result = test_parser.parse_elements(
+        elements=elements,
+        device=NetconfDevice(
+            host="localhost", username="user", password="pass"
+        ),
+        netconf_filter_id=NETCONF_FILTER_ID,
+    )
+
+    assert [record.to_dict() for record in result] == EXPECTED_DATA
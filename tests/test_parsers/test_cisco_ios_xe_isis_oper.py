@@ -1,5 +1,11 @@
 import pytest
+import xmltodict
+from ncpeek.utils.text_utils import (
+    convert_xml_to_dict,
+    iterparse_xml_records,
+)
 from ncpeek.parsers.cisco_ios_xe_isis_oper import ISISStatsIOSXEParser
+from ncpeek.records import IsisNeighbor
 from ncpeek.netconf_devices import NetconfDevice
 
 device = NetconfDevice(
@@ -93,36 +99,36 @@ def test_parse():
             "isis_neighbors_count": 2,
         }
     ]
-    assert parsed_data == expected_data
+    assert [record.to_dict() for record in parsed_data] == expected_data
 
 
 def test_group_data_by_system_id():
     grouped_data = parser._group_data_by_system_id(DATA_TO_PARSE)
     expected_data = {
         "00:00:00:00:00:0a": [
-            {
-                "holdtime": 60,
-                "interface_name": "GigabitEthernet1",
-                "isis_status": "isis-adj-up",
-                "level": "level-1",
-                "local_ipv4_address": "192.168.0.1",
-            },
-            {
-                "holdtime": 30,
-                "interface_name": "GigabitEthernet2",
-                "isis_status": "isis-adj-down",
-                "level": "level-2",
-                "local_ipv4_address": "192.168.0.2",
-            },
+            IsisNeighbor(
+                holdtime=60,
+                interface_name="GigabitEthernet1",
+                isis_status="isis-adj-up",
+                level="level-1",
+                local_ipv4_address="192.168.0.1",
+            ),
+            IsisNeighbor(
+                holdtime=30,
+                interface_name="GigabitEthernet2",
+                isis_status="isis-adj-down",
+                level="level-2",
+                local_ipv4_address="192.168.0.2",
+            ),
         ],
         "00:00:00:00:00:0c": [
-            {
-                "holdtime": 45,
-                "interface_name": "GigabitEthernet2",
-                "isis_status": "isis-adj-up",
-                "level": "level-1",
-                "local_ipv4_address": "192.168.0.3",
-            }
+            IsisNeighbor(
+                holdtime=45,
+                interface_name="GigabitEthernet2",
+                isis_status="isis-adj-up",
+                level="level-1",
+                local_ipv4_address="192.168.0.3",
+            )
         ],
     }
 
@@ -152,14 +158,36 @@ def test_group_data_by_system_id_single_neighbor():
 
     expected_data = {
         "00:00:00:00:00:0b": [
-            {
-                "interface_name": "GigabitEthernet3",
-                "level": "isis-level-1",
-                "local_ipv4_address": "10.4.4.1",
-                "isis_status": "isis-adj-up",
-                "holdtime": "22",
-            }
+            IsisNeighbor(
+                interface_name="GigabitEthernet3",
+                level="isis-level-1",
+                local_ipv4_address="10.4.4.1",
+                isis_status="isis-adj-up",
+                holdtime="22",
+            )
         ]
     }
 
     assert grouped_data == expected_data
+
+
+def test_parse_records():
+    xml_string = xmltodict.unparse(DATA_TO_PARSE)
+    records = iterparse_xml_records(
+        xml_string=xml_string, record_path=parser.record_path
+    )
+
+    assert parser.parse_records(records, device, FILTER_ID) == parser.parse(
+        convert_xml_to_dict(xml_string), device, FILTER_ID
+    )
+
+
+def test_parse_records_single_neighbor():
+    xml_string = xmltodict.unparse(SINGLE_ISIS_NEIGHBOR)
+    records = iterparse_xml_records(
+        xml_string=xml_string, record_path=parser.record_path
+    )
+
+    assert parser.parse_records(records, device, FILTER_ID) == parser.parse(
+        SINGLE_ISIS_NEIGHBOR, device, FILTER_ID
+    )
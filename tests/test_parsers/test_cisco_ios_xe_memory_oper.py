@@ -1,4 +1,6 @@
 import pytest
+import xmltodict
+from ncpeek.utils.text_utils import iterparse_xml_elements
 from ncpeek.parsers.cisco_ios_xe_memory_oper import (
     CiscoIOSXEMemoryParser,
 )
@@ -72,4 +74,25 @@ def test_CiscoIOSXEMemoryParser_parser():
         netconf_filter_id=NETCONF_FILTER_ID,
     )
 
-    assert result == EXPECTED_DATA
+    assert [record.to_dict() for record in result] == EXPECTED_DATA
+
+
+def test_CiscoIOSXEMemoryParser_parse_elements():
+    """
+    Test parsing elements gives the same output as parsing the whole reply.
+    """
+
+    test_parser = CiscoIOSXEMemoryParser()
+    elements = iterparse_xml_elements(
+        xml_string=xmltodict.unparse(DATA_TO_PARSE),
+        record_path=test_parser.record_path,
+    )
+    result = test_parser.parse_elements(
+        elements=elements,
+        device=NetconfDevice(
+            host="localhost", username="user", password="pass"
+        ),
+        netconf_filter_id=NETCONF_FILTER_ID,
+    )
+
+    assert [record.to_dict() for record in result] == EXPECTED_DATA
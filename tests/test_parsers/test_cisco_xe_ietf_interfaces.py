@@ -1,4 +1,6 @@
 import pytest
+import xmltodict
+from ncpeek.utils.text_utils import iterparse_xml_elements
 from ncpeek.parsers.cisco_xe_ietf_interfaces import (
     InterfaceStatsIETF_IOSXEParser,
 )
@@ -88,3 +90,24 @@ def test_InterfaceStatsIETF_IOSXEParser_parser():
     )
 
     assert result == EXPECTED_DATA
+
+
+def test_InterfaceStatsIETF_IOSXEParser_parse_elements():
+    """
+    Test parsing elements gives the same output as parsing the whole reply.
+    """
+
+    test_parser = InterfaceStatsIETF_IOSXEParser()
+    elements = iterparse_xml_elements(
+        xml_string=xmltodict.unparse(DATA_TO_PARSE),
+        record_path=test_parser.record_path,
+    )
+    result = test_parser.parse_elements(
+        elements=elements,
+        device=NetconfDevice(
+            host="localhost", username="user", password="pass"
+        ),
+        netconf_filter_id=NETCONF_FILTER_ID,
+    )
+
+    assert result == EXPECTED_DATA
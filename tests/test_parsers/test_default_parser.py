@@ -1,6 +1,7 @@
 import pytest
 from ncpeek.parsers.default_parser import DefaultParser
 from ncpeek.netconf_devices import NetconfDevice
+from ncpeek.utils.text_utils import convert_xml_to_dict
 
 
 NETCONF_FILTER_ID = "Cisco-IOS-XR-facts.xml"
@@ -163,3 +164,63 @@ def test_default_parser():
     )
 
     assert result == EXPECTED_DATA
+
+
+def test_default_parser_removes_nested_namespaces():
+    """
+    Test the namespaces below the top level are removed as well.
+    """
+    result = DefaultParser().parse(
+        data_to_parse={
+            "data": {"native": {"@xmlns": "urn:x", "hostname": "r1"}}
+        },
+        device=NetconfDevice(
+            host="localhost", username="user", password="pass"
+        ),
+        netconf_filter_id=NETCONF_FILTER_ID,
+    )
+
+    assert result[0]["data"] == {"native": {"hostname": "r1"}}
+
+
+def test_default_parser_keeps_data_stripped_by_the_client():
+    """
+    Test the data is used as is once the client stripped the namespaces.
+    """
+    test_parser = DefaultParser()
+    test_parser.namespaces_stripped = True
+    data = {"native": {"hostname": "r1"}}
+    result = test_parser.parse(
+        data_to_parse={"data": data},
+        device=NetconfDevice(
+            host="localhost", username="user", password="pass"
+        ),
+        netconf_filter_id=NETCONF_FILTER_ID,
+    )
+
+    assert result[0]["data"] is data
+
+
+def test_default_parser_leaf_with_namespace_shape():
+    """
+    Test a leaf declaring a namespace gives the same record whether the
+    client or the parser removes the declaration.
+    """
+    xml_string = '<data><hostname xmlns="urn:x">r1</hostname></data>'
+    device = NetconfDevice(host="localhost", username="user", password="pass")
+    stripped_parser = DefaultParser()
+    stripped_parser.namespaces_stripped = True
+
+    stripped = stripped_parser.parse(
+        data_to_parse=convert_xml_to_dict(xml_string, strip_namespaces=True),
+        device=device,
+        netconf_filter_id=NETCONF_FILTER_ID,
+    )
+    removed = DefaultParser().parse(
+        data_to_parse=convert_xml_to_dict(xml_string),
+        device=device,
+        netconf_filter_id=NETCONF_FILTER_ID,
+    )
+
+    assert stripped == removed
+    assert stripped[0]["data"] == {"hostname": {"#text": "r1"}}
@@ -148,3 +148,43 @@ def test_remove_namespaces_from_dict():
     """
 
     assert remove_namespaces_from_dict(DATA_TO_PARSE) == EXPECTED_DATA
+
+
+def test_remove_namespaces_from_dict_inside_lists():
+    """
+    Test namespaces are removed from the dictionaries inside lists.
+    """
+    data = {
+        "interface": [
+            {"@xmlns": "urn:a", "name": "Gi1", "ipv4": {"@xmlns:nc": "urn:b"}},
+            {"@xmlns:ios": "urn:c", "name": "Gi2"},
+        ]
+    }
+
+    assert remove_namespaces_from_dict(data) == {
+        "interface": [{"name": "Gi1", "ipv4": {}}, {"name": "Gi2"}]
+    }
+
+
+def test_remove_namespaces_from_dict_without_depth_limit():
+    """
+    Test namespaces are removed at any depth by default.
+    """
+    data = leaf = {}
+    for level in range(50):
+        leaf["@xmlns"] = "urn:a"
+        leaf[f"level-{level}"] = {}
+        leaf = leaf[f"level-{level}"]
+
+    assert "@xmlns" not in repr(remove_namespaces_from_dict(data))
+
+
+def test_remove_namespaces_from_dict_with_depth_limit():
+    """
+    Test dictionaries past depth_limit are kept as they are.
+    """
+    data = {"@xmlns": "urn:a", "a": {"@xmlns": "urn:b", "b": {"@xmlns": "urn:c"}}}
+
+    assert remove_namespaces_from_dict(data, depth_limit=2) == {
+        "a": {"b": {"@xmlns": "urn:c"}}
+    }
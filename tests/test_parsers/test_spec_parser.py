@@ -0,0 +1,219 @@
+import json
+import pytest
+import xmltodict
+from ncpeek.netconf_devices import NetconfDevice
+from ncpeek.records import InterfaceStats
+from ncpeek.utils.text_utils import iterparse_xml_elements
+from ncpeek.parsers.spec_parser import (
+    ParserSpec,
+    compile_spec,
+    find_spec_files,
+    load_spec_parser,
+    read_spec,
+)
+from ncpeek.parsers.cisco_ios_xe_interfaces_oper import InterfaceStatsIOSXEParser
+
+DEVICE = NetconfDevice(host="10.0.0.1", hostname="r1", username="u", password="p")
+
+SPEC = {
+    "filter_id": "sensors.xml",
+    "record_path": ["data", "sensors", "sensor"],
+    "fields": [
+        {"name": "celsius", "path": "reading/value", "type": "float"},
+        {"name": "name", "path": "name", "replace": [" ", "_"]},
+        {"name": "alarms", "path": "reading/alarms", "type": "int"},
+        {"name": "ok", "path": "state", "equals": "normal"},
+        {"name": "load", "percent": ["reading/used", "reading/total"]},
+        {"name": "slot", "path": "slot"},
+    ],
+}
+
+DATA_TO_PARSE = {
+    "data": {
+        "sensors": {
+            "sensor": [
+                {
+                    "name": "Inlet 1",
+                    "slot": "R0",
+                    "state": "normal",
+                    "reading": {
+                        "value": "21.5",
+                        "alarms": "0",
+                        "used": "1",
+                        "total": "4",
+                    },
+                },
+                {
+                    "name": "Hotspot",
+                    "slot": "R1",
+                    "state": "critical",
+                    "reading": {
+                        "value": "90",
+                        "alarms": "3",
+                        "used": "3",
+                        "total": "4",
+                    },
+                },
+            ]
+        }
+    }
+}
+
+EXPECTED_DATA = [
+    {
+        "celsius": 21.5,
+        "name": "Inlet_1",
+        "alarms": 0,
+        "ok": 1,
+        "load": 25.0,
+        "slot": "R0",
+        "field": "sensors.xml",
+        "device": "r1",
+        "ip": "10.0.0.1",
+    },
+    {
+        "celsius": 90.0,
+        "name": "Hotspot",
+        "alarms": 3,
+        "ok": 0,
+        "load": 75.0,
+        "slot": "R1",
+        "field": "sensors.xml",
+        "device": "r1",
+        "ip": "10.0.0.1",
+    },
+]
+
+
+def test_spec_parser_parse():
+    """
+    Test a compiled spec converts and orders the fields of each entry.
+    """
+    parser = compile_spec(ParserSpec.from_dict(SPEC))()
+
+    result = parser.parse(DATA_TO_PARSE, DEVICE, "sensors.xml")
+
+    assert result == EXPECTED_DATA
+    assert [list(record) for record in result] == [
+        list(record) for record in EXPECTED_DATA
+    ]
+
+
+def test_spec_parser_parse_elements():
+    """
+    Test reading the elements gives the same records as the dictionary.
+    """
+    parser = compile_spec(ParserSpec.from_dict(SPEC))()
+    elements = iterparse_xml_elements(
+        xml_string=xmltodict.unparse(DATA_TO_PARSE),
+        record_path=parser.record_path,
+    )
+
+    assert parser.parse_elements(elements, DEVICE, "sensors.xml") == EXPECTED_DATA
+
+
+def test_spec_parser_single_entry():
+    """
+    Test a reply with a single entry, a dictionary instead of a list.
+    """
+    parser = compile_spec(ParserSpec.from_dict(SPEC))()
+    sensor = DATA_TO_PARSE["data"]["sensors"]["sensor"][0]
+    data = {"data": {"sensors": {"sensor": sensor}}}
+
+    assert parser.parse(data, DEVICE, "sensors.xml") == EXPECTED_DATA[:1]
+
+
+def test_spec_parser_record_type():
+    """
+    Test the built-in interfaces spec builds InterfaceStats records.
+    """
+    assert InterfaceStatsIOSXEParser.spec.record == "ncpeek.records.InterfaceStats"
+    assert InterfaceStatsIOSXEParser.record_path == ("data", "interfaces", "interface")
+    assert InterfaceStatsIOSXEParser()._build(
+        list(range(25)), ("f", "d", "ip")
+    ) == InterfaceStats(*range(25), "f", "d", "ip")
+
+
+def test_spec_fields_must_match_record_type():
+    """
+    Test a spec building records rejects fields out of the record order.
+    """
+    spec = ParserSpec.from_dict(
+        {
+            **SPEC,
+            "record": "ncpeek.records.MemoryStats",
+            "fields": [
+                {"name": "percent_used", "path": "value", "type": "float"},
+                {"name": "name", "path": "name"},
+            ],
+        }
+    )
+
+    with pytest.raises(ValueError) as error:
+        compile_spec(spec)
+
+    assert "name, percent_used, field, device, ip" in str(error.value)
+
+
+@pytest.mark.parametrize(
+    "change, message",
+    [
+        ({"filter_id": ""}, "filter_id"),
+        ({"extra": 1}, "Unknown spec keys: extra"),
+        ({"fields": [{"name": "a"}]}, "either 'path' or 'percent'"),
+        ({"fields": [{"name": "a", "path": "a", "type": "bytes"}]}, "unknown type"),
+        ({"fields": [{"name": "a", "percent": ["a"]}]}, "[used, total]"),
+        ({"fields": [{"name": "a", "path": "a", "default": 0}]}, "Unknown field"),
+    ],
+)
+def test_invalid_spec(change, message):
+    """
+    Test invalid specs are rejected with the reason.
+    """
+    with pytest.raises(ValueError) as error:
+        ParserSpec.from_dict({**SPEC, **change})
+
+    assert message in str(error.value)
+
+
+def test_read_spec_json_and_yaml(tmp_path):
+    """
+    Test specs are read from json and yaml files, compiled once per file.
+    """
+    json_file = tmp_path / "sensors.json"
+    json_file.write_text(json.dumps(SPEC), encoding="utf-8")
+
+    assert read_spec(json_file) == ParserSpec.from_dict(SPEC)
+    assert load_spec_parser(json_file) is load_spec_parser(str(json_file))
+
+    yaml = pytest.importorskip("yaml")
+    yaml_file = tmp_path / "sensors.yaml"
+    yaml_file.write_text(yaml.safe_dump(SPEC), encoding="utf-8")
+
+    assert read_spec(yaml_file) == ParserSpec.from_dict(SPEC)
+
+
+def test_invalid_spec_file_is_skipped(tmp_path, monkeypatch, capsys):
+    """
+    Test a spec file that is not valid is reported and the others are found.
+    """
+    (tmp_path / "broken.json").write_text("{not json", encoding="utf-8")
+    (tmp_path / "sensors.json").write_text(json.dumps(SPEC), encoding="utf-8")
+    monkeypatch.setenv("NCPEEK_PARSER_SPECS", str(tmp_path))
+
+    specs = find_spec_files()
+
+    assert specs["sensors.xml"] == tmp_path / "sensors.json"
+    assert "Cisco-IOS-XE-memory-oper.xml" in specs
+    assert "broken.json" in capsys.readouterr().err
+
+
+def test_find_builtin_spec_files():
+    """
+    Test the built-in specs are found by their filter ID.
+    """
+    assert set(find_spec_files()) >= {
+        "Cisco-IOS-XE-interfaces-oper.xml",
+        "Cisco-IOS-XE-memory-oper.xml",
+        "cisco_xe_ietf-interfaces.xml",
+    }
@@ -0,0 +1,88 @@
+import io
+import pytest
+from ncpeek.poller import Poller
+
+
+class FakeClient:
+    """Stand-in for NetconfClient counting fetch calls."""
+
+    def __init__(self, fail: bool = False):
+        self.calls = 0
+        self.closed = False
+        self.fail = fail
+
+    def fetch(self) -> str:
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("unreachable")
+        return f'[{{"cycle": {self.calls}}}]'
+
+    def write_results(self, output) -> None:
+        output.write(f"{self.fetch()}\n")
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_poll_on_each_input_line():
+    """
+    Test a cycle runs for each line received and stops when input is closed.
+    """
+    client = FakeClient()
+    output = io.StringIO()
+    poller = Poller(
+        client=client,
+        input_stream=io.StringIO("\n\n\n"),
+        output_stream=output,
+    )
+    poller.run()
+
+    assert client.calls == 3
+    assert client.closed
+    assert output.getvalue().splitlines() == [
+        '[{"cycle": 1}]',
+        '[{"cycle": 2}]',
+        '[{"cycle": 3}]',
+    ]
+
+
+def test_failed_cycle_keeps_polling():
+    """
+    Test a failed cycle is reported on stderr without stopping the poller.
+    """
+    client = FakeClient(fail=True)
+    output = io.StringIO()
+    errors = io.StringIO()
+    poller = Poller(
+        client=client,
+        input_stream=io.StringIO("\n\n"),
+        output_stream=output,
+        error_stream=errors,
+    )
+    poller.run()
+
+    assert client.calls == 2
+    assert output.getvalue() == ""
+    assert errors.getvalue().count("unreachable") == 2
+
+
+def test_poll_on_interval(monkeypatch):
+    """
+    Test cycles run on the interval until the process is stopped.
+    """
+    client = FakeClient()
+    sleeps = []
+
+    def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        if len(sleeps) == 2:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr("ncpeek.poller.time.sleep", fake_sleep)
+    poller = Poller(client=client, interval=10, output_stream=io.StringIO())
+    poller.run()
+
+    assert client.calls == 2
+    assert client.closed
+    # sleep is faked, so the second cycle is still due 20s from the start
+    assert sleeps == pytest.approx([10, 20], abs=0.5)
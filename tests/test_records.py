@@ -0,0 +1,128 @@
+import dataclasses
+import pytest
+from ncpeek.netconf_devices import NetconfDevice
+from ncpeek.change_filter import record_fingerprint, record_key
+from ncpeek.records import (
+    INTERFACE_COUNTERS,
+    InterfaceStats,
+    IsisNeighbor,
+    IsisStats,
+    IsisSystem,
+    MemoryStats,
+    attribute_name,
+    intern_metadata,
+)
+from ncpeek.utils.record_utils import record_to_dict
+
+
+def make_interface_stats(name: str = "Gi1") -> InterfaceStats:
+    return InterfaceStats(
+        *range(len(INTERFACE_COUNTERS)), 1, name, "interfaces.xml", "r1", "10.0.0.1"
+    )
+
+
+def test_interface_stats_to_dict():
+    """
+    Test the counters keep their output keys and order, metadata last.
+    """
+    record = make_interface_stats()
+
+    assert list(record.to_dict()) == [
+        *INTERFACE_COUNTERS,
+        "operational_status",
+        "name",
+        "field",
+        "device",
+        "ip",
+    ]
+    assert record.to_dict()["in-broadcast-pkts"] == 4
+    assert record.in_broadcast_pkts == 4
+
+
+@pytest.mark.parametrize("record_type", [InterfaceStats, MemoryStats])
+def test_record_keys_match_attributes(record_type):
+    """
+    Test the output keys of spec-built records follow their attributes.
+    """
+    attributes = tuple(field.name for field in dataclasses.fields(record_type))
+
+    assert tuple(map(attribute_name, record_type.KEYS)) == attributes
+
+
+def test_memory_stats_to_dict():
+    """
+    Test the memory record keeps its output keys.
+    """
+    record = MemoryStats("Processor", 9.5, "memory.xml", "r1", "10.0.0.1")
+
+    assert record.to_dict() == {
+        "name": "Processor",
+        "percent_used": 9.5,
+        "field": "memory.xml",
+        "device": "r1",
+        "ip": "10.0.0.1",
+    }
+
+
+def test_records_are_frozen_and_slotted():
+    """
+    Test records hold no instance dictionary and can not be modified.
+    """
+    record = MemoryStats("Processor", 9.5, "memory.xml", "r1", "10.0.0.1")
+
+    assert not hasattr(record, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        record.name = "other"
+
+
+def test_isis_stats_to_dict():
+    """
+    Test the ISIS records convert to the nested output of the parser.
+    """
+    neighbor = IsisNeighbor("Gi1", "level-1", "10.0.0.2", "isis-adj-up", "30")
+    record = IsisStats(
+        (IsisSystem("0000.0000.000a", (neighbor,), 1),), "isis.xml", "r1", "10.0.0.1"
+    )
+
+    assert record.to_dict() == {
+        "isis_neighbors_count": 1,
+        "isis-neighbors": [
+            {
+                "system-id": "0000.0000.000a",
+                "local_interfaces_status": [neighbor.to_dict()],
+                "neighbor_status": 1,
+            }
+        ],
+        "field": "isis.xml",
+        "device": "r1",
+        "ip": "10.0.0.1",
+    }
+
+
+def test_intern_metadata():
+    """
+    Test the field, device and ip are the same objects for every reply.
+    """
+    device = NetconfDevice(host="10.0.0.1", username="u", password="p")
+    filter_id = "".join(["interfaces", ".xml"])
+
+    first = intern_metadata(device, filter_id)
+    second = intern_metadata(device, "".join(["interfaces", ".xml"]))
+
+    assert first == ("interfaces.xml", "10.0.0.1", "10.0.0.1")
+    assert all(a is b for a, b in zip(first, second))
+
+
+def test_record_to_dict_and_change_filter():
+    """
+    Test records and dictionaries are read the same way at the boundaries.
+    """
+    record = make_interface_stats()
+    as_dict = record_to_dict(record)
+
+    assert record_to_dict(as_dict) is as_dict
+    assert record_key(record) == record_key(as_dict) == ("r1", "interfaces.xml", "Gi1")
+    assert record_fingerprint(record) == record_fingerprint(make_interface_stats())
+    assert record_fingerprint(record) != record_fingerprint(
+        dataclasses.replace(record, in_octets=100)
+    )
@@ -0,0 +1,204 @@
+import pytest
+from ncclient.operations.rpc import RPCError
+from ncclient.xml_ import to_ele
+from ncpeek.netconf_devices import NetconfDevice
+from ncpeek.session_pool import SessionPool
+
+
+class FakeTransportSession:
+    """Stand-in for the ssh session of a ncclient manager."""
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeManager:
+    """Stand-in for a ncclient manager."""
+
+    def __init__(self):
+        self.connected = True
+        self.closed = False
+        self._session = FakeTransportSession()
+
+    def close_session(self):
+        self.connected = False
+        self.closed = True
+
+
+@pytest.fixture
+def device():
+    return NetconfDevice(host="localhost", username="user", password="pass")
+
+
+@pytest.fixture
+def connections():
+    return []
+
+
+@pytest.fixture
+def connect(connections):
+    def _connect():
+        manager = FakeManager()
+        connections.append(manager)
+        return manager
+
+    return _connect
+
+
+def test_session_reused_between_operations(device, connect, connections):
+    """
+    Test the same session is used by consecutive operations.
+    """
+    pool = SessionPool()
+    first = pool.run(device, lambda manager: manager, connect)
+    second = pool.run(device, lambda manager: manager, connect)
+
+    assert first is second
+    assert len(connections) == 1
+    assert pool.size() == 1
+
+
+def test_dead_session_is_replaced(device, connect, connections):
+    """
+    Test a disconnected idle session is not reused.
+    """
+    pool = SessionPool()
+    first = pool.run(device, lambda manager: manager, connect)
+    first.connected = False
+    second = pool.run(device, lambda manager: manager, connect)
+
+    assert first is not second
+    assert first.closed
+    assert len(connections) == 2
+
+
+def test_failed_reused_session_is_retried(device, connect, connections):
+    """
+    Test an operation failing on a reused session is retried on a new one,
+    and the broken session is closed without a close-session rpc.
+    """
+    pool = SessionPool()
+    pool.run(device, lambda manager: manager, connect)
+
+    def operation(manager):
+        if manager is connections[0]:
+            raise ConnectionError("session dropped")
+        return "reply"
+
+    assert pool.run(device, operation, connect) == "reply"
+    assert not connections[0].closed
+    assert connections[0]._session.closed
+    assert len(connections) == 2
+    assert pool.size() == 1
+
+
+def test_rpc_error_keeps_the_session(device, connect, connections):
+    """
+    Test an rpc-error is raised without retry and the session is reused.
+    """
+    pool = SessionPool()
+    pool.run(device, lambda manager: manager, connect)
+    rpc_error = RPCError(
+        to_ele(
+            '<rpc-error xmlns="urn:ietf:params:xml:ns:netconf:base:1.0">'
+            "<error-message>bad filter</error-message></rpc-error>"
+        )
+    )
+
+    def operation(manager):
+        raise rpc_error
+
+    with pytest.raises(RPCError):
+        pool.run(device, operation, connect)
+    assert not connections[0].closed
+    assert pool.run(device, lambda manager: manager, connect) is connections[0]
+    assert len(connections) == 1
+
+
+def test_other_errors_are_not_retried(device, connect, connections):
+    """
+    Test an error that is not of the transport discards the reused
+    session without retrying the operation.
+    """
+    pool = SessionPool()
+    pool.run(device, lambda manager: manager, connect)
+
+    def operation(manager):
+        raise ValueError("invalid reply")
+
+    with pytest.raises(ValueError):
+        pool.run(device, operation, connect)
+    assert connections[0].closed
+    assert len(connections) == 1
+    assert pool.size() == 0
+
+
+def test_failed_new_session_raises(device, connect):
+    """
+    Test an operation failing on a new session is not retried.
+    """
+    pool = SessionPool()
+
+    def operation(manager):
+        raise ConnectionError("unreachable")
+
+    with pytest.raises(ConnectionError):
+        pool.run(device, operation, connect)
+    assert pool.size() == 0
+
+
+def test_idle_sessions_expire(device, connect, connections):
+    """
+    Test sessions idle longer than idle_ttl are closed.
+    """
+    pool = SessionPool(idle_ttl=0)
+    pool.run(device, lambda manager: manager, connect)
+    pool.run(device, lambda manager: manager, connect)
+
+    assert connections[0].closed
+    assert len(connections) == 2
+
+
+def test_max_sessions_per_device(device, connect):
+    """
+    Test a device cannot open more than max_sessions_per_device sessions.
+    """
+    device.timeout = 0.01
+    pool = SessionPool(max_sessions_per_device=1)
+
+    def nested_operation(manager):
+        return pool.run(device, lambda inner: inner, connect)
+
+    with pytest.raises(TimeoutError):
+        pool.run(device, nested_operation, connect)
+
+
+def test_slot_wait_without_device_timeout(device, connect, monkeypatch):
+    """
+    Test a device without timeout waits for a slot as long as the
+    default timeout of the devices.
+    """
+    device.timeout = None
+    monkeypatch.setattr(NetconfDevice, "timeout", 0.01)
+    pool = SessionPool(max_sessions_per_device=1)
+
+    def nested_operation(manager):
+        return pool.run(device, lambda inner: inner, connect)
+
+    with pytest.raises(TimeoutError):
+        pool.run(device, nested_operation, connect)
+
+
+def test_close(device, connect, connections):
+    """
+    Test close() closes idle sessions.
+    """
+    pool = SessionPool()
+    pool.run(device, lambda manager: manager, connect)
+    pool.close()
+
+    assert connections[0].closed
+    assert pool.size() == 0
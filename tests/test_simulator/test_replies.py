@@ -0,0 +1,74 @@
+import xmltodict
+from ncpeek.simulator.replies import (
+    ReplyCatalog,
+    iosxe_interfaces_reply,
+    isis_neighbors_reply,
+    deep_generic_reply,
+)
+
+
+def test_iosxe_interfaces_reply():
+    """
+    Test the reply has the requested number of interfaces.
+    """
+    reply = xmltodict.parse(iosxe_interfaces_reply(3))
+
+    assert len(reply["data"]["interfaces"]["interface"]) == 3
+
+
+def test_isis_neighbors_reply():
+    """
+    Test neighbors are grouped by system-id.
+    """
+    neighbors = xmltodict.parse(isis_neighbors_reply(8, neighbors_per_system=4))[
+        "data"
+    ]["isis-oper-data"]["isis-instance"]["isis-neighbor"]
+
+    assert len(neighbors) == 8
+    assert len({neighbor["system-id"] for neighbor in neighbors}) == 2
+
+
+def test_deep_generic_reply():
+    """
+    Test the reply has about the requested number of elements.
+    """
+    reply = deep_generic_reply(1000, depth=10)
+
+    assert abs(reply.count("</") - 1000) < 10
+
+
+def test_reply_catalog_canned_reply():
+    """
+    Test canned replies take precedence over generated ones.
+    """
+    catalog = ReplyCatalog(canned={"interfaces": "<data/>"})
+
+    assert catalog.reply("interfaces") == "<data/>"
+
+
+def test_reply_catalog_generated_once():
+    """
+    Test generated replies are built once per filter.
+    """
+    calls = []
+    catalog = ReplyCatalog(
+        generators={"interfaces": lambda size: calls.append(size) or "<data/>"},
+        size=5,
+    )
+
+    catalog.reply("interfaces")
+    catalog.reply("interfaces")
+
+    assert calls == [5]
+
+
+def test_reply_catalog_unknown_filter():
+    """
+    Test filters without reply get an empty data element.
+    """
+    assert xmltodict.parse(ReplyCatalog().reply("unknown")) == {
+        "data": {
+            "@xmlns": "urn:ietf:params:xml:ns:netconf:base:1.0",
+            "@xmlns:nc": "urn:ietf:params:xml:ns:netconf:base:1.0",
+        }
+    }
@@ -0,0 +1,133 @@
+import json
+import time
+import pytest
+from lxml import etree
+from ncpeek.client import NetconfClient
+from ncpeek.simulator.server import MESSAGE_SEPARATOR, NetconfSimulator, _filter_key
+
+MEMORY_FILTER = "Cisco-IOS-XE-memory-oper.xml"
+
+
+@pytest.fixture(scope="module")
+def simulator():
+    """Two simulated devices shared by the tests of this module."""
+    with NetconfSimulator(devices=2) as running_simulator:
+        yield running_simulator
+
+
+def fetch(simulator: NetconfSimulator, xml_filter: str = MEMORY_FILTER) -> list:
+    client = NetconfClient(max_workers=2)
+    client.set_devices_settings(simulator.device_settings(timeout=5))
+    client.set_xml_filter(xml_filter)
+    return json.loads(client.fetch())
+
+
+def test_fetch_from_simulated_devices(simulator):
+    """
+    Test NetconfClient fetches and parses the replies of every device.
+    """
+    records = fetch(simulator)
+
+    assert {record["device"] for record in records} == {
+        "simulated-0",
+        "simulated-1",
+    }
+    assert all(record["field"] == MEMORY_FILTER for record in records)
+
+
+def test_fetch_xpath_filter(simulator):
+    """
+    Test xpath filters are answered by the name of their first step.
+    """
+    client = NetconfClient()
+    client.set_devices_settings(simulator.device_settings()[:1])
+    client.set_xpath_filter(
+        "http://cisco.com/ns/yang/Cisco-IOS-XE-isis-oper:/isis-oper-data/isis-instance"
+    )
+
+    records = json.loads(client.fetch())
+
+    assert records[0]["isis_neighbors_count"] > 0
+
+
+def test_latency():
+    """
+    Test replies are delayed by the configured latency.
+    """
+    with NetconfSimulator(latency=0.3) as slow_simulator:
+        start = time.perf_counter()
+        fetch(slow_simulator)
+
+        assert time.perf_counter() - start >= 0.3
+
+
+@pytest.mark.parametrize(
+    "failure_mode, error", [("error", "RPCError"), ("disconnect", "SessionCloseError")]
+)
+def test_failure_injection(failure_mode, error):
+    """
+    Test injected failures reach the client as error records.
+    """
+    with NetconfSimulator(failure_rate=1, failure_mode=failure_mode) as failing:
+        records = fetch(failing)
+
+    assert [record["error"] for record in records] == [error]
+    assert records[0]["device"] == "simulated-0"
+    assert records[0]["field"] == MEMORY_FILTER
+
+
+def test_deadline():
+    """
+    Test a device slower than the deadline gives an error record in time.
+    """
+    with NetconfSimulator(latency=3) as slow_simulator:
+        client = NetconfClient(deadline=0.5)
+        client.set_devices_settings(slow_simulator.device_settings(timeout=5))
+        client.set_xml_filter(MEMORY_FILTER)
+        start = time.perf_counter()
+        records = json.loads(client.fetch())
+
+        assert time.perf_counter() - start < 2
+    assert [record["error"] for record in records] == ["DeadlineExceeded"]
+
+
+def test_invalid_failure_mode():
+    """
+    Test unknown failure modes are rejected.
+    """
+    with pytest.raises(ValueError):
+        NetconfSimulator(failure_mode="hang")
+
+
+@pytest.mark.parametrize(
+    "get, expected",
+    [
+        (
+            '<get><filter><interfaces xmlns="urn:x"><interface/></interfaces></filter></get>',
+            "interfaces",
+        ),
+        (
+            '<get><filter type="xpath" select="/ios:isis-oper-data/isis-instance"/></get>',
+            "isis-oper-data",
+        ),
+        ("<get/>", None),
+    ],
+)
+def test_filter_key(get, expected):
+    """
+    Test filters are identified by their top element, without namespace.
+    """
+    assert _filter_key(etree.fromstring(get)) == expected
+
+
+def test_malformed_rpc():
+    """
+    Test a malformed rpc is answered with an rpc-error, the session stays open.
+    """
+    reply, keep_open = NetconfSimulator()._handle_rpc(b"<rpc><get></rpc>")
+    rpc_reply = etree.fromstring(reply[: -len(MESSAGE_SEPARATOR)])
+
+    assert keep_open
+    assert rpc_reply.get("message-id") is None
+    assert rpc_reply.findtext("{*}rpc-error/{*}error-tag") == "malformed-message"
+    assert rpc_reply.findtext("{*}rpc-error/{*}error-type") == "rpc"
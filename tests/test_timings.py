@@ -0,0 +1,65 @@
+import time
+import pytest
+from ncpeek.timings import (
+    PHASES,
+    TIMINGS_FIELD,
+    DeviceTimings,
+    is_timings_record,
+)
+
+
+def test_add_sums_the_time_of_a_phase():
+    """
+    Test add accumulates the elapsed time of a phase over several calls.
+    """
+    timings = DeviceTimings(device="router", ip="10.0.0.1")
+    for _ in range(2):
+        start = time.perf_counter()
+        time.sleep(0.01)
+        timings.add("parse", start)
+
+    assert timings.parse >= 0.02
+    assert timings.connect == 0.0
+
+
+def test_add_to_serialize_not_measured_yet():
+    """
+    Test add starts from zero on the serialize phase, None until measured.
+    """
+    timings = DeviceTimings()
+    timings.add("serialize", time.perf_counter())
+
+    assert timings.serialize >= 0
+
+
+def test_merge_adds_timings_measured_apart():
+    """
+    Test merge sums the phases and counts, leaving serialize unmeasured.
+    """
+    timings = DeviceTimings(device="router", rpc=0.5, parse=0.1, records=1)
+    timings.merge(DeviceTimings(convert=0.2, parse=0.3, reply_bytes=10, records=2))
+
+    assert timings.rpc == 0.5
+    assert timings.convert == 0.2
+    assert timings.parse == pytest.approx(0.4)
+    assert timings.serialize is None
+    assert timings.reply_bytes == 10
+    assert timings.records == 3
+    assert timings.device == "router"
+
+
+def test_to_record():
+    """
+    Test the timings record has the fields of the parsed records.
+    """
+    record = DeviceTimings(
+        device="router", ip="10.0.0.1", rpc=0.5, reply_bytes=10, records=2
+    ).to_record()
+
+    assert record["field"] == TIMINGS_FIELD
+    assert record["device"] == "router"
+    assert record["ip"] == "10.0.0.1"
+    assert list(record["data"]) == [*PHASES, "reply_bytes", "records"]
+    assert record["data"]["rpc"] == 0.5
+    assert is_timings_record(record)
+    assert not is_timings_record({"field": "interfaces"})
@@ -0,0 +1,116 @@
+import io
+from ncpeek.utils.line_protocol import (
+    records_to_line_protocol,
+    write_line_protocol,
+)
+
+
+def interface_record(name: str = "GigabitEthernet1/0/1") -> dict:
+    return {
+        "in_octets": 100,
+        "in-crc-errors": 0,
+        "operational_status": 1,
+        "name": name,
+        "field": "Cisco-IOS-XE-interfaces-oper.xml",
+        "device": "router1",
+        "ip": "10.0.0.1",
+    }
+
+
+def test_records_to_line_protocol():
+    """
+    Test device, field, ip and name are tags and integers are fields.
+    """
+    assert records_to_line_protocol([interface_record()]) == (
+        "ncpeek,device=router1,field=Cisco-IOS-XE-interfaces-oper.xml,"
+        "ip=10.0.0.1,name=GigabitEthernet1/0/1 "
+        "in_octets=100i,in-crc-errors=0i,operational_status=1i"
+    )
+
+
+def test_mixed_values():
+    """
+    Test floats, booleans, numeric strings and nested dictionaries,
+    skipping text, lists and values line protocol can't represent.
+    """
+    record = {
+        "percent_used": 25.5,
+        "enabled": True,
+        "holdtime": "30",
+        "state": "up",
+        "neighbors": [{"up": 1}],
+        "broken": float("nan"),
+        "data": {"memory": {"free": "1024"}},
+        "device": "router1",
+    }
+
+    assert records_to_line_protocol([record]) == (
+        "ncpeek,device=router1 "
+        "percent_used=25.5,enabled=1i,holdtime=30i,memory_free=1024i"
+    )
+
+
+def test_escaping():
+    """
+    Test spaces, commas and equal signs are escaped in tags and field keys.
+    """
+    record = {"rx kbps": 1, "name": "Gi 1,a=b", "device": "core router"}
+
+    assert records_to_line_protocol([record], measurement="net stats") == (
+        "net\\ stats,device=core\\ router,name=Gi\\ 1\\,a\\=b rx\\ kbps=1i"
+    )
+
+
+def test_records_without_numbers_are_skipped():
+    """
+    Test records without fields are left out, line protocol requires one.
+    """
+    records = [{"name": "Gi1", "device": "r1"}, interface_record(), {}]
+
+    assert len(records_to_line_protocol(records).splitlines()) == 1
+
+
+def test_error_records():
+    """
+    Test error records are written to the error measurement with up=0i.
+    """
+    record = {
+        "field": "Cisco-IOS-XE-interfaces-oper.xml",
+        "device": "router1",
+        "ip": "10.0.0.1",
+        "error": "DeadlineExceeded",
+        "message": 'Device "router1" missed the deadline',
+    }
+
+    assert records_to_line_protocol([record, interface_record()]).splitlines() == [
+        "ncpeek_error,device=router1,error=DeadlineExceeded,"
+        "field=Cisco-IOS-XE-interfaces-oper.xml,ip=10.0.0.1 "
+        'message="Device \\"router1\\" missed the deadline",up=0i',
+        records_to_line_protocol([interface_record()]),
+    ]
+
+
+def test_same_shape_with_other_types():
+    """
+    Test records sharing keys with a counters-only record are still
+    converted value by value when their types differ.
+    """
+    counters = {"a": 1, "b": 2, "device": "r1"}
+    mixed = {"a": 1.5, "b": "x", "device": "r1"}
+
+    assert records_to_line_protocol([counters, mixed]) == (
+        "ncpeek,device=r1 a=1i,b=2i\nncpeek,device=r1 a=1.5"
+    )
+
+
+def test_write_line_protocol():
+    """
+    Test one line per record is written, ending with a newline.
+    """
+    output = io.StringIO()
+    write_line_protocol(output, [interface_record("a"), interface_record("b")])
+    write_line_protocol(output, [])
+
+    lines = output.getvalue().split("\n")
+    assert len(lines) == 3
+    assert lines[2] == ""
@@ -1,9 +1,15 @@
+import io
 import pytest
 
+from ncpeek.records import MemoryStats
 from ncpeek.utils.text_utils import (
     convert_json_to_dict,
     convert_xml_to_dict,
     convert_dict_to_json,
+    iterparse_xml_elements,
+    iterparse_xml_records,
+    get_json_serializer,
+    write_json_line,
 )
 
 
@@ -23,9 +29,145 @@ def test_convert_xml_to_dict():
     assert convert_xml_to_dict(xml_string) == {"root": {"key": "value"}}
 
 
+def test_convert_xml_to_dict_strip_namespaces():
+    """
+    Test namespace declarations are dropped while converting,
+    a leaf declaring one keeps its text under '#text'.
+    """
+    xml_string = (
+        '<data xmlns="urn:a" xmlns:nc="urn:b">'
+        '<interface xmlns="urn:c"><name>Gi1</name></interface>'
+        '<interface xmlns="urn:c"><name xmlns="urn:c">Gi2</name></interface>'
+        "</data>"
+    )
+    assert convert_xml_to_dict(xml_string, strip_namespaces=True) == {
+        "data": {"interface": [{"name": "Gi1"}, {"name": {"#text": "Gi2"}}]}
+    }
+
+
 def test_convert_dict_to_json():
     """
     Test converting a dictionary to a JSON string.
     """
     input_dict = {"key": "value"}
     assert convert_dict_to_json(input_dict) == '{"key": "value"}'
+
+
+def test_iterparse_xml_records():
+    """
+    Test streaming records matches the dictionary of the whole document.
+    """
+    xml_string = """<data xmlns="urn:ietf:params:xml:ns:netconf:base:1.0">
+  <interfaces xmlns="http://cisco.com/ns/yang/Cisco-IOS-XE-interfaces-oper">
+    <interface>
+      <name>GigabitEthernet1</name>
+      <type xmlns:ianaift="urn:ietf:params:xml:ns:yang:iana-if-type" kind="eth">ianaift:ethernetCsmacd</type>
+      <ipv4>10.0.0.1</ipv4>
+      <ipv4>10.0.0.2</ipv4>
+      <description />
+    </interface>
+    <other>ignored</other>
+    <interface>
+      <name>Loopback0</name>
+    </interface>
+  </interfaces>
+</data>"""
+    records = list(
+        iterparse_xml_records(
+            xml_string, record_path=("data", "interfaces", "interface")
+        )
+    )
+
+    assert records == [
+        {
+            "name": "GigabitEthernet1",
+            "type": {"@kind": "eth", "#text": "ianaift:ethernetCsmacd"},
+            "ipv4": ["10.0.0.1", "10.0.0.2"],
+            "description": None,
+        },
+        {"name": "Loopback0"},
+    ]
+
+
+@pytest.mark.parametrize("backend", ["orjson", "msgspec", "json"])
+def test_json_backends(backend):
+    """
+    Test each installed JSON backend round trips the same data.
+    """
+    try:
+        serializer = get_json_serializer(backend)
+    except ImportError:
+        pytest.skip(f"{backend} not installed")
+
+    data = [{"name": "Gi1", "in_octets": 4249319, "percent_used": 9.46}]
+    encoded = serializer.dumps(data)
+
+    assert isinstance(encoded, bytes)
+    assert serializer.loads(encoded) == data
+
+
+@pytest.mark.parametrize("backend", ["orjson", "msgspec", "json"])
+def test_json_backends_encode_records(backend):
+    """
+    Test each installed JSON backend encodes records with the keys of to_dict.
+    """
+    try:
+        serializer = get_json_serializer(backend)
+    except ImportError:
+        pytest.skip(f"{backend} not installed")
+
+    record = MemoryStats("Processor", 9.46, "memory.xml", "router1", "10.0.0.1")
+
+    assert serializer.loads(serializer.dumps([record])) == [record.to_dict()]
+    assert serializer.loads(serializer.dumps(record)) == record.to_dict()
+    assert convert_json_to_dict(convert_dict_to_json([record])) == [
+        record.to_dict()
+    ]
+
+
+def test_unknown_json_backend():
+    """
+    Test an unknown JSON backend is rejected.
+    """
+    with pytest.raises(ValueError):
+        get_json_serializer("yaml")
+
+
+def test_write_json_line_to_binary_buffer():
+    """
+    Test JSON bytes are written to the binary buffer of a text stream.
+    """
+    buffer = io.BytesIO()
+    output = io.TextIOWrapper(buffer, encoding="utf-8")
+    write_json_line(output=output, data={"key": "value"})
+
+    assert convert_json_to_dict(buffer.getvalue().decode()) == {"key": "value"}
+    assert buffer.getvalue().endswith(b"\n")
+
+
+def test_write_json_line_to_text_stream():
+    """
+    Test JSON is written to text streams without a binary buffer.
+    """
+    output = io.StringIO()
+    write_json_line(output=output, data={"key": "value"})
+
+    assert convert_json_to_dict(output.getvalue()) == {"key": "value"}
+
+
+def test_iterparse_xml_elements_does_not_resolve_entities(tmp_path):
+    """
+    Test external entities of a reply are not read while streaming.
+    """
+    secret = tmp_path / "secret.txt"
+    secret.write_text("secret", encoding="utf-8")
+    xml_string = (
+        f'<!DOCTYPE data [<!ENTITY secret SYSTEM "{secret.as_uri()}">]>'
+        "<data><item><name>&secret;</name></item></data>"
+    )
+    names = [
+        element.findtext("name")
+        for element in iterparse_xml_elements(xml_string, ("data", "item"))
+    ]
+
+    assert names == [""]
@@ -0,0 +1,42 @@
+from lxml import etree
+
+from ncpeek.utils.xpath_utils import compile_text_xpath, compile_texts_xpath
+
+INTERFACE = etree.fromstring(
+    '<interface xmlns="http://cisco.com/ns/yang/Cisco-IOS-XE-interfaces-oper">'
+    "<name>GigabitEthernet1</name>"
+    "<statistics><in-octets>10</in-octets><out-octets>20</out-octets></statistics>"
+    "</interface>"
+)
+
+
+def test_compile_text_xpath():
+    """
+    Test reading the text of an element, ignoring its namespace.
+    """
+    assert compile_text_xpath("name")(INTERFACE) == "GigabitEthernet1"
+    assert compile_text_xpath("statistics/in-octets")(INTERFACE) == "10"
+
+
+def test_compile_text_xpath_missing_element():
+    """
+    Test a missing element returns an empty string.
+    """
+    assert compile_text_xpath("statistics/in-errors")(INTERFACE) == ""
+
+
+def test_compile_text_xpath_is_cached():
+    """
+    Test each path is compiled only once.
+    """
+    assert compile_text_xpath("name") is compile_text_xpath("name")
+
+
+def test_compile_texts_xpath():
+    """
+    Test reading the leaves of a container by local name.
+    """
+    assert compile_texts_xpath("statistics/*")(INTERFACE) == {
+        "in-octets": "10",
+        "out-octets": "20",
+    }